@@ -15,6 +15,7 @@ Minimax is the LLM inside every agent. AgentCore provides:
   - Working memory (ephemeral, per-session)
   - Tool catalog context (injected into agent prompts)
 """
+import asyncio
 import logging
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
@@ -22,12 +23,21 @@ from typing import Any, Dict, List, Optional
 from app.agentcore.memory import AgentCoreMemoryClient, get_memory_client
 from app.agentcore.gateway import get_gateway_client
 from app.integrations.datadog_mcp import get_datadog_client
+from app.integrations.log_templates import LogTemplateMiner
+from app.integrations.trace_stats import TraceAggregator
+from app.integrations.resample import resample_series
 from app.integrations.toto_forecaster import get_toto_forecaster
+from app.services.deploy_index import correlate_deploys, get_deploy_index
+from app.services.service_graph import get_service_graph
 from app.agents.incident_summarizer import IncidentSummarizerAgent
 from app.agents.hypothesis_ranker import HypothesisRankerAgent
 from app.agents.guided_steps import GuidedStepsAgent
 from app.agents.recommendation_designer import RecommendationDesignerAgent
 
+# Raw records kept for the summarizer from each streamed scan, next to the
+# aggregated log templates and trace stats
+BUNDLE_SAMPLE = 10
+
 logger = logging.getLogger(__name__)
 
 
@@ -129,17 +139,19 @@ class InvestigationRunner:
             "action": "search_logs",
             "status": "running",
         })
-        logs = await self._safe(
-            self.datadog.search_logs(
-                query=f"service:{service_filter}", limit=50
-            ),
-            [],
+        # Logs reach the agents as mined templates with counts, not raw lines
+        log_miner = LogTemplateMiner()
+        _, logs_scanned = await self._safe(
+            self._scan(self.datadog.iter_logs(query=f"service:{service_filter}"), log_miner),
+            ([], 0),
         )
+        log_templates = log_miner.summary()
         self._log_event(session_id, "tool_call", {
             "agent": "Datadog",
             "action": "search_logs",
             "status": "complete",
-            "result_count": len(logs),
+            "result_count": logs_scanned,
+            "templates": log_templates["template_count"],
         })
 
         self._log_event(session_id, "tool_call", {
@@ -147,23 +159,70 @@ class InvestigationRunner:
             "action": "fetch_traces",
             "status": "running",
         })
-        traces = await self._safe(
-            self.datadog.fetch_traces(service=service_filter, limit=50), []
+        # Traces are aggregated into per-service/resource latency sketches as they stream
+        trace_agg = TraceAggregator()
+        traces, traces_scanned = await self._safe(
+            self._scan(self.datadog.iter_traces(service=service_filter), trace_agg),
+            ([], 0),
         )
+        trace_stats = trace_agg.summary()
         self._log_event(session_id, "tool_call", {
             "agent": "Datadog",
             "action": "fetch_traces",
             "status": "complete",
-            "result_count": len(traces),
+            "result_count": traces_scanned,
+        })
+
+        # Blast radius comes from the cached dependency graph, not an LLM guess
+        self._log_event(session_id, "tool_call", {
+            "agent": "Datadog",
+            "action": "get_service_dependencies",
+            "status": "running",
+        })
+        affected = services or [service_filter]
+        graph = await self._safe(get_service_graph().ensure(affected), None)
+        service_graph: Dict[str, Any] = {}
+        if graph is not None:
+            service_graph = {
+                "blast_radius": graph.blast_radius(affected),
+                "error_paths": {s: graph.error_paths(s) for s in affected},
+            }
+        self._log_event(session_id, "tool_call", {
+            "agent": "Datadog",
+            "action": "get_service_dependencies",
+            "status": "complete",
+            "result_count": len(graph) if graph is not None else 0,
         })
 
+        # Deploys shortly before the incident, read from the background-refreshed index
+        started_at = incident.started_at
+        if started_at is not None and started_at.tzinfo is None:
+            started_at = started_at.replace(tzinfo=timezone.utc)
+        anomaly_ts = (
+            started_at.timestamp()
+            if started_at is not None
+            else datetime.now(timezone.utc).timestamp()
+        )
+        deploy_index = await self._safe(get_deploy_index().ensure_fresh(), None)
+        deploys = (
+            correlate_deploys(deploy_index, affected, anomaly_ts)
+            if deploy_index is not None else {"deploy_present": False, "markers": []}
+        )
+
         telemetry_bundle = {
             "monitors": monitors,
             "metrics": metrics,
-            "logs": logs,
+            "log_templates": log_templates,
+            "trace_stats": trace_stats,
             "traces": traces,
+            "service_graph": service_graph,
+            "deploys": deploys,
         }
-        self.memory.store(session_id, "checked_items", ["monitors", "metrics", "logs", "traces"])
+        self.memory.store(
+            session_id,
+            "checked_items",
+            ["monitors", "metrics", "logs", "traces", "dependencies", "deploys"],
+        )
 
         # ── Step 2: Toto forecast ────────────────────────────────────────
         self._log_event(session_id, "tool_call", {
@@ -174,13 +233,15 @@ class InvestigationRunner:
         toto_forecasts = []
         if isinstance(metrics, list) and metrics:
             first_series = metrics[0]
-            points = first_series.get("pointlist", [])
-            if len(points) >= 10:
-                values = [p[1] for p in points if p[1] is not None]
-                fc = self.toto.forecast(
-                    values=values,
-                    interval_seconds=60,
+            resampled = resample_series(first_series)
+            if resampled.observed >= 10:
+                # Inference is CPU-bound (or a blocking sidecar call); keep it off the event loop
+                fc = await asyncio.to_thread(
+                    self.toto.forecast,
+                    values=resampled.filled(),
+                    interval_seconds=resampled.interval_seconds,
                     series_name=first_series.get("metric", "request_rate"),
+                    profile="standard",
                 )
                 if fc:
                     toto_forecasts.append(fc.model_dump())
@@ -214,6 +275,17 @@ class InvestigationRunner:
                 "severity": incident.severity,
                 "primary_symptom": "Unknown",
             }
+        computed_radius = graph.describe(affected) if graph is not None else None
+        if computed_radius:
+            envelope["blast_radius"] = computed_radius
+        from app.services.memory_service import MemoryService
+        incident_signature = MemoryService.generate_incident_signature(
+            services=envelope.get("affected_services") or affected,
+            endpoint=None,
+            symptom_type=envelope.get("primary_symptom") or "unknown",
+            error_code=None,
+            deploy_present=deploys["deploy_present"],
+        )
         self.memory.store(session_id, "current_incident", {
             **self.memory.retrieve(session_id).get("current_incident", {}),
             "envelope": envelope,
@@ -264,8 +336,9 @@ class InvestigationRunner:
                 memory_profile=memory_profile.get("preferences", {}),
                 telemetry_summary={
                     "monitors_count": len(monitors),
-                    "logs_count": len(logs),
-                    "traces_count": len(traces),
+                    "logs_count": logs_scanned,
+                    "top_log_templates": [t["template"] for t in log_templates["templates"][:5]],
+                    "traces_count": traces_scanned,
                     "top_hypotheses": [h.get("title") or h.get("description", "") for h in hypotheses[:3]],
                     "learned_patterns": [p.get("description", "") for p in memory_profile.get("patterns", [])[:3]],
                 },
@@ -343,6 +416,8 @@ class InvestigationRunner:
                 "severity": envelope.get("severity", "unknown"),
                 "primary_symptom": envelope.get("primary_symptom", ""),
                 "top_recommendation": top_recommendation,
+                "signature": incident_signature,
+                "deploy_correlated": deploys["deploy_present"],
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             }
             _db = SessionLocal()
@@ -368,6 +443,7 @@ class InvestigationRunner:
             "session_id": session_id,
             "envelope": envelope,
             "evidence": telemetry_bundle,
+            "incident_signature": incident_signature,
             "hypotheses": hypotheses,
             "guided_steps": guided_steps,
             "recommendations": recommendations,
@@ -392,6 +468,22 @@ class InvestigationRunner:
         if session_id in _fallback_sessions:
             _fallback_sessions[session_id]["events"] = events
 
+    @staticmethod
+    async def _scan(pages, sink: Optional[Any] = None) -> tuple:
+        """Drain a budgeted record stream: (first BUNDLE_SAMPLE records, records scanned).
+
+        With ``sink`` (a LogTemplateMiner or TraceAggregator), every page is
+        also folded into it as it arrives.
+        """
+        sample: List[Dict[str, Any]] = []
+        scanned = 0
+        async for page in pages:
+            if sink is not None:
+                sink.add_many(page)
+            sample.extend(page[:BUNDLE_SAMPLE - len(sample)])
+            scanned += len(page)
+        return sample, scanned
+
     @staticmethod
     async def _safe(coro, default):
         """Await a coroutine and return default on exception."""
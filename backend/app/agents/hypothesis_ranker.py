@@ -16,6 +16,12 @@ Given telemetry evidence and known patterns, generate ranked hypotheses with:
 - Evidence pointers (metrics, logs, traces that support this)
 - Reasoning
 
+Log evidence is given as templates ("log_templates") with counts, first/last
+seen, levels, services and example parameters; cite a template as a log
+evidence pointer rather than individual lines. Trace evidence is aggregated
+("trace_stats") into p50/p95/p99 latency, error rate and throughput per service
+and resource; cite those figures rather than single spans.
+
 Rank hypotheses by confidence and evidence strength.
 
 Output must be valid JSON matching the schema."""
@@ -20,6 +20,14 @@ Extract:
 - Primary symptom
 - Initial root cause hypothesis
 
+Logs arrive as templates ("log_templates"): each is a message shape with <*> for
+the variable parts, its line count, first/last seen (epoch ms), levels, services
+and example values. Weigh templates by count and by when they first appeared.
+Traces arrive aggregated ("trace_stats"): p50/p95/p99 latency (ms), error rate
+and throughput per service and for the slowest resources.
+The blast radius is computed from the service dependency graph ("service_graph":
+impacted upstream services and error-propagation paths); use it as given.
+
 Output must be valid JSON matching the schema."""
 
     def get_output_schema(self):
@@ -1,6 +1,6 @@
 """Application configuration from environment variables."""
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -17,9 +17,91 @@ class Settings(BaseSettings):
 
     # Datadog
     dd_mode: str = "mock"  # mock or live
+    mock_scenario: str = "db_latency_spike"  # Incident scenario the mock generator plays
+    mock_seed: int = 0
+    mock_log_total: int = 1000               # Records in one paginated mock log scan
+    mock_trace_total: int = 400              # Spans in one paginated mock trace scan
     datadog_site: Optional[str] = None
     datadog_api_key: Optional[str] = None
     datadog_app_key: Optional[str] = None
+    resample_fill: str = "linear"  # Gap fill for pointlists: linear, ffill, zero or none
+    dd_api_url: Optional[str] = None        # Override the API base URL (e.g. the stand-in server)
+    dd_apm_env: str = "production"          # APM env whose service dependencies are mapped
+    dd_cache_enabled: bool = True
+    # Response-cache TTL per client method, in seconds (0 disables caching it)
+    dd_cache_ttl: Dict[str, float] = {
+        "query_metrics": 30.0,
+        "search_logs": 15.0,
+        "fetch_traces": 15.0,
+        "get_active_monitors": 30.0,
+        "get_monitor_details": 120.0,
+        "get_deploy_markers": 60.0,
+        "get_service_dependencies": 300.0,
+    }
+    dd_cache_negative_ttl: float = 5.0  # Failed requests are not retried for this long
+    dd_cache_bucket_seconds: int = 10   # Window alignment for logs, traces and events
+    dd_max_queries_per_request: int = 8  # Queries packed into one comma-separated metrics request
+    ts_store_enabled: bool = True           # Keep fetched series locally; fetch only the new tail
+    ts_store_max_bytes: int = 64 * 1024 * 1024
+    ts_store_retention_seconds: int = 4 * 3600
+    ts_store_delta_overlap_seconds: int = 300  # Tail every delta re-fetches (late ingestion)
+    ts_store_path: Optional[str] = None     # Directory the store persists to (mmapped on load)
+    dd_ratelimit_reserve: float = 0.2       # Share of each endpoint's budget kept for interactive
+    dd_ratelimit_max_delay: float = 10.0    # Longest a low-priority call waits for a budget reset
+    dd_ratelimit_max_retry_wait: float = 5.0  # Longest Retry-After an interactive call sleeps out
+    dd_stream_page_size: int = 200          # Records per page when streaming logs/traces
+    dd_stream_prefetch_pages: int = 2       # Pages fetched ahead of the consumer
+    dd_stream_max_records: int = 2000       # Default record budget of one log/trace scan
+    dd_stream_max_bytes: int = 2_000_000    # Default byte budget (serialized records) of one scan
+    log_template_depth: int = 4             # Drain tree depth (token count + depth-2 leading)
+    log_template_sim_threshold: float = 0.5 # Share of matching tokens needed to join a template
+    log_templates_top: int = 25             # Templates included in prompts and step results
+
+    # Toto forecasting
+    toto_prefilter_threshold: float = 30.0  # Screen score (0–100) that escalates to Toto
+    toto_statistical_fallback: bool = True  # Use the statistical detector if Toto can't load
+    toto_quantize: bool = False  # int8 dynamic quantization of Linear layers (CPU only)
+    toto_compile: bool = False   # torch.compile the backbone (CPU only)
+    toto_warmup: bool = True     # Run one inference per profile after prewarm
+    toto_sidecar_socket: Optional[str] = None  # Unix socket of a shared inference sidecar
+    toto_sidecar_timeout: float = 30.0
+    toto_sidecar_status_timeout: float = 1.0  # /health readiness probe of the sidecar
+    toto_cache_size: int = 256  # Cached forecast windows (0 disables reuse across horizons)
+
+    # Background anomaly scanner
+    anomaly_scan_enabled: bool = True
+    anomaly_scan_interval_seconds: int = 60    # Cadence of one full scan
+    anomaly_scan_lookback_seconds: int = 3600  # History fetched per scan
+    anomaly_scan_history: int = 60             # Scores kept per series
+    # Group-by queries scanned every cycle: one call covers every service
+    anomaly_scan_queries: Dict[str, str] = {
+        "error_rate": "sum:demo.http.requests.count{status:500} by {service}.as_rate()",
+        "p95_latency": "avg:demo.http.request.duration{percentile:p95} by {service}",
+        "throughput": "sum:demo.http.requests.count{*} by {service}.as_rate()",
+    }
+
+    # Service dependency graph
+    service_graph_enabled: bool = True
+    service_graph_refresh_seconds: int = 300   # Cadence of the background re-crawl
+    service_graph_ttl_seconds: int = 600       # A service's edges are re-fetched once this old
+    service_graph_max_services: int = 500      # Crawl stops growing the graph past this size
+    service_graph_seeds: List[str] = []        # Crawled at startup (incidents add their own)
+
+    # Deploy marker index
+    deploy_index_enabled: bool = True
+    deploy_index_refresh_seconds: int = 60           # Cadence of the incremental background refresh
+    deploy_index_lookback_seconds: int = 24 * 3600   # Markers older than this are dropped
+    deploy_correlation_window_seconds: int = 2700    # Deploys this soon before an anomaly correlate
+
+    # Home overview widgets: seconds each may take before it is answered as pending
+    home_widget_deadlines: Dict[str, float] = {
+        "topEndpoints": 2.0,
+        "liveChartsData": 2.5,
+        "activeAlerts": 2.0,
+        "suggestedImprovements": 3.0,
+        "totoAnomalies": 2.5,
+    }
+    home_widget_ttl_seconds: float = 120.0  # Late widget tasks are kept this long for follow-up
 
     # Minimax
     minimax_api_key: str = ""
@@ -1,5 +1,7 @@
 """SQLAlchemy database models."""
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, Boolean
+from sqlalchemy import (
+    Column, Integer, String, DateTime, Text, JSON, ForeignKey, Boolean, Float, LargeBinary, Index,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -77,11 +79,40 @@ class Incident(Base):
     services = Column(JSON, default=list)
     state = Column(String, default="open")  # open, investigating, resolved, closed
     monitor_id = Column(String, nullable=True)
-    toto_forecasts = Column(JSON, default=list)   # List[TotoForecast] dicts
     agentcore_session_id = Column(String, nullable=True)  # AgentCore session for agent-trace
 
     # Relationships
     recommendations = relationship("Recommendation", back_populates="incident")
+    # Forecast history is large; only the forecast endpoints load it (via ForecastStore),
+    # so touching it through the relationship is an error rather than a silent full load
+    forecasts = relationship("TotoForecastRecord", back_populates="incident", lazy="raise")
+
+
+class TotoForecastRecord(Base):
+    """One Toto forecast of one series, kept as history (never overwritten)."""
+    __tablename__ = "toto_forecasts"
+    __table_args__ = (
+        Index(
+            "ix_toto_forecasts_incident_series_time", "incident_id", "series_name", "computed_at"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    incident_id = Column(Integer, ForeignKey("incidents.id"), nullable=False, index=True)
+    series_name = Column(String, nullable=False)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+    model = Column(String, default="toto")  # toto or statistical
+    profile = Column(String, nullable=True)  # inference profile used
+    interval_seconds = Column(Integer, nullable=False)
+    anomaly_score = Column(Float, nullable=False)
+    is_anomalous = Column(Boolean, default=False)
+    history_length = Column(Integer, nullable=False)  # points of `historical` in `values`
+    horizon = Column(Integer, nullable=False)  # points of each forecast band in `values`
+    # Packed little-endian float32: historical | median | lower | upper
+    values = Column(LargeBinary, nullable=False)
+
+    # Relationships
+    incident = relationship("Incident", back_populates="forecasts")
 
 
 class Recommendation(Base):
@@ -29,3 +29,12 @@ def get_db():
 def init_db():
     """Initialize database tables."""
     Base.metadata.create_all(bind=engine)
+
+    # Databases from before the forecast table keep forecasts on the incident row
+    from app.services.forecast_store import backfill_legacy_forecasts
+
+    db = SessionLocal()
+    try:
+        backfill_legacy_forecasts(db)
+    finally:
+        db.close()
@@ -0,0 +1,196 @@
+"""Lightweight statistical anomaly detection for metric series.
+
+Three cheap, vectorised checks over a batch of series:
+  - robust z-score   — recent points vs the baseline median / MAD
+  - EWMA residuals   — recent points vs a one-step-ahead EWMA prediction
+  - change point     — median of the recent window vs median of the baseline
+
+Used in two places by TotoForecaster:
+  - as a prefilter: series whose screen score stays below
+    ``settings.toto_prefilter_threshold`` never reach the model
+  - as the full fallback when the Toto model cannot be loaded
+Results come back in the same TotoForecast schema (``model="statistical"``).
+"""
+import warnings
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.schemas.toto import TotoForecast
+
+# MAD → standard deviation for normally distributed data
+MAD_TO_SIGMA = 1.4826
+# Normal quantile of p90 (the p10/p90 band is median ± Z_P90 · sigma)
+Z_P90 = 1.2816
+
+
+def _as_matrix(rows: Union[np.ndarray, Sequence[Sequence[float]]], max_length: int) -> np.ndarray:
+    """Right-align series in a [B, T] float matrix, NaN-padding short rows on the left."""
+    if isinstance(rows, np.ndarray) and rows.ndim == 2:
+        return rows[:, -max_length:].astype(np.float64, copy=False)
+    width = min(max((len(r) for r in rows), default=0), max_length)
+    matrix = np.full((len(rows), width), np.nan)
+    for i, row in enumerate(rows):
+        tail = np.asarray(row, dtype=np.float64)[-width:]
+        if len(tail):
+            matrix[i, width - len(tail):] = tail
+    return matrix
+
+
+def _robust_sigma(values: np.ndarray, center: np.ndarray, level: np.ndarray) -> np.ndarray:
+    """Scaled MAD per row, floored at 1% of the series level.
+
+    The floor keeps perfectly flat series from flagging tiny wobbles.
+    """
+    mad = np.nanmedian(np.abs(values - center), axis=1, keepdims=True)
+    floor = 0.01 * np.abs(level) + 1e-6
+    return np.maximum(MAD_TO_SIGMA * np.nan_to_num(mad), floor)
+
+
+def robust_zscore(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Max |z| of the last ``window`` points against the preceding baseline.
+
+    Returns:
+        [B] robust z-scores.
+    """
+    baseline, recent = matrix[:, :-window], matrix[:, -window:]
+    center = np.nanmedian(baseline, axis=1, keepdims=True)
+    sigma = _robust_sigma(baseline, center, center)
+    return np.nan_to_num(np.nanmax(np.abs(recent - center) / sigma, axis=1))
+
+
+def ewma(matrix: np.ndarray, alpha: float, taps: int = 64) -> np.ndarray:
+    """Exponentially weighted moving average along axis 1 (truncated FIR form).
+
+    Leading NaNs are back-filled with each row's first value so padding does
+    not leak into the average. Returns [B, T - taps + 1] smoothed values,
+    aligned with the last T - taps + 1 input columns.
+    """
+    taps = min(taps, matrix.shape[1])
+    filled = matrix
+    if np.isnan(matrix).any():
+        first_valid = np.argmax(~np.isnan(matrix), axis=1)
+        first_value = matrix[np.arange(len(matrix)), first_valid]
+        filled = np.where(np.isnan(matrix), first_value[:, None], matrix)
+    weights = alpha * (1 - alpha) ** np.arange(taps)[::-1]
+    weights /= weights.sum()
+    return sliding_window_view(filled, taps, axis=1) @ weights
+
+
+def ewma_residuals(matrix: np.ndarray, window: int, alpha: float = 0.3) -> np.ndarray:
+    """Max |one-step EWMA residual| over the last ``window`` points, in robust sigmas.
+
+    Returns:
+        [B] normalised residual magnitudes.
+    """
+    # Short series: fewer taps so enough residuals remain for a baseline
+    smoothed = ewma(matrix, alpha, taps=min(64, max(matrix.shape[1] - window - 4, 1)))
+    # smoothed[:, k] covers inputs up to column (T - n_smoothed + k); predict the next one
+    predicted = smoothed[:, :-1]
+    actual = matrix[:, matrix.shape[1] - predicted.shape[1]:]
+    residuals = actual - predicted
+    base = residuals[:, :-window]
+    center = np.nanmedian(base, axis=1, keepdims=True)
+    level = np.nanmedian(matrix[:, :-window], axis=1, keepdims=True)
+    sigma = _robust_sigma(base, center, level)
+    return np.nan_to_num(np.nanmax(np.abs(residuals[:, -window:] - center) / sigma, axis=1))
+
+
+def mad_change_point(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Shift of the recent-window median from the baseline median, in robust sigmas.
+
+    Returns:
+        [B] level-shift magnitudes.
+    """
+    baseline, recent = matrix[:, :-window], matrix[:, -window:]
+    center = np.nanmedian(baseline, axis=1, keepdims=True)
+    sigma = _robust_sigma(baseline, center, center)
+    shift = np.abs(np.nanmedian(recent, axis=1, keepdims=True) - center) / sigma
+    return np.nan_to_num(shift[:, 0])
+
+
+class StatisticalDetector:
+    """Vectorised robust-statistics anomaly scorer."""
+
+    def __init__(
+        self,
+        window: int = 5,
+        history: int = 256,
+        z_floor: float = 3.0,
+        z_ceiling: float = 8.0,
+    ):
+        self.window = window          # recent points under test
+        self.history = history        # max points considered per series
+        self.z_floor = z_floor        # statistic mapping to score 0
+        self.z_ceiling = z_ceiling    # statistic mapping to score 100
+
+    def score_batch(self, rows: Union[np.ndarray, Sequence[Sequence[float]]]) -> np.ndarray:
+        """Screen score (0–100) per series; the max of the three checks."""
+        matrix = _as_matrix(rows, self.history)
+        scores = np.zeros(len(matrix))
+        if matrix.shape[1] < self.window + 3:
+            return scores
+        lengths = (~np.isnan(matrix)).sum(axis=1)
+        with warnings.catch_warnings():
+            # All-NaN baselines (very short series) are masked out below
+            warnings.simplefilter("ignore", RuntimeWarning)
+            stat = np.maximum.reduce([
+                robust_zscore(matrix, self.window),
+                ewma_residuals(matrix, self.window),
+                mad_change_point(matrix, self.window),
+            ])
+        scaled = (stat - self.z_floor) / (self.z_ceiling - self.z_floor) * 100
+        scores = np.round(np.clip(scaled, 0.0, 100.0), 1)
+        # Too little history to judge
+        return np.where(lengths >= self.window + 3, scores, 0.0)
+
+    def forecast_batch(
+        self,
+        rows: Union[np.ndarray, Sequence[Sequence[float]]],
+        interval_seconds: int,
+        series_names: Optional[Sequence[str]] = None,
+        horizon: int = 60,
+    ) -> List[Optional[TotoForecast]]:
+        """Flat EWMA-level forecast with a robust p10/p90 band, plus screen score."""
+        names = list(series_names) if series_names else [f"metric_{i}" for i in range(len(rows))]
+        results: List[Optional[TotoForecast]] = [None] * len(rows)
+        keep = [i for i in range(len(rows)) if len(rows[i]) > 0]
+        if not keep:
+            return results
+        subset = rows[keep] if isinstance(rows, np.ndarray) else [rows[i] for i in keep]
+
+        matrix = _as_matrix(subset, self.history)
+        scores = self.score_batch(matrix)
+        level = ewma(matrix, alpha=0.3)[:, -1]
+        center = np.nanmedian(matrix, axis=1, keepdims=True)
+        sigma = _robust_sigma(matrix, center, center)[:, 0]
+        median = np.round(np.repeat(level[:, None], horizon, axis=1), 4)
+        lower = np.round(median - Z_P90 * sigma[:, None], 4)
+        upper = np.round(median + Z_P90 * sigma[:, None], 4)
+
+        for row, i in enumerate(keep):
+            score = float(scores[row])
+            results[i] = TotoForecast(
+                series_name=names[i],
+                historical=[float(v) for v in rows[i][-60:]],
+                predicted_median=median[row].tolist(),
+                lower_bound=lower[row].tolist(),
+                upper_bound=upper[row].tolist(),
+                anomaly_score=score,
+                is_anomalous=score > 70.0,
+                interval_seconds=interval_seconds,
+                model="statistical",
+            )
+        return results
+
+
+_detector: Optional[StatisticalDetector] = None
+
+
+def get_statistical_detector() -> StatisticalDetector:
+    """Return the shared StatisticalDetector instance."""
+    global _detector
+    if _detector is None:
+        _detector = StatisticalDetector()
+    return _detector
@@ -1,15 +1,32 @@
 """Datadog HTTP API integration."""
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator, Awaitable, Callable
 from datetime import datetime, timedelta
+import asyncio
+import json
+import re
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
 import httpx
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.integrations.ts_store import open_ts_store
 
 logger = get_logger(__name__)
 
 DD_BASE_URL = f"https://api.{settings.datadog_site or 'datadoghq.com'}"
 
+# Datadog's standard rollup intervals (seconds); a query returns at most ~300 points
+ROLLUP_INTERVALS = (
+    1, 2, 5, 10, 20, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200, 14400, 28800, 86400,
+)
+MAX_POINTS = 300
+_ROLLUP_RE = re.compile(r"\.rollup\(\s*\w+\s*,\s*(\d+)\s*\)")
+
 def _dd_headers() -> Dict[str, str]:
     return {
         "DD-API-KEY": settings.datadog_api_key or "",
@@ -18,32 +35,482 @@ def _dd_headers() -> Dict[str, str]:
     }
 
 
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so formatting differences share a cache entry."""
+    return " ".join((query or "").split())
+
+
+def rollup_interval(query: str, from_ts: int, to_ts: int) -> int:
+    """Rollup interval Datadog applies to ``query`` over the window.
+
+    An explicit ``.rollup(fn, N)`` wins; otherwise the smallest standard
+    interval that keeps the window within MAX_POINTS points.
+    """
+    match = _ROLLUP_RE.search(query or "")
+    if match:
+        return max(int(match.group(1)), 1)
+    needed = max(to_ts - from_ts, 1) / MAX_POINTS
+    return next((i for i in ROLLUP_INTERVALS if i >= needed), ROLLUP_INTERVALS[-1])
+
+
+def pin_rollup(query: str, step: int) -> str:
+    """``query`` with its rollup made explicit, so a shorter window keeps the same buckets.
+
+    Uses Datadog's default rollup: sum for ``.as_count()``, average otherwise.
+    """
+    if _ROLLUP_RE.search(query or ""):
+        return query
+    fn = "sum" if ".as_count()" in query else "avg"
+    return f"{query}.rollup({fn}, {step})"
+
+
+def align_window(from_ts: int, to_ts: int, step: int) -> Tuple[int, int]:
+    """Floor both ends of a window to ``step`` so nearby requests coincide."""
+    aligned_from = from_ts - from_ts % step
+    aligned_to = to_ts - to_ts % step
+    if aligned_to <= aligned_from:
+        aligned_to = aligned_from + step
+    return aligned_from, aligned_to
+
+
+def _dd_time(ts: int) -> str:
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _normalize_log(log: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten one logs-search API record into the mock log shape."""
+    attributes = log.get("attributes", {})
+    return {
+        "id": log.get("id", ""),
+        "message": attributes.get("message", ""),
+        "level": attributes.get("status", "info"),
+        "service": attributes.get("service", ""),
+        "timestamp": attributes.get("timestamp", ""),
+    }
+
+
+def _normalize_trace(trace: Dict[str, Any], service: Optional[str] = None) -> Dict[str, Any]:
+    """Flatten one APM API record into the mock trace shape."""
+    attributes = trace.get("attributes", {})
+    return {
+        "trace_id": trace.get("id", ""),
+        "service": attributes.get("service", service or ""),
+        "resource": attributes.get("resource_name", ""),
+        "start": attributes.get("start"),
+        "duration": attributes.get("duration", 0),
+        "status": attributes.get("status", "ok"),
+        "error": attributes.get("status") == "error",
+    }
+
+
+def _tag_value(tags: List[str], key: str) -> Optional[str]:
+    prefix = f"{key}:"
+    return next((t[len(prefix):] for t in tags if t.startswith(prefix)), None)
+
+
+def _normalize_deploy(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten one events API record into the mock deploy-marker shape (timestamp in ms)."""
+    tags = event.get("tags", [])
+    return {
+        "id": str(event.get("id", "")),
+        "title": event.get("title", ""),
+        "service": _tag_value(tags, "service"),
+        "version": _tag_value(tags, "version"),
+        "timestamp": int(event.get("date_happened", 0)) * 1000,
+        "tags": tags,
+    }
+
+
+def _next_cursor(data: Dict[str, Any]) -> Optional[str]:
+    return (data.get("meta") or {}).get("page", {}).get("after") or None
+
+
+# fetch_page(cursor) → (records, next cursor or None)
+PageFetcher = Callable[[Optional[str]], Awaitable[Tuple[List[Dict[str, Any]], Optional[str]]]]
+
+
+async def stream_pages(
+    fetch_page: PageFetcher,
+    max_records: int,
+    max_bytes: int,
+    prefetch: int = 2,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Follow a cursor until it runs out or the budget is spent, yielding pages.
+
+    A producer task fetches up to ``prefetch`` pages ahead into a bounded
+    queue, so a slow consumer pauses fetching instead of buffering the whole
+    scan. The budget counts records and their serialized size; the page that
+    crosses it is truncated and the scan stops. Closing the generator early
+    cancels the producer.
+    """
+    queue: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=max(prefetch, 1))
+    done = object()
+
+    async def produce() -> None:
+        cursor: Optional[str] = None
+        try:
+            while True:
+                records, cursor = await fetch_page(cursor)
+                if records:
+                    await queue.put(records)
+                if not cursor or not records:
+                    break
+        except Exception as exc:  # surfaced to the consumer
+            await queue.put(exc)
+        await queue.put(done)
+
+    producer = asyncio.get_running_loop().create_task(produce())
+    records_seen = bytes_seen = 0
+    try:
+        while records_seen < max_records and bytes_seen < max_bytes:
+            page = await queue.get()
+            if page is done:
+                break
+            if isinstance(page, Exception):
+                raise page
+            kept = []
+            for record in page:
+                if records_seen >= max_records or bytes_seen >= max_bytes:
+                    break
+                kept.append(record)
+                records_seen += 1
+                bytes_seen += len(json.dumps(record, default=str))
+            yield kept
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+
+
+class ResponseCache:
+    """TTL cache of Datadog API responses with negative caching of failures."""
+
+    def __init__(self, ttls: Dict[str, float], negative_ttl: float, maxsize: int = 1024):
+        self.ttls = ttls
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, Any, bool]]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kind: str, path: str, payload: Any) -> str:
+        return json.dumps([kind, path, payload], sort_keys=True, default=str)
+
+    def _count(self, kind: str, field: str) -> None:
+        counts = self._stats.setdefault(kind, {"hits": 0, "misses": 0, "negative_hits": 0})
+        counts[field] += 1
+
+    def get(self, key: str, kind: str) -> Tuple[bool, Any]:
+        """Return (hit, value); failed responses are served as hits until they expire."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._count(kind, "hits" if entry[2] else "negative_hits")
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self._count(kind, "misses")
+            return False, None
+
+    def put(self, key: str, kind: str, value: Any, ok: bool) -> None:
+        ttl = self.ttls.get(kind, 0.0) if ok else self.negative_ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value, ok)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            methods = {}
+            for kind, counts in self._stats.items():
+                lookups = counts["hits"] + counts["misses"] + counts["negative_hits"]
+                served = counts["hits"] + counts["negative_hits"]
+                methods[kind] = {
+                    **counts,
+                    "hit_rate": round(served / lookups, 3) if lookups else 0.0,
+                }
+            hits = sum(c["hits"] + c["negative_hits"] for c in self._stats.values())
+            lookups = hits + sum(c["misses"] for c in self._stats.values())
+            return {
+                "entries": len(self._entries),
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "methods": methods,
+            }
+
+
+# Priority of Datadog calls made in the current context: "interactive" or "background"
+_priority: ContextVar[str] = ContextVar("dd_priority", default="interactive")
+
+
+@contextmanager
+def dd_priority(priority: str):
+    """Run the enclosed Datadog calls at ``priority``.
+
+    Background calls (dashboard charts, the anomaly scanner) are held back
+    when an endpoint's rate-limit budget runs low, leaving the rest for
+    interactive investigation calls.
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class SkippedResponse(dict):
+    """Empty response of a request the rate-limit budget skipped or a 429 cut short.
+
+    Unlike a failure it is never cached, so the next refresh retries it.
+    """
+
+
+class RateLimitBudget:
+    """Per-endpoint request budget tracked from Datadog's X-RateLimit-* headers."""
+
+    def __init__(self, reserve: float, max_delay: float, max_retry_wait: float):
+        self.reserve = reserve
+        self.max_delay = max_delay
+        self.max_retry_wait = max_retry_wait
+        # endpoint → {limit, remaining, period, reset_at, blocked_until, delayed, throttled}
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+
+    def _state(self, endpoint: str) -> Dict[str, Any]:
+        return self._endpoints.setdefault(endpoint, {
+            "limit": None, "remaining": None, "period": None,
+            "reset_at": 0.0, "blocked_until": 0.0, "delayed": 0, "throttled": 0,
+        })
+
+    def wait_time(self, endpoint: str, priority: str, now: Optional[float] = None) -> float:
+        """Seconds a call should wait before it is sent (0 to send now)."""
+        state = self._endpoints.get(endpoint)
+        if state is None:
+            return 0.0
+        now = now or time.monotonic()
+        wait = max(state["blocked_until"] - now, 0.0)
+        if priority != "interactive" and state["limit"] and state["remaining"] is not None:
+            if state["remaining"] <= state["limit"] * self.reserve and state["reset_at"] > now:
+                wait = max(wait, state["reset_at"] - now)
+        return wait
+
+    async def acquire(self, endpoint: str, priority: str) -> bool:
+        """Wait for budget; False if the wait would exceed what ``priority`` tolerates."""
+        wait = self.wait_time(endpoint, priority)
+        if wait <= 0:
+            self._spend(endpoint)
+            return True
+        state = self._state(endpoint)
+        limit = self.max_delay if priority != "interactive" else self.max_retry_wait
+        if wait > limit:
+            state["throttled"] += 1
+            return False
+        state["delayed"] += 1
+        await asyncio.sleep(wait)
+        self._spend(endpoint)
+        return True
+
+    def _spend(self, endpoint: str) -> None:
+        # Count the call against the budget now so concurrent callers see it
+        state = self._endpoints.get(endpoint)
+        if state is not None and state["remaining"]:
+            state["remaining"] -= 1
+
+    def observe(self, endpoint: str, status_code: int, headers: Any) -> None:
+        """Update the budget from a response's rate-limit headers."""
+        state = self._state(endpoint)
+        now = time.monotonic()
+        for field, header in (
+            ("limit", "X-RateLimit-Limit"),
+            ("remaining", "X-RateLimit-Remaining"),
+            ("period", "X-RateLimit-Period"),
+        ):
+            value = _header_number(headers, header)
+            if value is not None:
+                state[field] = int(value)
+        reset = _header_number(headers, "X-RateLimit-Reset")
+        if reset is not None:
+            state["reset_at"] = now + reset
+        if status_code == 429:
+            retry_after = _header_number(headers, "Retry-After")
+            if retry_after is None:
+                retry_after = reset if reset is not None else 1.0
+            state["blocked_until"] = now + retry_after
+            state["remaining"] = 0
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            endpoint: {
+                "limit": s["limit"],
+                "remaining": s["remaining"],
+                "period": s["period"],
+                "reset_in": round(max(s["reset_at"] - now, 0.0), 1),
+                "blocked_for": round(max(s["blocked_until"] - now, 0.0), 1),
+                "delayed": s["delayed"],
+                "throttled": s["throttled"],
+            }
+            for endpoint, s in self._endpoints.items()
+        }
+
+
+def _header_number(headers: Any, name: str) -> Optional[float]:
+    try:
+        value = headers.get(name)
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
 class DatadogMCPClient:
     """Real Datadog HTTP API client with mock fallback."""
 
     def __init__(self):
         self.mode = settings.dd_mode
+        self.base_url = (settings.dd_api_url or DD_BASE_URL).rstrip("/")
         self._client = httpx.AsyncClient(timeout=15.0)
+        self._cache = ResponseCache(
+            settings.dd_cache_ttl, settings.dd_cache_negative_ttl
+        ) if settings.dd_cache_enabled else None
+        # Identical requests currently awaiting Datadog → their shared task
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._flight_stats = {"sent": 0, "coalesced": 0}
+        # Recently fetched metric series; later windows fetch only the new tail
+        self._store = open_ts_store()
+        self._ratelimit = RateLimitBudget(
+            settings.dd_ratelimit_reserve,
+            settings.dd_ratelimit_max_delay,
+            settings.dd_ratelimit_max_retry_wait,
+        )
 
-    async def _live_get(self, path: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        url = f"{DD_BASE_URL}{path}"
-        try:
-            resp = await self._client.get(url, headers=_dd_headers(), params=params or {})
-            resp.raise_for_status()
-            return resp.json()
-        except Exception as e:
-            logger.error(f"Datadog GET {path} failed: {e}")
-            return {}
+    def store_stats(self) -> Dict[str, Any]:
+        """Size and local-read/delta/full fetch counts of the time-series store."""
+        return (
+            {"enabled": False} if self._store is None else {"enabled": True, **self._store.stats()}
+        )
 
-    async def _live_post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
-        url = f"{DD_BASE_URL}{path}"
-        try:
-            resp = await self._client.post(url, headers=_dd_headers(), json=body)
-            resp.raise_for_status()
-            return resp.json()
-        except Exception as e:
-            logger.error(f"Datadog POST {path} failed: {e}")
-            return {}
+    def persist_store(self) -> None:
+        """Save the time-series store to ``ts_store_path`` (no-op if unset)."""
+        if self._store is not None and settings.ts_store_path:
+            try:
+                self._store.save(settings.ts_store_path)
+            except Exception as exc:
+                logger.warning(f"Time-series store save failed: {exc}")
+
+    def ratelimit_stats(self) -> Dict[str, Any]:
+        """Remaining rate-limit budget per endpoint, with delayed/throttled call counts."""
+        return self._ratelimit.stats()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit rates of the response cache (per method and overall) and coalescing counts."""
+        stats: Dict[str, Any] = {"enabled": self._cache is not None}
+        if self._cache is not None:
+            stats.update(self._cache.stats())
+        stats["coalescing"] = {**self._flight_stats, "in_flight": len(self._inflight)}
+        return stats
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Optional[Dict[str, Any]] = None,
+        cache_as: Optional[str] = None,
+    ) -> Any:
+        """Send one API request, served from the response cache when possible.
+
+        Identical requests already in flight share one task: the first caller
+        sends it and every later caller awaits the same result. The shared
+        task is shielded so one caller's cancellation does not cancel it for
+        the others.
+
+        Errors are logged and returned as ``{}`` (and negatively cached), so
+        callers keep their mock-compatible fallbacks. Requests the rate-limit
+        budget skips return an empty ``SkippedResponse``, which is never cached.
+        """
+        key = ResponseCache.key(
+            cache_as or "", f"{method} {path}", params if body is None else body
+        )
+        if self._cache is not None and cache_as:
+            hit, cached = self._cache.get(key, cache_as)
+            if hit:
+                return cached
+
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(self._send(method, path, params, body, key, cache_as))
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._landed, key))
+            self._flight_stats["sent"] += 1
+        else:
+            self._flight_stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _landed(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]],
+        body: Optional[Dict[str, Any]],
+        key: str,
+        cache_as: Optional[str],
+    ) -> Any:
+        url = f"{self.base_url}{path}"
+        priority = _priority.get()
+        for attempt in range(2):
+            if not await self._ratelimit.acquire(path, priority):
+                # Over budget for this priority: skip without caching, so the
+                # next refresh tries again once the window resets
+                logger.warning(
+                    f"Datadog {method} {path} skipped: rate limit budget exhausted ({priority})"
+                )
+                return SkippedResponse()
+            ok = True
+            status = 0
+            try:
+                if method == "GET":
+                    resp = await self._client.get(url, headers=_dd_headers(), params=params or {})
+                else:
+                    resp = await self._client.post(url, headers=_dd_headers(), json=body)
+                status = resp.status_code
+                self._ratelimit.observe(path, status, resp.headers)
+                resp.raise_for_status()
+                data = resp.json()
+            except Exception as e:
+                logger.error(f"Datadog {method} {path} failed: {e}")
+                data, ok = {}, False
+            # A 429 is retried once after Retry-After (acquire() waits it out
+            # or gives up); it is never negatively cached
+            if status != 429:
+                break
+        else:
+            return SkippedResponse()
+
+        if self._cache is not None and cache_as:
+            self._cache.put(key, cache_as, data, ok)
+        return data
+
+    async def _live_get(
+        self, path: str, params: Dict[str, Any] = None, cache_as: Optional[str] = None
+    ) -> Dict[str, Any]:
+        return await self._request("GET", path, params=params, cache_as=cache_as)
+
+    async def _live_post(
+        self, path: str, body: Dict[str, Any], cache_as: Optional[str] = None
+    ) -> Dict[str, Any]:
+        return await self._request("POST", path, body=body, cache_as=cache_as)
 
     async def _mock_call(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         from app.integrations.mock_data.generator import generate_mock_response
@@ -57,7 +524,7 @@ class DatadogMCPClient:
             return result.get("monitors", [])
 
         params = {"with_downtimes": "false", "monitor_tags": "service:demo-service"}
-        data = await self._live_get("/api/v1/monitor", params)
+        data = await self._live_get("/api/v1/monitor", params, cache_as="get_active_monitors")
         if isinstance(data, list):
             return [
                 {
@@ -77,7 +544,7 @@ class DatadogMCPClient:
             result = await self._mock_call("get_monitor_details", {"monitor_id": monitor_id})
             return result.get("monitor", {})
 
-        data = await self._live_get(f"/api/v1/monitor/{monitor_id}")
+        data = await self._live_get(f"/api/v1/monitor/{monitor_id}", cache_as="get_monitor_details")
         if data:
             return {
                 "id": str(data.get("id", "")),
@@ -98,15 +565,279 @@ class DatadogMCPClient:
             from_ts = int((datetime.now() - timedelta(hours=1)).timestamp())
         if to_ts is None:
             to_ts = int(datetime.now().timestamp())
+        # Align to the rollup so the same query from different callers shares a window
+        from_ts, to_ts = align_window(from_ts, to_ts, rollup_interval(query, from_ts, to_ts))
 
         if self.mode != "live":
             result = await self._mock_call("query_metrics", {"query": query, "from_ts": from_ts, "to_ts": to_ts})
             return result.get("metrics", [])
 
-        params = {"query": query, "from": from_ts, "to": to_ts}
-        data = await self._live_get("/api/v1/query", params)
+        if self._store is not None:
+            return (await self._query_stored([query], from_ts, to_ts))[0]
+        params = {"query": normalize_query(query), "from": from_ts, "to": to_ts}
+        data = await self._live_get("/api/v1/query", params, cache_as="query_metrics")
         return data.get("series", [])
 
+    async def query_metrics_many(
+        self,
+        queries: List[str],
+        from_ts: Optional[int] = None,
+        to_ts: Optional[int] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """Fetch several metric queries in as few requests as possible.
+
+        Queries whose rollup-aligned windows coincide are packed into one
+        comma-separated ``/api/v1/query`` request (up to
+        ``dd_max_queries_per_request`` each) and the response series are
+        split back out by ``query_index``. Queries already in the response
+        cache are not re-sent, and every fetched query is cached on its own
+        so later ``query_metrics`` calls hit it. A query whose identical
+        single ``query_metrics`` request is already in flight awaits that
+        request instead, and single requests arriving while a packed one is
+        in flight await their share of it. Packed requests skipped by the
+        rate-limit budget are not cached, so the next refresh retries them.
+
+        Returns:
+            One series list per input query, in input order.
+        """
+        if from_ts is None:
+            from_ts = int((datetime.now() - timedelta(hours=1)).timestamp())
+        if to_ts is None:
+            to_ts = int(datetime.now().timestamp())
+
+        if self.mode == "live" and self._store is not None:
+            return await self._query_stored(queries, from_ts, to_ts)
+
+        results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        # Requests can only share a window: group queries by their aligned one
+        windows: Dict[Tuple[int, int], List[int]] = {}
+        for i, query in enumerate(queries):
+            window = align_window(from_ts, to_ts, rollup_interval(query, from_ts, to_ts))
+            windows.setdefault(window, []).append(i)
+
+        for (start, end), indices in windows.items():
+            if self.mode != "live":
+                result = await self._mock_call(
+                    "query_metrics_many",
+                    {"queries": [queries[i] for i in indices], "from_ts": start, "to_ts": end},
+                )
+                for series in result.get("metrics", []):
+                    results[indices[series.get("query_index", 0)]].append(series)
+                continue
+
+            loop = asyncio.get_running_loop()
+            keys = {
+                i: ResponseCache.key(
+                    "query_metrics", "GET /api/v1/query",
+                    {"query": normalize_query(queries[i]), "from": start, "to": end},
+                )
+                for i in indices
+            }
+            pending, joined = [], {}
+            for i in indices:
+                hit, cached = (False, None)
+                if self._cache is not None:
+                    hit, cached = self._cache.get(keys[i], "query_metrics")
+                if hit:
+                    results[i] = (cached or {}).get("series", [])
+                    continue
+                task = self._inflight.get(keys[i])
+                if task is not None and task.get_loop() is loop:
+                    joined[i] = task
+                    self._flight_stats["coalesced"] += 1
+                else:
+                    pending.append(i)
+
+            # Publish every packed query under its single-query key so identical
+            # query_metrics calls made meanwhile share this fetch. The fetch runs
+            # as its own task so cancelling this caller does not cancel it for them.
+            if pending:
+                shares = {i: self._publish(keys[i]) for i in pending}
+                fetch = loop.create_task(self._fetch_packed(
+                    {i: normalize_query(queries[i]) for i in pending}, start, end, keys, shares
+                ))
+                for i, series_list in (await asyncio.shield(fetch)).items():
+                    results[i] = series_list
+
+            for i, task in joined.items():
+                data = await asyncio.shield(task)
+                results[i] = data.get("series", []) if isinstance(data, dict) else []
+        return results
+
+    async def _fetch_packed(
+        self,
+        sent: Dict[int, str],
+        start: int,
+        end: int,
+        keys: Dict[int, str],
+        shares: Dict[int, asyncio.Future],
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """Fetch ``sent`` (index → query) over one window in packed requests.
+
+        Each query's share is resolved as soon as its chunk lands.
+        """
+        found: Dict[int, List[Dict[str, Any]]] = {}
+        indices = list(sent)
+        try:
+            size = max(settings.dd_max_queries_per_request, 1)
+            for lo in range(0, len(indices), size):
+                chunk = indices[lo:lo + size]
+                params = {"query": ",".join(sent[i] for i in chunk), "from": start, "to": end}
+                data = await self._live_get("/api/v1/query", params)
+                per_query: List[List[Dict[str, Any]]] = [[] for _ in chunk]
+                for series in data.get("series", []) if isinstance(data, dict) else []:
+                    index = series.get("query_index", 0)
+                    if 0 <= index < len(chunk):
+                        per_query[index].append(series)
+                for i, series_list in zip(chunk, per_query):
+                    found[i] = series_list
+                    self._resolve(keys[i], shares[i], {"series": series_list} if data else data)
+                    # Chunks skipped over budget or cut short by a 429 are not
+                    # cached, so the next refresh retries them
+                    if self._cache is not None and not isinstance(data, SkippedResponse):
+                        self._cache.put(
+                            keys[i], "query_metrics", {"series": series_list}, ok=bool(data)
+                        )
+        finally:
+            for i in indices:
+                self._resolve(keys[i], shares[i], {})
+        return found
+
+    def _publish(self, key: str) -> asyncio.Future:
+        """Register a future as the in-flight request for ``key``; settle it with ``_resolve``."""
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
+
+    def _resolve(self, key: str, future: asyncio.Future, data: Any) -> None:
+        """Hand ``data`` to everyone awaiting ``future`` and retire it (no-op once settled)."""
+        if not future.done():
+            future.set_result(data)
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    async def _query_stored(
+        self, queries: List[str], from_ts: int, to_ts: int
+    ) -> List[List[Dict[str, Any]]]:
+        """Serve metric queries through the local time-series store.
+
+        Each query's rollup-aligned window is looked up in the response cache
+        first. On a miss the store decides what to fetch: nothing when it
+        already covers the window, only the tail since its last bucket (with
+        the rollup pinned so the buckets match) when it holds an earlier
+        window, else the full window. Fetches sharing a window are packed
+        into comma-separated requests as in ``query_metrics_many``, and an
+        identical query already being fetched is awaited instead of re-sent.
+        """
+        store = self._store
+        loop = asyncio.get_running_loop()
+        results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        # (fetch_from, fetch_to) → [(index, sent query, aligned window, step, is_delta, cache key)]
+        fetches: Dict[Tuple[int, int], List[Tuple[int, str, Tuple[int, int], int, bool, str]]] = {}
+        joined: Dict[int, asyncio.Future] = {}
+        shares: Dict[int, asyncio.Future] = {}
+        for i, query in enumerate(queries):
+            query = normalize_query(query)
+            step = rollup_interval(query, from_ts, to_ts)
+            window = align_window(from_ts, to_ts, step)
+            key = ResponseCache.key(
+                "query_metrics",
+                "GET /api/v1/query",
+                {"query": query, "from": window[0], "to": window[1]},
+            )
+            if self._cache is not None:
+                hit, cached = self._cache.get(key, "query_metrics")
+                if hit:
+                    results[i] = (cached or {}).get("series", [])
+                    continue
+            task = self._inflight.get(key)
+            if task is not None and task.get_loop() is loop:
+                joined[i] = task
+                self._flight_stats["coalesced"] += 1
+                continue
+            plan = store.plan(query, window[0], window[1], step)
+            if plan is None:
+                results[i] = store.read(query, *window)
+                if self._cache is not None:
+                    self._cache.put(key, "query_metrics", {"series": results[i]}, ok=True)
+                continue
+            fetch_from, fetch_to, is_delta = plan
+            # Every stored fetch pins its rollup, so full and delta fetches share buckets
+            sent = pin_rollup(query, step)
+            fetches.setdefault((fetch_from, fetch_to), []).append(
+                (i, sent, window, step, is_delta, key)
+            )
+            shares[i] = self._publish(key)
+
+        if fetches:
+            # Its own task, so cancelling this caller does not cancel it for joined ones
+            fetched = await asyncio.shield(
+                loop.create_task(self._fetch_stored(queries, fetches, shares))
+            )
+            for i, series_list in fetched.items():
+                results[i] = series_list
+
+        for i, task in joined.items():
+            data = await asyncio.shield(task)
+            results[i] = data.get("series", []) if isinstance(data, dict) else []
+        return results
+
+    async def _fetch_stored(
+        self,
+        queries: List[str],
+        fetches: Dict[Tuple[int, int], List[Tuple[int, str, Tuple[int, int], int, bool, str]]],
+        shares: Dict[int, asyncio.Future],
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """Run the packed fetches planned by ``_query_stored``, merge and resolve each share."""
+        store = self._store
+        found: Dict[int, List[Dict[str, Any]]] = {}
+        planned = [(i, key) for items in fetches.values() for i, *_, key in items]
+        try:
+            size = max(settings.dd_max_queries_per_request, 1)
+            while fetches:
+                retry: Dict[Tuple[int, int], List[Any]] = {}
+                for (fetch_from, fetch_to), items in fetches.items():
+                    for lo in range(0, len(items), size):
+                        chunk = items[lo:lo + size]
+                        params = {
+                            "query": ",".join(item[1] for item in chunk),
+                            "from": fetch_from,
+                            "to": fetch_to,
+                        }
+                        data = await self._live_get("/api/v1/query", params)
+                        per_query: List[List[Dict[str, Any]]] = [[] for _ in chunk]
+                        for series in data.get("series", []) if isinstance(data, dict) else []:
+                            index = series.get("query_index", 0) if len(chunk) > 1 else 0
+                            if 0 <= index < len(chunk):
+                                per_query[index].append(series)
+                        for item, series_list in zip(chunk, per_query):
+                            i, sent, window, step, is_delta, key = item
+                            query = normalize_query(queries[i])
+                            merged = bool(data) and store.merge(
+                                query, series_list, fetch_from, fetch_to, step, is_delta,
+                                read_from=window[0],
+                            )
+                            if data and not merged:
+                                # The stored base was evicted or cut short since plan(); the
+                                # delta alone would serve just the tail, so fetch it all
+                                retry.setdefault(window, []).append(
+                                    (i, sent, window, step, False, key)
+                                )
+                                continue
+                            found[i] = store.read(query, *window) if data else []
+                            self._resolve(key, shares[i], {"series": found[i]} if data else data)
+                            # Skipped or throttled fetches are not cached; the next refresh
+                            # retries them
+                            if self._cache is not None and not isinstance(data, SkippedResponse):
+                                self._cache.put(
+                                    key, "query_metrics", {"series": found[i]}, ok=bool(data)
+                                )
+                fetches = retry
+        finally:
+            for i, key in planned:
+                self._resolve(key, shares[i], {})
+        return found
+
     async def search_logs(
         self,
         query: str,
@@ -118,31 +849,18 @@ class DatadogMCPClient:
             from_ts = int((datetime.now() - timedelta(hours=1)).timestamp())
         if to_ts is None:
             to_ts = int(datetime.now().timestamp())
+        from_ts, to_ts = align_window(from_ts, to_ts, settings.dd_cache_bucket_seconds)
 
         if self.mode != "live":
             result = await self._mock_call("search_logs", {"query": query, "from_ts": from_ts, "to_ts": to_ts, "limit": limit})
             return result.get("logs", [])
 
         body = {
-            "filter": {
-                "query": query,
-                "from": datetime.fromtimestamp(from_ts).strftime("%Y-%m-%dT%H:%M:%SZ"),
-                "to": datetime.fromtimestamp(to_ts).strftime("%Y-%m-%dT%H:%M:%SZ"),
-            },
+            "filter": {"query": query, "from": _dd_time(from_ts), "to": _dd_time(to_ts)},
             "page": {"limit": limit},
         }
-        data = await self._live_post("/api/v2/logs/events/search", body)
-        logs = data.get("data", [])
-        return [
-            {
-                "id": log.get("id", ""),
-                "message": log.get("attributes", {}).get("message", ""),
-                "level": log.get("attributes", {}).get("status", "info"),
-                "service": log.get("attributes", {}).get("service", ""),
-                "timestamp": log.get("attributes", {}).get("timestamp", ""),
-            }
-            for log in logs
-        ]
+        data = await self._live_post("/api/v2/logs/events/search", body, cache_as="search_logs")
+        return [_normalize_log(log) for log in data.get("data", [])]
 
     async def fetch_traces(
         self,
@@ -156,30 +874,114 @@ class DatadogMCPClient:
             from_ts = int((datetime.now() - timedelta(hours=1)).timestamp())
         if to_ts is None:
             to_ts = int(datetime.now().timestamp())
+        from_ts, to_ts = align_window(from_ts, to_ts, settings.dd_cache_bucket_seconds)
 
         if self.mode != "live":
             result = await self._mock_call("fetch_traces", {"service": service, "resource": resource, "from_ts": from_ts, "to_ts": to_ts, "limit": limit})
             return result.get("traces", [])
 
         params = {
-            "filter[from]": datetime.fromtimestamp(from_ts).strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "filter[to]": datetime.fromtimestamp(to_ts).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "filter[from]": _dd_time(from_ts),
+            "filter[to]": _dd_time(to_ts),
             "page[limit]": min(limit, 1000),
         }
         if service:
             params["filter[service]"] = service
-        data = await self._live_get("/api/v2/apm/traces", params)
-        traces = data.get("data", [])
-        return [
-            {
-                "trace_id": t.get("id", ""),
-                "service": t.get("attributes", {}).get("service", service or ""),
-                "resource": t.get("attributes", {}).get("resource_name", ""),
-                "duration": t.get("attributes", {}).get("duration", 0),
-                "status": t.get("attributes", {}).get("status", "ok"),
+        data = await self._live_get("/api/v2/apm/traces", params, cache_as="fetch_traces")
+        return [_normalize_trace(t, service) for t in data.get("data", [])]
+
+    # ── Streaming (cursor-paginated) ──────────────────────────────────────────
+
+    def _stream_window(self, from_ts: Optional[int], to_ts: Optional[int]) -> Tuple[int, int]:
+        if from_ts is None:
+            from_ts = int((datetime.now() - timedelta(hours=1)).timestamp())
+        if to_ts is None:
+            to_ts = int(datetime.now().timestamp())
+        return align_window(from_ts, to_ts, settings.dd_cache_bucket_seconds)
+
+    def iter_logs(
+        self,
+        query: str,
+        from_ts: Optional[int] = None,
+        to_ts: Optional[int] = None,
+        max_records: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        page_size: Optional[int] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream matching logs page by page, following the search cursor.
+
+        Stops once ``max_records`` records or ``max_bytes`` of serialized
+        records have been yielded (defaults: ``dd_stream_max_records`` /
+        ``dd_stream_max_bytes``).
+        """
+        from_ts, to_ts = self._stream_window(from_ts, to_ts)
+        page_size = page_size or settings.dd_stream_page_size
+
+        async def fetch_page(cursor: Optional[str]):
+            if self.mode != "live":
+                result = await self._mock_call("search_logs_page", {
+                    "query": query, "from_ts": from_ts, "to_ts": to_ts,
+                    "limit": page_size, "cursor": cursor,
+                })
+                return result.get("logs", []), result.get("next_cursor")
+            page: Dict[str, Any] = {"limit": page_size}
+            if cursor:
+                page["cursor"] = cursor
+            body = {
+                "filter": {"query": query, "from": _dd_time(from_ts), "to": _dd_time(to_ts)},
+                "page": page,
+            }
+            data = await self._live_post("/api/v2/logs/events/search", body, cache_as="search_logs")
+            return [_normalize_log(log) for log in data.get("data", [])], _next_cursor(data)
+
+        return stream_pages(
+            fetch_page,
+            max_records or settings.dd_stream_max_records,
+            max_bytes or settings.dd_stream_max_bytes,
+            settings.dd_stream_prefetch_pages,
+        )
+
+    def iter_traces(
+        self,
+        service: Optional[str] = None,
+        from_ts: Optional[int] = None,
+        to_ts: Optional[int] = None,
+        max_records: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        page_size: Optional[int] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream traces page by page, following the ``page[cursor]`` cursor.
+
+        Budgeted like ``iter_logs``.
+        """
+        from_ts, to_ts = self._stream_window(from_ts, to_ts)
+        page_size = min(page_size or settings.dd_stream_page_size, 1000)
+
+        async def fetch_page(cursor: Optional[str]):
+            if self.mode != "live":
+                result = await self._mock_call("fetch_traces_page", {
+                    "service": service, "from_ts": from_ts, "to_ts": to_ts,
+                    "limit": page_size, "cursor": cursor,
+                })
+                return result.get("traces", []), result.get("next_cursor")
+            params: Dict[str, Any] = {
+                "filter[from]": _dd_time(from_ts),
+                "filter[to]": _dd_time(to_ts),
+                "page[limit]": page_size,
             }
-            for t in traces
-        ]
+            if service:
+                params["filter[service]"] = service
+            if cursor:
+                params["page[cursor]"] = cursor
+            data = await self._live_get("/api/v2/apm/traces", params, cache_as="fetch_traces")
+            return [_normalize_trace(t, service) for t in data.get("data", [])], _next_cursor(data)
+
+        return stream_pages(
+            fetch_page,
+            max_records or settings.dd_stream_max_records,
+            max_bytes or settings.dd_stream_max_bytes,
+            settings.dd_stream_prefetch_pages,
+        )
 
     async def get_service_dependencies(
         self,
@@ -190,7 +992,23 @@ class DatadogMCPClient:
         if self.mode != "live":
             result = await self._mock_call("get_service_dependencies", {"service": service, "from_ts": from_ts, "to_ts": to_ts})
             return result.get("dependencies", {})
-        return {}
+
+        params: Dict[str, Any] = {"env": settings.dd_apm_env}
+        if from_ts is not None:
+            params["start"] = from_ts
+        if to_ts is not None:
+            params["end"] = to_ts
+        data = await self._live_get(
+            f"/api/v1/service_dependencies/{service}", params, cache_as="get_service_dependencies"
+        )
+        if not data:
+            return {}
+        # The APM API lists names only; call and error counts are mock-only
+        return {
+            "service": data.get("name", service),
+            "dependencies": [{"service": s, "type": "http"} for s in data.get("calls", [])],
+            "dependents": [{"service": s, "type": "http"} for s in data.get("called_by", [])],
+        }
 
     async def get_deploy_markers(
         self,
@@ -201,6 +1019,7 @@ class DatadogMCPClient:
             from_ts = int((datetime.now() - timedelta(hours=1)).timestamp())
         if to_ts is None:
             to_ts = int(datetime.now().timestamp())
+        from_ts, to_ts = align_window(from_ts, to_ts, settings.dd_cache_bucket_seconds)
 
         if self.mode != "live":
             result = await self._mock_call("get_deploy_markers", {"from_ts": from_ts, "to_ts": to_ts})
@@ -211,17 +1030,8 @@ class DatadogMCPClient:
             "end": to_ts,
             "tags": "deployment",
         }
-        data = await self._live_get("/api/v1/events", params)
-        events = data.get("events", [])
-        return [
-            {
-                "id": str(e.get("id", "")),
-                "title": e.get("title", ""),
-                "timestamp": e.get("date_happened", 0),
-                "tags": e.get("tags", []),
-            }
-            for e in events
-        ]
+        data = await self._live_get("/api/v1/events", params, cache_as="get_deploy_markers")
+        return [_normalize_deploy(e) for e in data.get("events", [])]
 
 
 _datadog_client: Optional[DatadogMCPClient] = None
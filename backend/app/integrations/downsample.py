@@ -0,0 +1,100 @@
+"""Largest-Triangle-Three-Buckets downsampling for chart payloads.
+
+LTTB keeps the first and last point and, for each of ``n_out - 2`` equal
+buckets in between, the point forming the largest triangle with the point
+kept from the previous bucket and the mean of the next bucket. Peaks and
+dips survive, which plain striding or bucket means flatten.
+
+Bucket means come from cumulative sums in one pass; only the choice of the
+kept point walks the buckets (each step depends on the previous one).
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the ``n_out`` points LTTB keeps (all of them if already small enough)."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # n_out - 2 buckets over the interior points 1 .. n-2
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    cy = np.concatenate([[0.0], np.cumsum(y)])
+    sizes = ends - starts
+    mean_x = (cx[ends] - cx[starts]) / sizes
+    mean_y = (cy[ends] - cy[starts]) / sizes
+    # The third vertex for bucket i is the next bucket's mean (the last point for the final bucket)
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        s, e = starts[i], ends[i]
+        area = np.abs(
+            (x[a] - next_x[i]) * (y[s:e] - y[a]) - (x[a] - x[s:e]) * (next_y[i] - y[a])
+        )
+        a = s + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def lttb(timestamps: np.ndarray, values: np.ndarray, n_out: int) -> np.ndarray:
+    """``[[timestamp, value], ...]`` array downsampled to ``n_out`` points; NaNs are dropped."""
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    keep = ~np.isnan(values)
+    timestamps, values = timestamps[keep], values[keep]
+    idx = lttb_indices(timestamps, values, n_out)
+    return np.column_stack([timestamps[idx], values[idx]])
+
+
+def downsample_pointlist(pointlist: List[Any], points: Optional[int]) -> List[Any]:
+    """Downsample a Datadog ``[[ts, value|null], ...]`` pointlist (as-is if ``points`` is None)."""
+    if not points or len(pointlist) <= points:
+        return pointlist
+    ts = np.fromiter((p[0] for p in pointlist), dtype=np.float64, count=len(pointlist))
+    vals = np.fromiter(
+        (np.nan if p[1] is None else p[1] for p in pointlist),
+        dtype=np.float64,
+        count=len(pointlist),
+    )
+    return lttb(ts, vals, points).tolist()
+
+
+def downsample_series(series: Dict[str, Any], points: Optional[int]) -> Dict[str, Any]:
+    """A Datadog series with its pointlist downsampled to ``points``."""
+    if not points or not isinstance(series, dict) or "pointlist" not in series:
+        return series
+    return {**series, "pointlist": downsample_pointlist(series["pointlist"], points)}
+
+
+def downsample_forecast(forecast: Dict[str, Any], points: Optional[int]) -> Dict[str, Any]:
+    """A dumped TotoForecast with history and forecast band each cut to ``points``.
+
+    The band keeps the indices chosen on the median for the lower and upper
+    bounds too, so the three lines stay aligned; the kept positions are
+    returned as ``historical_index`` / ``forecast_index``.
+    """
+    if not points:
+        return forecast
+    out = dict(forecast)
+    historical = np.asarray(forecast.get("historical") or [], dtype=np.float64)
+    if len(historical) > points:
+        idx = lttb_indices(np.arange(len(historical)), historical, points)
+        out["historical"] = historical[idx].tolist()
+        out["historical_index"] = idx.tolist()
+    median = np.asarray(forecast.get("predicted_median") or [], dtype=np.float64)
+    if len(median) > points:
+        idx = lttb_indices(np.arange(len(median)), median, points)
+        for field in ("predicted_median", "lower_bound", "upper_bound"):
+            out[field] = np.asarray(forecast[field], dtype=np.float64)[idx].tolist()
+        out["forecast_index"] = idx.tolist()
+    return out
@@ -0,0 +1,226 @@
+"""Streaming log template mining (Drain).
+
+Log lines from one incident are mostly a handful of message shapes with
+different values filled in. ``LogTemplateMiner`` groups messages into
+templates in which variable tokens are replaced by ``<*>``, counting each
+template's lines, first/last timestamps, levels and services and keeping a
+few example parameter values. Pages can be added as they stream in.
+
+Drain routes each message down a fixed-depth tree (token count, then the
+first few tokens) to a short list of candidate templates, and joins the
+most similar one if enough positions match; otherwise it starts a new
+template. Joining a template turns the positions that differ into ``<*>``.
+Tokens that look like values (numbers, hex ids, IPs, UUIDs) are masked
+before matching, so they never split templates.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+WILDCARD = "<*>"
+
+_MASKS = [
+    re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I),  # UUID
+    re.compile(r"^\d{1,3}(\.\d{1,3}){3}(:\d+)?$"),                                       # IP[:port]
+    re.compile(r"^(0x)?[0-9a-f]{12,}$", re.I),                                           # hex id
+    re.compile(r"^[-+]?\d+(\.\d+)?(ms|s|%|b|kb|mb)?$", re.I),                            # number
+]
+_SPLIT = re.compile(r"[\s=,()\[\]{}\"']+")
+_PUNCT = ".:;!?"
+
+
+def tokenize(message: str) -> List[str]:
+    """Split a message into tokens (whitespace and ``= , ( ) [ ] { }`` quotes separate)."""
+    return [t for t in _SPLIT.split(message) if t]
+
+
+def _masked(token: str) -> str:
+    core = token.strip(_PUNCT)
+    if core and any(p.match(core) for p in _MASKS):
+        return WILDCARD
+    return token
+
+
+def _timestamp_ms(value: Any) -> Optional[int]:
+    """Milliseconds from a mock epoch-ms number or a live ISO timestamp."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str) and value:
+        try:
+            return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000)
+        except ValueError:
+            return None
+    return None
+
+
+@dataclass
+class LogTemplate:
+    template_id: int
+    tokens: List[str]
+    count: int = 0
+    first_seen: Optional[int] = None    # epoch ms
+    last_seen: Optional[int] = None
+    levels: Counter = field(default_factory=Counter)
+    services: Counter = field(default_factory=Counter)
+    # Tokens of the first few distinct lines
+    examples: List[List[str]] = field(default_factory=list)
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+    def similarity(self, tokens: List[str]) -> Tuple[float, int]:
+        """(share of positions matching exactly, wildcard positions) vs a same-length message."""
+        same = wildcards = 0
+        for mine, theirs in zip(self.tokens, tokens):
+            if mine == WILDCARD:
+                wildcards += 1
+            elif mine == theirs:
+                same += 1
+        return same / len(tokens), wildcards
+
+    def absorb(self, tokens: List[str]) -> None:
+        self.tokens = [
+            mine if mine == theirs else WILDCARD for mine, theirs in zip(self.tokens, tokens)
+        ]
+
+    def params(self, tokens: List[str]) -> List[str]:
+        """Values a message fills the template's wildcards with."""
+        return [tok for tok, slot in zip(tokens, self.tokens) if slot == WILDCARD]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "template_id": self.template_id,
+            "template": self.template,
+            "count": self.count,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "levels": dict(self.levels),
+            "services": dict(self.services),
+            # Read against the current template: wildcards added after a line was kept still show
+            "example_params": [p for p in (self.params(e) for e in self.examples) if p],
+        }
+
+
+class LogTemplateMiner:
+    """Incremental Drain template miner over log records or raw messages."""
+
+    def __init__(
+        self,
+        depth: Optional[int] = None,
+        sim_threshold: Optional[float] = None,
+        max_children: int = 100,
+        max_examples: int = 3,
+    ):
+        self.depth = max(depth if depth is not None else settings.log_template_depth, 3)
+        self.sim_threshold = (
+            sim_threshold if sim_threshold is not None else settings.log_template_sim_threshold
+        )
+        self.max_children = max_children
+        self.max_examples = max_examples
+        self._tree: Dict[Any, Any] = {}
+        self._templates: List[LogTemplate] = []
+        self._exact: Dict[Tuple[str, ...], LogTemplate] = {}  # masked token tuple → its template
+        self.lines = 0
+
+    # ── Feeding ──────────────────────────────────────────────────────────────
+
+    def add(self, record: Dict[str, Any]) -> LogTemplate:
+        """Mine one normalized log record (``message``, ``level``, ``service``, ``timestamp``)."""
+        return self.add_message(
+            record.get("message", ""),
+            timestamp=record.get("timestamp"),
+            level=record.get("level"),
+            service=record.get("service"),
+        )
+
+    def add_many(self, records: Iterable[Dict[str, Any]]) -> None:
+        for record in records:
+            self.add(record)
+
+    def add_message(
+        self,
+        message: str,
+        timestamp: Any = None,
+        level: Optional[str] = None,
+        service: Optional[str] = None,
+    ) -> LogTemplate:
+        raw = tokenize(message) or [""]
+        masked = [_masked(t) for t in raw]
+        key = tuple(masked)
+        template = self._exact.get(key)
+        if template is None:
+            template = self._match(masked)
+            if len(self._exact) < 100_000:
+                self._exact[key] = template
+
+        self.lines += 1
+        template.count += 1
+        ts = _timestamp_ms(timestamp)
+        if ts is not None:
+            template.first_seen = (
+                ts if template.first_seen is None else min(template.first_seen, ts)
+            )
+            template.last_seen = ts if template.last_seen is None else max(template.last_seen, ts)
+        if level:
+            template.levels[level] += 1
+        if service:
+            template.services[service] += 1
+        if len(template.examples) < self.max_examples and raw not in template.examples:
+            template.examples.append(raw)
+        return template
+
+    def _leaf(self, tokens: List[str]) -> List[LogTemplate]:
+        """The candidate list for a message: by token count, then its first ``depth - 2`` tokens."""
+        node = self._tree.setdefault(len(tokens), {})
+        for token in tokens[: self.depth - 2]:
+            if any(ch.isdigit() for ch in token):
+                token = WILDCARD
+            if token not in node:
+                # Bound the fan-out: once a node is full, new prefixes share the wildcard branch
+                token = token if len(node) < self.max_children - 1 else WILDCARD
+            node = node.setdefault(token, {})
+        return node.setdefault(None, [])
+
+    def _match(self, tokens: List[str]) -> LogTemplate:
+        candidates = self._leaf(tokens)
+        best, best_key = None, (-1.0, -1)
+        for template in candidates:
+            key = template.similarity(tokens)
+            if key > best_key:
+                best, best_key = template, key
+        if best is not None and best_key[0] >= self.sim_threshold:
+            best.absorb(tokens)
+            return best
+        template = LogTemplate(template_id=len(self._templates) + 1, tokens=list(tokens))
+        candidates.append(template)
+        self._templates.append(template)
+        return template
+
+    # ── Reading ──────────────────────────────────────────────────────────────
+
+    def templates(self) -> List[LogTemplate]:
+        """All templates, most frequent first."""
+        return sorted(self._templates, key=lambda t: (-t.count, t.template_id))
+
+    def summary(self, top: Optional[int] = None) -> Dict[str, Any]:
+        """Compact view for prompts and API payloads: the ``top`` templates plus totals."""
+        top = top if top is not None else settings.log_templates_top
+        ranked = self.templates()
+        return {
+            "lines": self.lines,
+            "template_count": len(ranked),
+            "templates": [t.to_dict() for t in ranked[:top]],
+            "other_lines": sum(t.count for t in ranked[top:]),
+        }
+
+
+def mine_templates(records: Iterable[Dict[str, Any]], top: Optional[int] = None) -> Dict[str, Any]:
+    """Template summary of a batch of log records."""
+    miner = LogTemplateMiner()
+    miner.add_many(records)
+    return miner.summary(top)
@@ -1,26 +1,121 @@
-"""Mock data generator for Datadog operations."""
-from typing import Dict, Any, List, Optional
+"""Mock data generator for Datadog operations.
+
+Telemetry is drawn with NumPy from seeded RNG streams: one stream per data
+kind, scenario and window, so the same arguments always return the same
+data and volumes from millions of points to 100k logs or spans stay cheap.
+
+An incident scenario ties the data together. Its root-cause service
+degrades ``INCIDENT_SECONDS`` before the end of the window and the
+degradation spreads, weaker and later with each hop, to the services
+depending on it. Metrics, logs, traces and deploy markers all tell the
+same story. The scenario and seed come from ``mock_scenario`` /
+``mock_seed`` unless the call passes ``scenario`` / ``seed``.
+"""
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
-import random
-import json
+from functools import lru_cache
+import hashlib
+import re
 
+import numpy as np
 
-# Incident scenarios
+from app.core.config import settings
+
+# The incident starts this long before the end of the requested window
+INCIDENT_SECONDS = 1800
+# Ramp from normal to fully degraded, and extra onset delay per dependency hop
+RAMP_SECONDS = 120
+HOP_LAG_SECONDS = 120
+# Share of the root cause's degradation that reaches a service one hop away
+HOP_ATTENUATION = 0.6
+METRIC_INTERVAL = 60
+
+# Healthy level of each metric kind
+BASELINES = {"latency": 150.0, "error": 0.5, "throughput": 1000.0, "quality": 0.92}
+
+# Incident scenarios. Services run upstream → downstream; effects multiply
+# the root cause's baselines once the incident is fully under way.
 INCIDENT_SCENARIOS = {
     "db_latency_spike": {
         "services": ["user-service", "payment-service", "database"],
+        "root_cause": "database",
         "symptom": "High p95 latency",
         "error_code": "TIMEOUT",
         "deploy_present": True,
+        "effects": {"latency": 2.33, "error": 16.0, "throughput": 0.9, "quality": 1.0},
+        "error_templates": [
+            "Request to {dep} timed out after {secs}s",
+            "Connection pool exhausted (active={n}, max=50)",
+            "Query on table {table} exceeded {ms}ms",
+        ],
     },
     "ai_quality_drift": {
         "services": ["llm-service", "retrieval-service", "embedding-service"],
+        "root_cause": "embedding-service",
         "symptom": "Quality degradation",
         "error_code": "RETRIEVAL_MISMATCH",
         "deploy_present": False,
+        "effects": {"latency": 1.2, "error": 3.0, "throughput": 1.0, "quality": 0.7},
+        "error_templates": [
+            "Retrieved context mismatch for query {n} (score={pct}%)",
+            "Embedding dimension drift detected on index {table}",
+            "LLM answer rejected by grader after {ms}ms",
+        ],
+    },
+    "bad_deploy_errors": {
+        "services": ["api-gateway", "checkout-service", "payment-service"],
+        "root_cause": "checkout-service",
+        "symptom": "Error rate spike",
+        "error_code": "HTTP_500",
+        "deploy_present": True,
+        "effects": {"latency": 1.3, "error": 25.0, "throughput": 0.95, "quality": 1.0},
+        "error_templates": [
+            "Unhandled NullPointerException in {endpoint} handler",
+            "Upstream {dep} returned HTTP 500",
+            "Failed to deserialize order payload ({n} bytes)",
+        ],
+    },
+    "traffic_surge": {
+        "services": ["api-gateway", "search-service", "cache"],
+        "root_cause": "api-gateway",
+        "symptom": "Throughput surge",
+        "error_code": "RATE_LIMITED",
+        "deploy_present": False,
+        "effects": {"latency": 1.8, "error": 6.0, "throughput": 3.0, "quality": 1.0},
+        "error_templates": [
+            "Rate limit exceeded for client {n} on {endpoint}",
+            "Request queue full ({n} pending), shedding load",
+            "Request to {dep} timed out after {secs}s",
+        ],
     },
 }
 
+INFO_TEMPLATES = [
+    "GET {endpoint} 200 in {ms}ms",
+    "POST {endpoint} 201 in {ms}ms",
+    "Cache hit ratio {pct}% for {table}",
+]
+# Who calls whom across every scenario's services (caller → callees)
+SERVICE_CALLS = {
+    "api-gateway": [
+        "user-service",
+        "checkout-service",
+        "search-service",
+        "llm-service",
+        "auth-service",
+    ],
+    "user-service": ["payment-service", "auth-service", "database"],
+    "checkout-service": ["payment-service", "cache"],
+    "payment-service": ["database"],
+    "search-service": ["cache", "database"],
+    "llm-service": ["retrieval-service"],
+    "retrieval-service": ["embedding-service", "database"],
+    "auth-service": ["cache"],
+}
+SERVICE_TYPES = {"database": "database", "cache": "cache"}
+ENDPOINTS = ["/api/users", "/api/payments", "/api/search", "/api/checkout", "/api/login"]
+TABLES = ["users", "orders", "payments", "sessions", "embeddings"]
+
 
 async def generate_mock_response(
     tool_name: str, arguments: Dict[str, Any]
@@ -32,10 +127,18 @@ async def generate_mock_response(
         return {"monitor": _generate_monitor_details(arguments.get("monitor_id"))}
     elif tool_name == "query_metrics":
         return {"metrics": _generate_metrics(arguments)}
+    elif tool_name == "query_metrics_many":
+        return {"metrics": _generate_metrics_many(arguments)}
     elif tool_name == "search_logs":
         return {"logs": _generate_logs(arguments)}
     elif tool_name == "fetch_traces":
         return {"traces": _generate_traces(arguments)}
+    elif tool_name == "search_logs_page":
+        logs, next_cursor = _generate_logs_page(arguments)
+        return {"logs": logs, "next_cursor": next_cursor}
+    elif tool_name == "fetch_traces_page":
+        traces, next_cursor = _generate_traces_page(arguments)
+        return {"traces": traces, "next_cursor": next_cursor}
     elif tool_name == "get_service_dependencies":
         return {"dependencies": _generate_dependencies(arguments)}
     elif tool_name == "get_deploy_markers":
@@ -44,6 +147,313 @@ async def generate_mock_response(
         return {"error": f"Unknown tool: {tool_name}"}
 
 
+# ── Scenario model ────────────────────────────────────────────────────────────
+
+def _rng(*parts: Any) -> np.random.Generator:
+    """An RNG stream determined by ``parts`` (same parts → same draws)."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).digest()
+    return np.random.default_rng(int.from_bytes(digest, "little"))
+
+
+def _scenario(arguments: Dict[str, Any]) -> Tuple[str, Dict[str, Any], int]:
+    name = arguments.get("scenario") or settings.mock_scenario
+    if name not in INCIDENT_SCENARIOS:
+        name = "db_latency_spike"
+    seed = arguments.get("seed")
+    return name, INCIDENT_SCENARIOS[name], settings.mock_seed if seed is None else int(seed)
+
+
+def _window(arguments: Dict[str, Any]) -> Tuple[int, int]:
+    from_ts = arguments.get("from_ts")
+    to_ts = arguments.get("to_ts")
+    if from_ts is None:
+        from_ts = int((datetime.now() - timedelta(hours=1)).timestamp())
+    if to_ts is None:
+        to_ts = int(datetime.now().timestamp())
+    return int(from_ts), max(int(to_ts), int(from_ts) + 1)
+
+
+def incident_effect(
+    scenario: Dict[str, Any],
+    kind: str,
+    services: Sequence[Optional[str]],
+    ts: np.ndarray,
+    to_ts: int,
+) -> np.ndarray:
+    """Multiplier on each kind's baseline, shape [len(services), len(ts)].
+
+    A service ``d`` hops from the root cause gets ``HOP_ATTENUATION ** d`` of
+    its degradation, starting ``d * HOP_LAG_SECONDS`` later. Services outside
+    the scenario stay healthy; ``None`` stands for the aggregate over all
+    services and degrades like the root cause.
+    """
+    chain = scenario["services"]
+    root = chain.index(scenario["root_cause"])
+    onset = to_ts - INCIDENT_SECONDS
+    full = scenario["effects"].get(kind, 1.0) - 1.0
+    hops = np.array([
+        0 if s is None else abs(chain.index(s) - root) if s in chain else -1 for s in services
+    ])
+    strength = np.where(hops >= 0, HOP_ATTENUATION ** np.maximum(hops, 0), 0.0)
+    start = onset + np.maximum(hops, 0) * HOP_LAG_SECONDS
+    ramp = np.clip((ts[None, :] - start[:, None]) / RAMP_SECONDS, 0.0, 1.0)
+    return 1.0 + full * strength[:, None] * ramp
+
+
+def _metric_kind(query: str) -> str:
+    q = query.lower()
+    if "latency" in q or "duration" in q:
+        return "latency"
+    if "error" in q or "500" in q:
+        return "error"
+    if "quality" in q:
+        return "quality"
+    return "throughput"
+
+
+# ── Metrics ───────────────────────────────────────────────────────────────────
+
+def metric_columns(
+    query: str,
+    from_ts: int,
+    to_ts: int,
+    interval: int = METRIC_INTERVAL,
+    scenario: Optional[str] = None,
+    seed: Optional[int] = None,
+) -> Tuple[np.ndarray, List[List[str]], np.ndarray]:
+    """Columnar form of a metric query's response.
+
+    Returns:
+        (timestamps [T] in seconds, tags per series, values [S, T])
+    """
+    name, spec, seed = _scenario({"scenario": scenario, "seed": seed})
+    ts = np.arange(from_ts, to_ts + 1, max(int(interval), 1), dtype=np.int64)
+    if "by {service}" in query:
+        services: List[Optional[str]] = list(spec["services"])
+        tags = [[f"service:{s}", "env:production"] for s in services]
+    elif "by {endpoint}" in query:
+        services = [None] * len(ENDPOINTS)
+        tags = [[f"endpoint:{e}", "service:demo-service", "env:production"] for e in ENDPOINTS]
+    else:
+        match = re.search(r"service:([\w.-]+)", query)
+        services = [match.group(1) if match else None]
+        tags = [[f"service:{services[0] or 'demo-service'}", "env:production"]]
+
+    kind = _metric_kind(query)
+    rng = _rng(seed, name, "metrics", query, from_ts, to_ts, interval)
+    noise = rng.uniform(-0.05, 0.05, (len(services), len(ts)))
+    # A slow drift shared by every metric of the scenario keeps channels correlated
+    drift = np.cumsum(_rng(seed, name, "drift", from_ts, to_ts, interval).normal(0, 0.003, len(ts)))
+    level = BASELINES[kind] * rng.uniform(0.8, 1.2, (len(services), 1))
+    if len(services) == 1:
+        level = np.full((1, 1), BASELINES[kind])
+    values = level * (1 + noise) * (1 + drift) * incident_effect(spec, kind, services, ts, to_ts)
+    return ts, tags, np.round(values, 3)
+
+
+def _generate_metrics(arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Generate mock metrics data as a list of series (Datadog format)."""
+    query = arguments.get("query", "")
+    from_ts, to_ts = _window(arguments)
+    ts, tags, values = metric_columns(
+        query, from_ts, to_ts,
+        interval=arguments.get("interval_seconds", METRIC_INTERVAL),
+        scenario=arguments.get("scenario"),
+        seed=arguments.get("seed"),
+    )
+    metric_name = query.split("{")[0].split(":", 1)[-1].strip() if query else "metric"
+    ts_ms = (ts * 1000).tolist()
+    return [
+        {
+            "metric": metric_name,
+            "pointlist": [list(p) for p in zip(ts_ms, row.tolist())],  # ms timestamps
+            "tags": series_tags,
+        }
+        for series_tags, row in zip(tags, values)
+    ]
+
+
+def _generate_metrics_many(arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Mock a comma-separated multi-query response: series tagged with query_index."""
+    series = []
+    for index, query in enumerate(arguments.get("queries", [])):
+        for item in _generate_metrics({**arguments, "query": query}):
+            series.append({**item, "query_index": index})
+    return series
+
+
+# ── Logs and traces ──────────────────────────────────────────────────────────
+
+def _scan_services(spec: Dict[str, Any], service: Optional[str]) -> List[str]:
+    return [service] if service else list(spec["services"])
+
+
+@lru_cache(maxsize=16)
+def log_columns(
+    from_ts: int, to_ts: int, total: int, service: Optional[str], scenario: str, seed: int
+) -> Dict[str, np.ndarray]:
+    """Every field of a ``total``-record log scan as arrays, sorted by time."""
+    spec = INCIDENT_SCENARIOS[scenario]
+    services = _scan_services(spec, service)
+    rng = _rng(seed, scenario, "logs", from_ts, to_ts, total, service)
+    ts = from_ts + np.sort(rng.uniform(0, to_ts - from_ts, total))
+    svc = rng.integers(0, len(services), total)
+    idx = np.arange(total)
+    # Error share and logged latencies follow each service's degradation
+    errors = incident_effect(spec, "error", services, ts, to_ts)[svc, idx]
+    latency = incident_effect(spec, "latency", services, ts, to_ts)[svc, idx]
+    is_error = rng.random(total) < np.clip(0.05 * errors, 0.0, 0.9)
+    n_err, n_info = len(spec["error_templates"]), len(INFO_TEMPLATES)
+    return {
+        "ts": (ts * 1000).astype(np.int64),
+        "service": svc,
+        "error": is_error,
+        "template": np.where(
+            is_error, rng.integers(0, n_err, total), rng.integers(0, n_info, total)
+        ),
+        "dep": rng.integers(0, len(spec["services"]), total),
+        "endpoint": rng.integers(0, len(ENDPOINTS), total),
+        "table": rng.integers(0, len(TABLES), total),
+        "n": rng.integers(1, 5000, total),
+        "ms": np.round(rng.lognormal(np.log(120), 0.6, total) * latency).astype(np.int64),
+        "pct": rng.integers(40, 100, total),
+        "secs": rng.integers(1, 30, total),
+    }
+
+
+def _log_records(
+    cols: Dict[str, np.ndarray], services: List[str], spec: Dict[str, Any], start: int, end: int
+):
+    records = []
+    deps = spec["services"]
+    for i in range(start, end):
+        error = bool(cols["error"][i])
+        template = (spec["error_templates"] if error else INFO_TEMPLATES)[cols["template"][i]]
+        service = services[cols["service"][i]]
+        endpoint = ENDPOINTS[cols["endpoint"][i]]
+        records.append({
+            "id": f"log_{i:06d}",
+            "timestamp": int(cols["ts"][i]),  # milliseconds
+            "message": ("ERROR: " if error else "") + template.format(
+                dep=deps[cols["dep"][i]], endpoint=endpoint, table=TABLES[cols["table"][i]],
+                n=cols["n"][i], ms=cols["ms"][i], pct=cols["pct"][i], secs=cols["secs"][i],
+            ),
+            "level": "error" if error else "info",
+            "service": service,
+            "tags": ["env:production", f"service:{service}"],
+            "attributes": {
+                "http.status_code": 500 if error else 200,
+                "http.method": "POST" if cols["template"][i] % 2 else "GET",
+                "http.url": endpoint,
+            },
+        })
+    return records
+
+
+def _log_scan(arguments: Dict[str, Any], total: int):
+    name, spec, seed = _scenario(arguments)
+    from_ts, to_ts = _window(arguments)
+    match = re.search(r"service:([\w.-]+)", arguments.get("query") or "")
+    service = match.group(1) if match else None
+    cols = log_columns(from_ts, to_ts, total, service, name, seed)
+    return cols, _scan_services(spec, service), spec
+
+
+def _page_bounds(arguments: Dict[str, Any], total: int) -> tuple:
+    """(start, end, next cursor) of one page; the cursor is the next offset."""
+    start = int(arguments.get("cursor") or 0)
+    end = min(start + max(int(arguments.get("limit", 100)), 1), total)
+    return start, end, str(end) if end < total else None
+
+
+def _generate_logs(arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Generate mock log entries (the first ``limit`` of a scan)."""
+    total = max(int(arguments.get("limit", 100)), 0)
+    cols, services, spec = _log_scan(arguments, total)
+    return _log_records(cols, services, spec, 0, total)
+
+
+def _generate_logs_page(arguments: Dict[str, Any]) -> tuple:
+    """One page of a ``total``-record log scan (default ``mock_log_total``)."""
+    total = int(arguments.get("total") or settings.mock_log_total)
+    cols, services, spec = _log_scan(arguments, total)
+    start, end, next_cursor = _page_bounds(arguments, total)
+    return _log_records(cols, services, spec, start, end), next_cursor
+
+
+@lru_cache(maxsize=16)
+def trace_columns(
+    from_ts: int, to_ts: int, total: int, service: Optional[str], scenario: str, seed: int
+) -> Dict[str, np.ndarray]:
+    """Every field of a ``total``-span trace scan as arrays, sorted by start time."""
+    spec = INCIDENT_SCENARIOS[scenario]
+    services = _scan_services(spec, service)
+    rng = _rng(seed, scenario, "traces", from_ts, to_ts, total, service)
+    ts = from_ts + np.sort(rng.uniform(0, to_ts - from_ts, total))
+    svc = rng.integers(0, len(services), total)
+    idx = np.arange(total)
+    latency = incident_effect(spec, "latency", services, ts, to_ts)[svc, idx]
+    errors = incident_effect(spec, "error", services, ts, to_ts)[svc, idx]
+    return {
+        "start": (ts * 1_000_000).astype(np.int64),  # microseconds
+        "service": svc,
+        "endpoint": rng.integers(0, len(ENDPOINTS), total),
+        # microseconds, lognormal around BASELINES["latency"] ms
+        "duration": np.round(
+            rng.lognormal(np.log(BASELINES["latency"] * 1000), 0.5, total) * latency
+        ).astype(np.int64),
+        "error": rng.random(total) < np.clip(0.02 * errors, 0.0, 0.9),
+    }
+
+
+def _trace_records(cols: Dict[str, np.ndarray], services: List[str], start: int, end: int):
+    records = []
+    for i in range(start, end):
+        service = services[cols["service"][i]]
+        error = bool(cols["error"][i])
+        records.append({
+            "trace_id": f"trace_{i:012d}",
+            "span_id": f"span_{i:012d}",
+            "service": service,
+            "resource": ENDPOINTS[cols["endpoint"][i]],
+            "operation": "db.query" if service == "database" else "http.request",
+            "start": int(cols["start"][i]),
+            "duration": int(cols["duration"][i]),
+            "error": error,
+            "tags": {
+                "env": "production",
+                "service": service,
+                "http.method": "POST",
+                "http.status_code": 500 if error else 200,
+            },
+        })
+    return records
+
+
+def _trace_scan(arguments: Dict[str, Any], total: int):
+    name, spec, seed = _scenario(arguments)
+    from_ts, to_ts = _window(arguments)
+    service = arguments.get("service") or None
+    return trace_columns(from_ts, to_ts, total, service, name, seed), _scan_services(spec, service)
+
+
+def _generate_traces(arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Generate mock trace data (the first ``limit`` spans of a scan)."""
+    total = max(int(arguments.get("limit", 100)), 0)
+    cols, services = _trace_scan(arguments, total)
+    return _trace_records(cols, services, 0, total)
+
+
+def _generate_traces_page(arguments: Dict[str, Any]) -> tuple:
+    """One page of a ``total``-span trace scan (default ``mock_trace_total``)."""
+    total = int(arguments.get("total") or settings.mock_trace_total)
+    cols, services = _trace_scan(arguments, total)
+    start, end, next_cursor = _page_bounds(arguments, total)
+    return _trace_records(cols, services, start, end), next_cursor
+
+
+# ── Monitors, dependencies, deploys ──────────────────────────────────────────
+
 def _generate_monitors(arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Generate mock monitors."""
     monitors = [
@@ -121,153 +531,63 @@ def _generate_monitor_details(monitor_id: str) -> Dict[str, Any]:
     return base_monitor
 
 
-def _generate_metrics(arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Generate mock metrics data as a list of series (Datadog format)."""
-    query = arguments.get("query", "")
-    from_ts = arguments.get("from_ts", int((datetime.now() - timedelta(hours=1)).timestamp()))
-    to_ts = arguments.get("to_ts", int(datetime.now().timestamp()))
-
-    # Generate time series with realistic variation keyed to wall-clock time
-    # so data changes between API calls (charts actually move)
-    seed_offset = int(datetime.now().timestamp()) // 60  # changes every minute
-    pointlist = []
-    current_ts = from_ts
-    step = 0
-    while current_ts <= to_ts:
-        noise = random.uniform(-0.05, 0.05)
-        if "latency" in query.lower() or "duration" in query.lower():
-            base = 150 if current_ts < to_ts - 1800 else 350
-            value = base * (1 + noise) + (seed_offset % 50)
-        elif "error" in query.lower() or "500" in query:
-            base = 0.5 if current_ts < to_ts - 1800 else 8.0
-            value = base * (1 + noise) + (seed_offset % 3) * 0.1
-        else:
-            value = 1000 + (seed_offset % 200) + random.uniform(-20, 20)
-        pointlist.append([current_ts * 1000, round(value, 3)])  # ms timestamps
-        current_ts += 60
-        step += 1
-
-    metric_name = query.split("{")[0].lstrip("sum:p95:avg:").strip() if query else "metric"
-    return [
-        {
-            "metric": metric_name,
-            "pointlist": pointlist,
-            "tags": ["service:demo-service", "env:production"],
-        }
-    ]
-
-
-def _generate_logs(arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Generate mock log entries."""
-    query = arguments.get("query", "")
-    limit = arguments.get("limit", 100)
-    from_ts = arguments.get("from_ts", int((datetime.now() - timedelta(hours=1)).timestamp()))
-
-    logs = []
-    for i in range(min(limit, 50)):  # Cap at 50 for demo
-        log_time = from_ts + (i * 60)
-        logs.append({
-            "id": f"log_{i:06d}",
-            "timestamp": log_time * 1000,  # milliseconds
-            "message": f"ERROR: Request failed with timeout after 5s",
-            "level": "error" if i % 3 == 0 else "info",
-            "service": "user-service",
-            "tags": ["env:production", "service:user-service"],
-            "attributes": {
-                "http.status_code": 500 if i % 3 == 0 else 200,
-                "http.method": "POST",
-                "http.url": "/api/users",
-            },
-        })
-
-    return logs
-
-
-def _generate_traces(arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Generate mock trace data."""
-    service = arguments.get("service", "user-service")
-    limit = arguments.get("limit", 100)
-    from_ts = arguments.get("from_ts", int((datetime.now() - timedelta(hours=1)).timestamp()))
-
-    traces = []
-    for i in range(min(limit, 20)):  # Cap at 20 for demo
-        trace_time = from_ts + (i * 180)  # Every 3 minutes
-        traces.append({
-            "trace_id": f"trace_{i:012d}",
-            "span_id": f"span_{i:012d}",
-            "service": service,
-            "resource": "/api/users",
-            "operation": "http.request",
-            "start": trace_time * 1000000,  # microseconds
-            "duration": random.randint(100000, 5000000),  # 100ms to 5s
-            "error": i % 5 == 0,  # 20% error rate
-            "tags": {
-                "env": "production",
-                "service": service,
-                "http.method": "POST",
-                "http.status_code": 500 if i % 5 == 0 else 200,
-            },
-        })
-
-    return traces
-
-
 def _generate_dependencies(arguments: Dict[str, Any]) -> Dict[str, Any]:
-    """Generate service dependency graph."""
-    service = arguments.get("service", "user-service")
-
-    dependencies = {
+    """Callees and callers of one service in ``SERVICE_CALLS``, with call/error counts.
+
+    Error counts follow the active scenario: edges into services the incident
+    degrades carry its error multiplier.
+    """
+    name, spec, seed = _scenario(arguments)
+    service = arguments.get("service") or "user-service"
+    _, to_ts = _window(arguments)
+    callers = {s: callees for s, callees in SERVICE_CALLS.items() if service in callees}
+
+    def edge(callee: str, caller: str) -> Dict[str, Any]:
+        rng = _rng(seed, name, "edge", caller, callee)
+        calls = int(rng.integers(50, 400))
+        effect = incident_effect(spec, "error", [callee], np.array([float(to_ts)]), to_ts)[0, 0]
+        rate = BASELINES["error"] / 100 * effect
+        return {"calls": calls, "errors": int(rng.binomial(calls, min(rate, 1.0)))}
+
+    return {
         "service": service,
         "dependencies": [
-            {
-                "service": "database",
-                "type": "database",
-                "calls": 150,
-                "errors": 5,
-            },
-            {
-                "service": "auth-service",
-                "type": "http",
-                "calls": 80,
-                "errors": 2,
-            },
+            {"service": callee, "type": SERVICE_TYPES.get(callee, "http"), **edge(callee, service)}
+            for callee in SERVICE_CALLS.get(service, [])
         ],
         "dependents": [
-            {
-                "service": "api-gateway",
-                "type": "http",
-                "calls": 200,
-                "errors": 10,
-            },
+            {"service": caller, "type": "http", **edge(service, caller)}
+            for caller in sorted(callers)
         ],
     }
 
-    return dependencies
-
 
 def _generate_deploy_markers(arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Generate deployment markers."""
-    from_ts = arguments.get("from_ts", int((datetime.now() - timedelta(hours=1)).timestamp()))
-    to_ts = arguments.get("to_ts", int(datetime.now().timestamp()))
+    """Generate deployment markers: a routine deploy, plus the scenario's bad one."""
+    name, spec, seed = _scenario(arguments)
+    from_ts, to_ts = _window(arguments)
+    rng = _rng(seed, name, "deploys", to_ts)
+    onset = to_ts - INCIDENT_SECONDS
 
     markers = [
         {
             "id": "deploy_001",
-            "service": "user-service",
-            "version": "v1.2.3",
-            "timestamp": (from_ts + 1800) * 1000,  # 30 minutes ago
+            "service": spec["services"][0],
+            "version": f"v1.{int(rng.integers(0, 20))}.{int(rng.integers(0, 10))}",
+            "timestamp": (onset - 1200) * 1000,  # well before the incident
             "environment": "production",
             "deployed_by": "ci/cd",
         },
-        {
+    ]
+    if spec["deploy_present"]:
+        markers.append({
             "id": "deploy_002",
-            "service": "payment-service",
-            "version": "v2.1.0",
-            "timestamp": (from_ts + 3600) * 1000,  # 1 hour ago
+            "service": spec["root_cause"],
+            "version": f"v2.{int(rng.integers(0, 20))}.0",
+            "timestamp": (onset - 60) * 1000,  # just before the incident starts
             "environment": "production",
             "deployed_by": "ci/cd",
-        },
-    ]
+        })
 
     # Filter by time range
     markers = [
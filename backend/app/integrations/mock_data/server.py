@@ -0,0 +1,317 @@
+"""Local stand-in for the Datadog HTTP API, backed by the mock generator.
+
+Serves the subset of v1/v2 endpoints ``DatadogMCPClient`` calls in live mode
+(monitors, metric queries including comma-packed ones, logs search, APM
+traces, service dependencies and events) in Datadog's response shapes, so the client's real HTTP
+path — httpx, JSON parsing, timeouts, rate limits, pagination and
+concurrency — can be exercised offline. Point the client at it with
+``DD_MODE=live DD_API_URL=http://127.0.0.1:8126``.
+
+Knobs (``StandInConfig`` / CLI flags): per-request latency and jitter,
+fixed-window rate limits per endpoint with ``X-RateLimit-*`` headers and
+429 + ``Retry-After``, page size for cursor pagination, and injected 500s
+and hangs. ``--scenario`` / ``--seed`` / ``--log-total`` / ``--trace-total``
+choose what the generator plays and at what volume.
+
+Usage (from backend/):
+    python -m app.integrations.mock_data.server --port 8126 --latency-ms 40 --rate-limit 300
+"""
+import argparse
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.integrations.mock_data.generator import generate_mock_response
+
+
+@dataclass
+class StandInConfig:
+    latency_ms: float = 0.0       # Added to every response
+    jitter_ms: float = 0.0        # Uniform extra latency on top
+    rate_limit: int = 0           # Requests per endpoint per period (0 = unlimited)
+    rate_period: int = 10         # Rate-limit window, seconds
+    page_size: int = 100          # Cap on logs/traces page[limit]
+    error_rate: float = 0.0       # Share of requests answered with a 500
+    hang_rate: float = 0.0        # Share of requests that stall for hang_seconds
+    hang_seconds: float = 30.0
+    seed: Optional[int] = None
+    scenario: Optional[str] = None  # Mock incident scenario (default: mock_scenario)
+    log_total: Optional[int] = None   # Records per log scan (default: mock_log_total)
+    trace_total: Optional[int] = None  # Spans per trace scan (default: mock_trace_total)
+
+
+class _RateLimiter:
+    """Fixed-window request counter per endpoint, reported as Datadog does."""
+
+    def __init__(self, limit: int, period: int):
+        self.limit = limit
+        self.period = period
+        self._windows: Dict[str, List[float]] = {}  # endpoint → [window start, count]
+
+    def check(self, endpoint: str) -> Dict[str, str]:
+        """Count one request; returns the rate-limit headers (status 429 if over)."""
+        now = time.time()
+        window = self._windows.setdefault(endpoint, [now, 0])
+        if now - window[0] >= self.period:
+            window[0], window[1] = now, 0
+        window[1] += 1
+        reset = max(int(window[0] + self.period - now), 1)
+        return {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Period": str(self.period),
+            "X-RateLimit-Remaining": str(max(self.limit - int(window[1]), 0)),
+            "X-RateLimit-Reset": str(reset),
+            "X-RateLimit-Name": endpoint,
+        }
+
+    def over(self, endpoint: str) -> bool:
+        return self._windows[endpoint][1] > self.limit
+
+
+def split_queries(packed: str) -> List[str]:
+    """Split a comma-packed metrics query on top-level commas only."""
+    parts, depth, current = [], 0, []
+    for ch in packed:
+        if ch in "({":
+            depth += 1
+        elif ch in ")}":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+def _iso(ms: float) -> str:
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse_time(value: Any) -> Optional[int]:
+    """Epoch seconds from an epoch number or the ISO strings the client sends."""
+    if value in (None, ""):
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return int(datetime.strptime(str(value), "%Y-%m-%dT%H:%M:%SZ").timestamp())
+
+
+def _args(**kwargs: Any) -> Dict[str, Any]:
+    """Generator arguments without unset values, so its own defaults apply."""
+    return {k: v for k, v in kwargs.items() if v is not None}
+
+
+def _monitor(m: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": m["id"],
+        "name": m["name"],
+        "type": m.get("type", "metric alert"),
+        "query": m.get("query", ""),
+        "overall_state": "Alert" if m.get("status") == "alert" else "OK",
+        "tags": m.get("tags", []),
+    }
+
+
+def create_app(config: Optional[StandInConfig] = None) -> FastAPI:
+    """Build the stand-in API app (also usable in-process via ``httpx.ASGITransport``)."""
+    config = config or StandInConfig()
+    limiter = _RateLimiter(config.rate_limit, config.rate_period)
+    rng = random.Random(config.seed)
+    app = FastAPI(title="Datadog API stand-in")
+    app.state.config = config
+    app.state.requests = 0
+
+    @app.middleware("http")
+    async def shape_traffic(request: Request, call_next):
+        app.state.requests += 1
+        # /api/v1/monitor/123 → /api/v1/monitor
+        endpoint = "/".join(request.url.path.split("/")[:4])
+        headers: Dict[str, str] = {}
+        if config.rate_limit:
+            headers = limiter.check(endpoint)
+            if limiter.over(endpoint):
+                return JSONResponse(
+                    {"errors": ["Rate limit exceeded"]}, status_code=429,
+                    headers={**headers, "Retry-After": headers["X-RateLimit-Reset"]},
+                )
+        delay = config.latency_ms + rng.uniform(0, config.jitter_ms)
+        if config.hang_rate and rng.random() < config.hang_rate:
+            delay += config.hang_seconds * 1000
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        if config.error_rate and rng.random() < config.error_rate:
+            return JSONResponse(
+                {"errors": ["Internal Server Error"]}, status_code=500, headers=headers
+            )
+        response = await call_next(request)
+        response.headers.update(headers)
+        return response
+
+    @app.get("/api/v1/monitor")
+    async def list_monitors(monitor_tags: Optional[str] = None):
+        result = await generate_mock_response("get_active_monitors", {"tags": []})
+        return [_monitor(m) for m in result["monitors"]]
+
+    @app.get("/api/v1/monitor/{monitor_id}")
+    async def get_monitor(monitor_id: str):
+        result = await generate_mock_response("get_monitor_details", {"monitor_id": monitor_id})
+        return _monitor(result["monitor"])
+
+    @app.get("/api/v1/query")
+    async def query_metrics(request: Request):
+        # ``from`` is a Python keyword, so read the query string directly
+        params = request.query_params
+        queries = split_queries(params.get("query", ""))
+        result = await generate_mock_response("query_metrics_many", _args(
+            queries=queries,
+            from_ts=_parse_time(params.get("from")),
+            to_ts=_parse_time(params.get("to")),
+            scenario=config.scenario,
+            seed=config.seed,
+        ))
+        return {"status": "ok", "query": params.get("query", ""), "series": result["metrics"]}
+
+    @app.post("/api/v2/logs/events/search")
+    async def search_logs(request: Request):
+        body = await request.json()
+        filt, page = body.get("filter", {}), body.get("page", {})
+        result = await generate_mock_response("search_logs_page", _args(
+            query=filt.get("query", ""),
+            from_ts=_parse_time(filt.get("from")),
+            to_ts=_parse_time(filt.get("to")),
+            limit=min(int(page.get("limit", 10)), config.page_size),
+            cursor=page.get("cursor"),
+            total=config.log_total,
+            scenario=config.scenario,
+            seed=config.seed,
+        ))
+        logs, next_cursor = result["logs"], result["next_cursor"]
+        return {
+            "data": [{
+                "id": log["id"],
+                "type": "log",
+                "attributes": {
+                    "message": log["message"],
+                    "status": log["level"],
+                    "service": log["service"],
+                    "timestamp": _iso(log["timestamp"]),
+                    "tags": log["tags"],
+                    "attributes": log["attributes"],
+                },
+            } for log in logs],
+            "meta": {"page": {"after": next_cursor}} if next_cursor else {},
+        }
+
+    @app.get("/api/v2/apm/traces")
+    async def fetch_traces(request: Request):
+        params = request.query_params
+        result = await generate_mock_response("fetch_traces_page", _args(
+            service=params.get("filter[service]"),
+            from_ts=_parse_time(params.get("filter[from]")),
+            to_ts=_parse_time(params.get("filter[to]")),
+            limit=min(int(params.get("page[limit]", 10)), config.page_size),
+            cursor=params.get("page[cursor]"),
+            total=config.trace_total,
+            scenario=config.scenario,
+            seed=config.seed,
+        ))
+        traces, next_cursor = result["traces"], result["next_cursor"]
+        return {
+            "data": [{
+                "id": t["trace_id"],
+                "type": "trace",
+                "attributes": {
+                    "service": t["service"],
+                    "resource_name": t["resource"],
+                    "operation_name": t["operation"],
+                    "start": t["start"],
+                    "duration": t["duration"],
+                    "status": "error" if t["error"] else "ok",
+                    "tags": t["tags"],
+                },
+            } for t in traces],
+            "meta": {"page": {"after": next_cursor}} if next_cursor else {},
+        }
+
+    @app.get("/api/v1/service_dependencies/{service}")
+    async def service_dependencies(service: str, env: Optional[str] = None):
+        result = await generate_mock_response("get_service_dependencies", _args(
+            service=service, scenario=config.scenario, seed=config.seed,
+        ))
+        deps = result["dependencies"]
+        return {
+            "name": deps["service"],
+            "calls": [d["service"] for d in deps["dependencies"]],
+            "called_by": [d["service"] for d in deps["dependents"]],
+        }
+
+    @app.get("/api/v1/events")
+    async def list_events(start: int, end: int, tags: Optional[str] = None):
+        result = await generate_mock_response("get_deploy_markers", _args(
+            from_ts=start, to_ts=end, scenario=config.scenario, seed=config.seed,
+        ))
+        return {"events": [{
+            "id": m["id"],
+            "title": f"Deployed {m['service']} {m['version']}",
+            "date_happened": int(m["timestamp"] // 1000),
+            "tags": ["deployment", f"service:{m['service']}", f"version:{m['version']}"],
+        } for m in result["markers"]]}
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8126)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--rate-limit", type=int, default=0, help="requests per endpoint per period (0 = off)"
+    )
+    parser.add_argument("--rate-period", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--hang-seconds", type=float, default=30.0)
+    parser.add_argument(
+        "--seed", type=int, default=None, help="seeds injected faults and the generated data"
+    )
+    parser.add_argument(
+        "--scenario", default=None, help="mock incident scenario (e.g. bad_deploy_errors)"
+    )
+    parser.add_argument("--log-total", type=int, default=None, help="records per log scan")
+    parser.add_argument("--trace-total", type=int, default=None, help="spans per trace scan")
+    args = parser.parse_args()
+
+    config = StandInConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit=args.rate_limit,
+        rate_period=args.rate_period,
+        page_size=args.page_size,
+        error_rate=args.error_rate,
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        seed=args.seed,
+        scenario=args.scenario,
+        log_total=args.log_total,
+        trace_total=args.trace_total,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Gap-aware resampling of Datadog pointlists onto a fixed time grid.
+
+Datadog pointlists are ``[[timestamp_ms, value | None], ...]``. Dropping the
+nulls compresses the series and breaks its time alignment, so every
+consumer (Toto, the statistical detector, chart endpoints) goes through
+``resample`` instead:
+
+  1. sort and de-duplicate timestamps
+  2. derive the true interval (median spacing) unless one is given
+  3. bucket points onto a regular grid (mean of points sharing a bucket)
+  4. fill empty buckets with the configured policy
+
+With ``fill="none"`` the gaps stay NaN for charts; forecasting consumers read
+``filled()`` (gaps interpolated) and size their guards on ``observed``.
+"""
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+FILL_POLICIES = ("linear", "ffill", "zero", "none")
+
+
+class ResampledSeries(NamedTuple):
+    """A pointlist aligned to a regular grid."""
+
+    timestamps: np.ndarray   # [N] int64 epoch milliseconds, evenly spaced
+    values: np.ndarray       # [N] float64; NaN only with fill="none"
+    interval_seconds: int    # Grid spacing
+    gaps: int                # Grid points that had no data before filling
+
+    def points(self, max_points: Optional[int] = None) -> List[List[float]]:
+        """Chart-ready ``[[timestamp_ms, value], ...]`` without unfilled gaps.
+
+        With ``max_points`` the series is LTTB-downsampled to at most that many points.
+        """
+        keep = ~np.isnan(self.values)
+        timestamps, values = self.timestamps[keep], self.values[keep]
+        if max_points and len(values) > max_points:
+            from app.integrations.downsample import lttb
+            return lttb(timestamps, values, max_points).tolist()
+        return np.column_stack([timestamps, values]).tolist()
+
+    def tolist(self) -> List[float]:
+        """Values as a plain list (unfilled gaps dropped)."""
+        return self.values[~np.isnan(self.values)].tolist()
+
+    def filled(self, fill: str = "linear") -> np.ndarray:
+        """Values with any gaps left unfilled (``fill="none"``) filled; NaN-free model input."""
+        return fill_gaps(self.values, fill) if self.gaps else self.values
+
+    @property
+    def observed(self) -> int:
+        """Grid points that held data (filled gaps are not counted)."""
+        return len(self.values) - self.gaps
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+EMPTY = ResampledSeries(np.empty(0, dtype=np.int64), np.empty(0), 60, 0)
+
+
+def infer_interval(timestamps_ms: np.ndarray, default: int = 60) -> int:
+    """Median spacing of sorted, unique timestamps, in whole seconds."""
+    if len(timestamps_ms) < 2:
+        return default
+    return max(int(round(float(np.median(np.diff(timestamps_ms))) / 1000)), 1)
+
+
+def fill_gaps(values: np.ndarray, fill: str = "linear") -> np.ndarray:
+    """Fill NaNs in a 1-D array. Leading NaNs take the first valid value."""
+    if fill not in FILL_POLICIES:
+        raise ValueError(f"Unknown fill policy {fill!r}; expected one of {FILL_POLICIES}")
+    missing = np.isnan(values)
+    if fill == "none" or not missing.any() or missing.all():
+        return values
+    if fill == "zero":
+        return np.where(missing, 0.0, values)
+    idx = np.arange(len(values))
+    if fill == "linear":
+        return np.interp(idx, idx[~missing], values[~missing])
+    # ffill: index of the last valid point at or before each position
+    last_valid = np.maximum.accumulate(np.where(missing, -1, idx))
+    first = values[np.argmax(~missing)]
+    return np.where(last_valid >= 0, values[np.maximum(last_valid, 0)], first)
+
+
+def fill_nonfinite(values: Sequence[float]) -> np.ndarray:
+    """Float64 copy of ``values`` with NaN/±inf linearly interpolated.
+
+    Left as-is if no value is finite.
+    """
+    arr = np.asarray(values, dtype=np.float64)
+    bad = ~np.isfinite(arr)
+    if not bad.any() or bad.all():
+        return arr
+    return fill_gaps(np.where(bad, np.nan, arr), "linear")
+
+
+def resample(
+    pointlist: Sequence[Sequence[Optional[float]]],
+    interval_seconds: Optional[int] = None,
+    fill: str = "linear",
+) -> ResampledSeries:
+    """Align a Datadog pointlist to a regular grid.
+
+    Args:
+        pointlist: ``[[timestamp_ms, value | None], ...]`` in any order.
+        interval_seconds: Grid spacing; derived from the data when omitted.
+        fill: Gap policy — "linear", "ffill", "zero" or "none" (leave NaN).
+
+    Returns:
+        ResampledSeries spanning the first to the last non-null point.
+    """
+    if not len(pointlist):
+        return EMPTY
+    raw = np.asarray(pointlist, dtype=np.float64).reshape(-1, 2)  # None → NaN
+    raw = raw[~np.isnan(raw[:, 0])]
+    if not len(raw):
+        return EMPTY
+    raw = raw[np.argsort(raw[:, 0], kind="stable")]
+
+    # Interval from all reported timestamps (nulls still mark grid slots)
+    unique_ts = np.unique(raw[:, 0])
+    interval = interval_seconds or infer_interval(unique_ts)
+
+    valid = raw[~np.isnan(raw[:, 1])]
+    if not len(valid):
+        return EMPTY
+    step = interval * 1000
+    start = valid[0, 0]
+    slots = np.rint((valid[:, 0] - start) / step).astype(np.int64)
+    size = int(slots[-1]) + 1
+
+    # Mean of points sharing a slot (covers duplicate timestamps too)
+    sums = np.bincount(slots, weights=valid[:, 1], minlength=size)
+    counts = np.bincount(slots, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        values = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+    timestamps = (start + np.arange(size) * step).astype(np.int64)
+    gaps = int((counts == 0).sum())
+    return ResampledSeries(timestamps, fill_gaps(values, fill), interval, gaps)
+
+
+def resample_series(
+    series: dict, interval_seconds: Optional[int] = None, fill: Optional[str] = None
+) -> ResampledSeries:
+    """Resample a Datadog series dict (reads ``pointlist``) with the configured fill policy."""
+    from app.core.config import settings
+
+    return resample(
+        series.get("pointlist") or [],
+        interval_seconds=interval_seconds,
+        fill=fill or settings.resample_fill,
+    )
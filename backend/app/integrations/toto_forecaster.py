@@ -7,44 +7,472 @@ SDK:   pip install toto-ts
 Pre-setup (run once before starting the backend):
     python -c "from toto.model.toto import Toto; Toto.from_pretrained('Datadog/Toto-Open-Base-1.0')"
 """
+import hashlib
 import threading
 import logging
-from typing import List, Optional
-from datetime import datetime
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
-from app.schemas.toto import TotoForecast
+import numpy as np
+
+from app.integrations.resample import fill_nonfinite
+from app.schemas.toto import TotoForecast, TotoInferenceProfile, TotoMultivariateForecast
 
 logger = logging.getLogger(__name__)
 
+# Number of near-term forecast steps the anomaly score looks at
+ANOMALY_WINDOW = 5
+# Channel score counted as corroborating evidence in a multivariate forecast
+ELEVATED_SCORE = 30.0
+
+# Named inference budgets. Callers pick one per use site:
+#   fast     — "is anything anomalous right now?" checks; only the p10/p90 band
+#              over the first ANOMALY_WINDOW steps matters, and series the
+#              statistical prefilter clears never reach the model
+#   standard — interactive investigations and charts
+#   precise  — background forecasts persisted on incidents
+TOTO_PROFILES: Dict[str, TotoInferenceProfile] = {
+    "fast": TotoInferenceProfile(
+        name="fast", num_samples=16, samples_per_batch=16,
+        horizon=ANOMALY_WINDOW, context_length=256, prefilter=True,
+    ),
+    "standard": TotoInferenceProfile(
+        name="standard", num_samples=64, samples_per_batch=64,
+        horizon=60, context_length=512,
+    ),
+    "precise": TotoInferenceProfile(
+        name="precise", num_samples=256, samples_per_batch=64,
+        horizon=60, context_length=512,
+    ),
+}
+DEFAULT_PROFILE = "standard"
+# Longest context any profile reads; forecast cache keys hash this many points
+MAX_CONTEXT = max(p.context_length for p in TOTO_PROFILES.values())
+
+
+def get_profile(name: Optional[str] = None) -> TotoInferenceProfile:
+    """Look up an inference profile by name (unknown names fall back to the default)."""
+    profile = TOTO_PROFILES.get(name or DEFAULT_PROFILE)
+    if profile is None:
+        logger.warning(f"Unknown Toto profile '{name}', using '{DEFAULT_PROFILE}'")
+        profile = TOTO_PROFILES[DEFAULT_PROFILE]
+    return profile
+
 _lock = threading.Lock()
 _toto_model = None
 _toto_forecaster_impl = None
+_load_failed = False  # toto-ts/torch not installed: the statistical fallback is used from then on
+# Other load errors (download, OOM, compile) are retried, no sooner than this
+# monotonic time; the delay doubles per failure up to LOAD_RETRY_MAX_SECONDS
+_retry_at = 0.0
+_retry_delay = 0.0
+LOAD_RETRY_MIN_SECONDS = 30.0
+LOAD_RETRY_MAX_SECONDS = 600.0
+_status: Dict[str, object] = {
+    "loaded": False,
+    "ready": False,        # loaded and warmed up — first request pays no init cost
+    "device": None,
+    "quantized": False,
+    "compiled": False,
+    "load_seconds": None,
+    "warmup_seconds": None,
+    "error": None,
+}
+
+
+def process_rss_mb() -> Optional[float]:
+    """Resident set size of the current process in MB (Linux /proc; peak RSS elsewhere)."""
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+        import sys
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes on Linux
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except Exception:
+        return None
+
+
+def toto_status() -> Dict[str, object]:
+    """Snapshot of this process's model load / warm-up state."""
+    cache = get_forecast_cache()
+    return {
+        **_status,
+        "rss_mb": process_rss_mb(),
+        "forecast_cache": cache.stats() if cache is not None else None,
+    }
+
+
+def toto_health() -> Dict[str, object]:
+    """Readiness for /health: local state, or the sidecar's when in sidecar mode.
+
+    ``rss_mb`` is always this worker's memory; in sidecar mode the model's
+    memory is reported once under ``sidecar.rss_mb``.
+    """
+    from app.integrations.toto_sidecar import get_sidecar_client
+
+    status: Dict[str, object] = {**toto_status(), "mode": "local"}
+    client = get_sidecar_client()
+    if client is not None:
+        status["mode"] = "sidecar"
+        try:
+            sidecar = client.status()
+            status.update(loaded=sidecar.get("loaded"), ready=sidecar.get("ready"), sidecar=sidecar)
+        except Exception as exc:
+            status.update(ready=False, sidecar={"error": str(exc)})
+    return status
+
+
+def _optimize_for_cpu(model, torch):
+    """Apply the optional CPU deployment optimisations from settings."""
+    from app.core.config import settings
+
+    if settings.toto_quantize:
+        try:
+            # int8 weights for every nn.Linear; activations stay float32
+            model = torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
+            _status["quantized"] = True
+        except Exception as exc:
+            logger.warning(f"Toto int8 quantization failed, using float32 weights: {exc}")
+    if settings.toto_compile:
+        try:
+            model.model.forward = torch.compile(model.model.forward, dynamic=True)
+            _status["compiled"] = True
+        except Exception as exc:
+            logger.warning(f"torch.compile unavailable for Toto, running eagerly: {exc}")
+    return model
 
 
 def _load_model():
-    """Lazy-load the Toto model from HuggingFace cache (thread-safe)."""
-    global _toto_model, _toto_forecaster_impl
-    if _toto_model is not None:
+    """Lazy-load the Toto model from HuggingFace cache (thread-safe).
+
+    A missing toto-ts/torch install is remembered, so later calls return
+    (None, None) without retrying the import or logging again. Other
+    failures (a download error, OOM, ...) are retried with exponential
+    backoff; until then calls return (None, None) straight away.
+    """
+    global _toto_model, _toto_forecaster_impl, _load_failed, _retry_at, _retry_delay
+    import time
+
+    if _toto_model is not None or _load_failed or time.monotonic() < _retry_at:
         return _toto_model, _toto_forecaster_impl
     with _lock:
-        if _toto_model is not None:
+        if _toto_model is not None or _load_failed or time.monotonic() < _retry_at:
             return _toto_model, _toto_forecaster_impl
         try:
             import torch
             from toto.model.toto import Toto
             from toto.inference.forecaster import TotoForecaster as _TF
-
+        except ImportError as exc:
+            _load_failed = True
+            _status["error"] = str(exc)
+            logger.warning(f"Toto model unavailable (install toto-ts to enable): {exc}")
+            return None, None
+        try:
+            started = time.perf_counter()
             device = "cuda" if torch.cuda.is_available() else "cpu"
             logger.info(f"Loading Toto model on {device} ...")
             model = Toto.from_pretrained("Datadog/Toto-Open-Base-1.0").to(device)
+            model.eval()
+            if device == "cpu":
+                model = _optimize_for_cpu(model, torch)
             _toto_forecaster_impl = _TF(model.model)
             _toto_model = model
-            logger.info("Toto model loaded successfully.")
+            _status.update(
+                loaded=True,
+                device=device,
+                error=None,
+                load_seconds=round(time.perf_counter() - started, 2),
+            )
+            if _retry_delay:
+                # Loaded on a retry after the startup prewarm failed: no warm-up pass follows
+                _status["ready"] = True
+            _retry_delay = 0.0
+            logger.info(f"Toto model loaded successfully in {_status['load_seconds']}s.")
         except Exception as exc:
-            logger.warning(f"Toto model unavailable (install toto-ts to enable): {exc}")
+            _retry_delay = min(
+                max(_retry_delay * 2, LOAD_RETRY_MIN_SECONDS), LOAD_RETRY_MAX_SECONDS
+            )
+            _retry_at = time.monotonic() + _retry_delay
+            _status["error"] = str(exc)
+            logger.warning(f"Toto model load failed, retrying in {_retry_delay:.0f}s: {exc}")
     return _toto_model, _toto_forecaster_impl
 
 
+def _warmup() -> None:
+    """Run one inference per profile so kernels/compiled graphs are initialised.
+
+    Marks the model ready afterwards; a no-op (not ready) if the model is
+    unavailable.
+    """
+    import time
+
+    model, forecaster = _load_model()
+    if model is None or forecaster is None:
+        return
+    started = time.perf_counter()
+    series = np.sin(np.linspace(0, 12 * np.pi, 512)) + 2.0
+    for spec in TOTO_PROFILES.values():
+        TotoForecaster._model_batch(
+            model, forecaster, series[None, :], [f"warmup_{spec.name}"], 60, spec.horizon, spec
+        )
+    _status.update(ready=True, warmup_seconds=round(time.perf_counter() - started, 2))
+    logger.info(f"Toto warm-up finished in {_status['warmup_seconds']}s.")
+
+
+def _prepare_context(
+    rows: Union[np.ndarray, Sequence[Sequence[float]]],
+    context_length: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Pad/truncate series to ``context_length`` and z-score normalise them.
+
+    Short series are left-padded with their first value. Accepts a 2-D array
+    (all series the same length) or a ragged sequence of series. Non-finite
+    values (unfilled gaps) are interpolated; a row with none finite is zeros.
+
+    Returns:
+        (normalized [B, T] float32, mean [B, 1], std [B, 1], lengths [B])
+    """
+    if isinstance(rows, np.ndarray) and rows.ndim == 2:
+        arr = rows.astype(np.float64, copy=False)
+        lengths = np.full(arr.shape[0], arr.shape[1])
+        if arr.shape[1] >= context_length:
+            context = arr[:, -context_length:]
+        else:
+            pad = np.repeat(arr[:, :1], context_length - arr.shape[1], axis=1)
+            context = np.concatenate([pad, arr], axis=1)
+    else:
+        context = np.empty((len(rows), context_length), dtype=np.float64)
+        lengths = np.empty(len(rows), dtype=np.int64)
+        for i, row in enumerate(rows):
+            tail = np.asarray(row, dtype=np.float64)[-context_length:]
+            lengths[i] = len(row)
+            context[i, : context_length - len(tail)] = tail[0]
+            context[i, context_length - len(tail):] = tail
+
+    bad_rows = np.flatnonzero(~np.isfinite(context).all(axis=1))
+    if len(bad_rows):
+        context = np.array(context)  # never write through to the caller's array
+        for i in bad_rows:
+            context[i] = np.nan_to_num(fill_nonfinite(context[i]), nan=0.0, posinf=0.0, neginf=0.0)
+
+    mean = context.mean(axis=1, keepdims=True)
+    std = np.maximum(context.std(axis=1, keepdims=True), 1e-6)
+    normalized = ((context - mean) / std).astype(np.float32)
+    return normalized, mean, std, lengths
+
+
+def _anomaly_scores(last_actual: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """Score how far the most recent actuals exceed the forecast upper band.
+
+    Args:
+        last_actual: [B, W] last W actual values (NaN where a series is shorter).
+        lower: [B, H] de-normalised p10 band.
+        upper: [B, H] de-normalised p90 band.
+
+    Returns:
+        [B] scores in 0–100: mean exceedance (as % of the p10–p90 span at the
+        first step) over the actuals that exceed their projected upper bound.
+    """
+    steps = np.minimum(np.arange(last_actual.shape[1]), upper.shape[1] - 1)
+    projected = upper[:, steps]
+    span = np.maximum(upper[:, :1] - lower[:, :1], 1e-6)
+    exceeds = last_actual > projected  # NaN compares False
+    deviation = np.minimum((last_actual - projected) / span * 100, 100.0)
+    count = exceeds.sum(axis=1)
+    total = np.where(exceeds, deviation, 0.0).sum(axis=1)
+    return np.round(total / np.maximum(count, 1), 1)
+
+
+def joint_anomaly_score(scores: np.ndarray) -> float:
+    """Combine per-channel anomaly scores into one score for the group.
+
+    The strongest channel's score is discounted unless other channels
+    corroborate it: ``max · (0.5 + 0.5 · fraction of channels ≥ ELEVATED_SCORE)``.
+    A lone spike in one of three metrics tops out at ~67 (not anomalous);
+    two agreeing channels can reach ~83.
+    """
+    if scores.size == 0:
+        return 0.0
+    corroboration = float((scores >= ELEVATED_SCORE).mean())
+    return round(float(scores.max()) * (0.5 + 0.5 * corroboration), 1)
+
+
+def _postprocess(
+    bands: np.ndarray,
+    mean: np.ndarray,
+    std: np.ndarray,
+    context: np.ndarray,
+    lengths: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """De-normalise quantile bands and score anomalies for a whole batch.
+
+    Args:
+        bands: [3, B, H] normalised p10 / p50 / p90 forecasts.
+        mean, std: [B, 1] normalisation statistics from _prepare_context.
+        context: [B, T] normalised model input (the last W columns are the
+            most recent actuals).
+        lengths: [B] original series lengths.
+
+    Returns:
+        (denormalised bands [3, B, H] rounded to 4 dp, anomaly scores [B])
+    """
+    denorm = bands * std[None] + mean[None]
+    window = min(ANOMALY_WINDOW, context.shape[1])
+    last_actual = context[:, -window:].astype(np.float64) * std + mean
+    # Mask padded positions for series shorter than the anomaly window
+    valid = np.arange(window)[None, :] >= (window - lengths[:, None])
+    last_actual = np.where(valid, last_actual, np.nan)
+    scores = _anomaly_scores(last_actual, denorm[0], denorm[2])
+    return np.round(denorm, 4), scores
+
+
+def slice_horizon(
+    forecast: TotoForecast, horizon: int, series_name: Optional[str] = None
+) -> TotoForecast:
+    """Return ``forecast`` truncated to its first ``horizon`` steps."""
+    if len(forecast.predicted_median) <= horizon and series_name in (None, forecast.series_name):
+        return forecast
+    return forecast.model_copy(update={
+        "series_name": series_name or forecast.series_name,
+        "predicted_median": forecast.predicted_median[:horizon],
+        "lower_bound": forecast.lower_bound[:horizon],
+        "upper_bound": forecast.upper_bound[:horizon],
+    })
+
+
+class ForecastCache:
+    """LRU of Toto forecasts keyed by input window, shared across horizons.
+
+    An entry serves any request for no more horizon, samples or context
+    than it was decoded with; shorter horizons are sliced from it. Each
+    decode is stretched to the longest horizon asked for the series by a
+    consumer the entry will be able to serve, so a 60-step standard chart
+    also covers the 5-step anomaly check of the same window, while the
+    16-sample check never decodes 60 steps that the 64-sample chart could
+    not use anyway.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[TotoForecast, int, int]]" = OrderedDict()
+        # series name → (num_samples, context_length) of a consumer → longest horizon it asked for
+        self._horizons: Dict[str, Dict[Tuple[int, int], int]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(values: Sequence[float], interval_seconds: int) -> str:
+        """Identity of a forecast window: the last MAX_CONTEXT points plus interval."""
+        tail = np.ascontiguousarray(np.asarray(values, dtype=np.float64)[-MAX_CONTEXT:])
+        digest = hashlib.blake2b(tail.tobytes(), digest_size=16)
+        digest.update(str(interval_seconds).encode())
+        return digest.hexdigest()
+
+    def note_horizon(self, series_name: str, spec: TotoInferenceProfile, horizon: int) -> int:
+        """Record a requested horizon; returns the horizon to decode at for ``spec``.
+
+        That is the longest horizon asked for the series by any consumer an
+        entry decoded with ``spec`` can serve (needing no more samples or context).
+        """
+        with self._lock:
+            asked = self._horizons.setdefault(series_name, {})
+            need = (spec.num_samples, spec.context_length)
+            asked[need] = max(horizon, asked.get(need, 0))
+            return max(
+                h for (num_samples, context_length), h in asked.items()
+                if num_samples <= spec.num_samples and context_length <= spec.context_length
+            )
+
+    def get(
+        self, key: str, spec: TotoInferenceProfile, horizon: int, series_name: str
+    ) -> Optional[TotoForecast]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                forecast, num_samples, context_length = entry
+                if (len(forecast.predicted_median) >= horizon
+                        and num_samples >= spec.num_samples
+                        and context_length >= spec.context_length):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return slice_horizon(forecast, horizon, series_name)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, forecast: TotoForecast, spec: TotoInferenceProfile) -> None:
+        with self._lock:
+            current = self._entries.get(key)
+            if (current is not None
+                    and len(current[0].predicted_median) >= len(forecast.predicted_median)
+                    and current[1] >= spec.num_samples
+                    and current[2] >= spec.context_length):
+                return  # the current entry already serves everything the new one would
+            self._entries[key] = (forecast, spec.num_samples, spec.context_length)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._horizons.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+_forecast_cache: Optional[ForecastCache] = None
+
+
+def get_forecast_cache() -> Optional[ForecastCache]:
+    """Return the process-wide forecast cache, or None when TOTO_CACHE_SIZE is 0."""
+    global _forecast_cache
+    from app.core.config import settings
+
+    if settings.toto_cache_size <= 0:
+        return None
+    if _forecast_cache is None:
+        _forecast_cache = ForecastCache(settings.toto_cache_size)
+    return _forecast_cache
+
+
+def _finite(row: Sequence[float]) -> Sequence[float]:
+    """``row`` with NaN/±inf gaps interpolated; empty if it has no finite value."""
+    arr = np.asarray(row, dtype=np.float64)
+    finite = np.isfinite(arr)
+    if finite.all():
+        return row
+    return fill_nonfinite(arr) if finite.any() else arr[:0]
+
+
+def _finite_rows(
+    values: Union[np.ndarray, Sequence[Sequence[float]]],
+) -> Union[np.ndarray, Sequence[Sequence[float]]]:
+    """Rows safe to score and to return as ``historical`` (which must be JSON-encodable)."""
+    if isinstance(values, np.ndarray) and values.ndim == 2 and np.isfinite(values).all():
+        return values
+    return [_finite(row) for row in values]
+
+
 class TotoForecaster:
     """Wrapper around the Toto foundation model for metric anomaly detection."""
 
@@ -53,99 +481,352 @@ class TotoForecaster:
         values: List[float],
         interval_seconds: int,
         series_name: str = "metric",
-        horizon: int = 60,
+        horizon: Optional[int] = None,
+        profile: str = DEFAULT_PROFILE,
     ) -> Optional[TotoForecast]:
         """Run Toto inference on a metric time series.
 
         Args:
-            values: Historical metric values (will be padded/truncated to 512).
+            values: Historical metric values (padded/truncated to the profile's
+                context length).
             interval_seconds: Seconds between consecutive data points.
             series_name: Display name for the metric.
-            horizon: Number of future time steps to forecast.
+            horizon: Number of future time steps to forecast (defaults to the
+                profile's horizon).
+            profile: Name of the inference profile (see TOTO_PROFILES).
 
         Returns:
-            TotoForecast or None if the model is unavailable.
+            TotoForecast, or None if neither Toto nor the statistical
+            fallback can score the series.
         """
-        if not values:
+        if values is None or len(values) == 0:
             return None
+        return self.forecast_batch(
+            [values],
+            interval_seconds,
+            series_names=[series_name],
+            horizon=horizon,
+            profile=profile,
+        )[0]
+
+    def forecast_batch(
+        self,
+        values: Union[np.ndarray, Sequence[Sequence[float]]],
+        interval_seconds: int,
+        series_names: Optional[Sequence[str]] = None,
+        horizon: Optional[int] = None,
+        profile: str = DEFAULT_PROFILE,
+        local: bool = False,
+    ) -> List[Optional[TotoForecast]]:
+        """Forecast several series sharing one sampling interval in one pass.
+
+        Args:
+            values: 2-D array [B, T] or a ragged sequence of B series. NaN/±inf
+                gaps are interpolated before scoring.
+            interval_seconds: Seconds between consecutive data points.
+            series_names: Display names (defaults to ``metric_<i>``).
+            horizon: Number of future time steps (defaults to the profile's).
+            profile: Name of the inference profile (see TOTO_PROFILES).
+            local: Run in this process even when TOTO_SIDECAR_SOCKET is set
+                (used by the sidecar itself).
+
+        Returns:
+            One TotoForecast per input row. Rows the prefilter clears, or all
+            rows when Toto is unavailable and the statistical fallback is
+            enabled, come from the statistical detector (``model="statistical"``).
+            None for empty (or all-NaN) rows, or when neither source can score them.
+        """
+        from app.core.config import settings
+        from app.integrations.anomaly_detector import get_statistical_detector
+        from app.integrations.toto_sidecar import get_sidecar_client
+
+        values = _finite_rows(values)
+        n_rows = len(values)
+        names = list(series_names) if series_names else [f"metric_{i}" for i in range(n_rows)]
+        results: List[Optional[TotoForecast]] = [None] * n_rows
+        keep = [i for i in range(n_rows) if len(values[i]) > 0]
+        if not keep:
+            return results
+
+        spec = get_profile(profile)
+        horizon = horizon or spec.horizon
+        detector = get_statistical_detector()
+
+        def _statistical(indices: List[int]) -> None:
+            rows = [values[i] for i in indices]
+            forecasts = detector.forecast_batch(
+                rows, interval_seconds, [names[i] for i in indices], horizon
+            )
+            for i, fc in zip(indices, forecasts):
+                results[i] = fc
+
+        sidecar = None if local else get_sidecar_client()
+        if sidecar is not None:
+            try:
+                forecasts = sidecar.forecast_batch(
+                    [values[i] for i in keep], interval_seconds,
+                    [names[i] for i in keep], horizon, spec.name,
+                )
+                for i, fc in zip(keep, forecasts):
+                    results[i] = fc
+            except Exception as exc:
+                logger.warning(f"Toto sidecar unavailable: {exc}")
+                if settings.toto_statistical_fallback:
+                    _statistical(keep)
+            return results
 
         model, forecaster = _load_model()
         if model is None or forecaster is None:
-            return None
+            if settings.toto_statistical_fallback:
+                _statistical(keep)
+            return results
+
+        escalate = keep
+        if spec.prefilter:
+            # Cheap screen: only series with a notable score reach the model
+            scores = detector.score_batch([values[i] for i in keep])
+            escalate = [i for i, sc in zip(keep, scores) if sc >= settings.toto_prefilter_threshold]
+            cleared = set(keep) - set(escalate)
+            _statistical([i for i in keep if i in cleared])
+            if not escalate:
+                return results
+
+        # Reuse cached windows; decode the rest at the longest horizon asked for
+        # on these series by callers this profile's entries can serve
+        decode_horizon = horizon
+        cache = get_forecast_cache()
+        keys: Dict[int, str] = {}
+        if cache is not None:
+            pending = []
+            for i in escalate:
+                longest = cache.note_horizon(names[i], spec, horizon)
+                keys[i] = cache.key(values[i], interval_seconds)
+                cached = cache.get(keys[i], spec, horizon, names[i])
+                if cached is not None:
+                    results[i] = cached
+                else:
+                    pending.append(i)
+                    decode_horizon = max(decode_horizon, longest)
+            escalate = pending
+            if not escalate:
+                return results
+
+        rows = values[escalate] if isinstance(values, np.ndarray) else [values[i] for i in escalate]
+        forecasts = self._model_batch(
+            model,
+            forecaster,
+            rows,
+            [names[i] for i in escalate],
+            interval_seconds,
+            decode_horizon,
+            spec,
+        )
+        if forecasts is None:
+            if settings.toto_statistical_fallback:
+                _statistical(escalate)
+            return results
+        for i, fc in zip(escalate, forecasts):
+            if cache is not None:
+                cache.put(keys[i], fc, spec)
+            results[i] = slice_horizon(fc, horizon)
+        return results
+
+    def forecast_multivariate(
+        self,
+        channels: Dict[str, Sequence[float]],
+        interval_seconds: int,
+        group: str = "service",
+        horizon: Optional[int] = None,
+        profile: str = DEFAULT_PROFILE,
+    ) -> Optional[TotoMultivariateForecast]:
+        """Forecast correlated metrics (e.g. error rate, p95, throughput) jointly.
+
+        The metrics become channels of one MaskedTimeseries sharing an id_mask
+        group, so a single forward pass sees cross-metric context.
+
+        Args:
+            channels: Metric name → historical values.
+            interval_seconds: Seconds between consecutive data points.
+            group: Name of the group (typically the service).
+            horizon: Forecast steps (defaults to the profile's).
+            profile: Name of the inference profile (see TOTO_PROFILES).
 
+        Returns:
+            TotoMultivariateForecast, or None if no channel could be scored.
+        """
+        return self.forecast_groups(
+            {group: channels}, interval_seconds, horizon=horizon, profile=profile
+        ).get(group)
+
+    def forecast_groups(
+        self,
+        groups: Dict[str, Dict[str, Sequence[float]]],
+        interval_seconds: int,
+        horizon: Optional[int] = None,
+        profile: str = DEFAULT_PROFILE,
+        local: bool = False,
+    ) -> Dict[str, TotoMultivariateForecast]:
+        """Multivariate forecasts for several groups in one forward pass.
+
+        Every channel of every group goes into one [1, C, T] series; id_mask
+        keeps groups (services) from attending to each other.
+
+        Returns:
+            Group name → TotoMultivariateForecast (groups with no usable
+            channel are omitted).
+        """
+        from app.core.config import settings
+        from app.integrations.anomaly_detector import get_statistical_detector
+        from app.integrations.toto_sidecar import get_sidecar_client
+
+        spec = get_profile(profile)
+        horizon = horizon or spec.horizon
+        groups = {g: {n: _finite(v) for n, v in chans.items()} for g, chans in groups.items()}
+        group_names = [g for g, chans in groups.items() if any(len(v) for v in chans.values())]
+        if not group_names:
+            return {}
+
+        sidecar = None if local else get_sidecar_client()
+        if sidecar is not None:
+            try:
+                return sidecar.forecast_groups(groups, interval_seconds, horizon, spec.name)
+            except Exception as exc:
+                logger.warning(f"Toto sidecar unavailable: {exc}")
+            model, forecaster = None, None
+        else:
+            model, forecaster = _load_model()
+
+        rows: List[Sequence[float]] = []
+        names: List[str] = []
+        ids: List[int] = []
+        for gid, group in enumerate(group_names):
+            for name, values in groups[group].items():
+                if len(values):
+                    rows.append(values)
+                    names.append(name)
+                    ids.append(gid)
+
+        detector = get_statistical_detector()
+        forecasts: List[Optional[TotoForecast]] = [None] * len(rows)
+
+        escalate = list(range(len(rows)))
+        if model is not None and spec.prefilter:
+            # Escalate whole groups: cross-channel context needs every channel
+            scores = detector.score_batch(rows)
+            hot = {
+                ids[i] for i in range(len(rows)) if scores[i] >= settings.toto_prefilter_threshold
+            }
+            escalate = [i for i in range(len(rows)) if ids[i] in hot]
+        if model is not None and escalate:
+            toto = self._model_batch(
+                model, forecaster, [rows[i] for i in escalate], [names[i] for i in escalate],
+                interval_seconds, horizon, spec, id_groups=[ids[i] for i in escalate],
+            )
+            if toto is not None:
+                for i, fc in zip(escalate, toto):
+                    forecasts[i] = fc
+        remaining = [i for i in range(len(rows)) if forecasts[i] is None]
+        if remaining and (model is not None or settings.toto_statistical_fallback):
+            stat = detector.forecast_batch(
+                [rows[i] for i in remaining], interval_seconds,
+                [names[i] for i in remaining], horizon,
+            )
+            for i, fc in zip(remaining, stat):
+                forecasts[i] = fc
+
+        results: Dict[str, TotoMultivariateForecast] = {}
+        for gid, group in enumerate(group_names):
+            members = [fc for i, fc in enumerate(forecasts) if ids[i] == gid and fc is not None]
+            if not members:
+                continue
+            joint = joint_anomaly_score(np.array([fc.anomaly_score for fc in members]))
+            results[group] = TotoMultivariateForecast(
+                group=group,
+                forecasts=members,
+                joint_anomaly_score=joint,
+                is_anomalous=joint > 70.0,
+                model="toto" if any(fc.model == "toto" for fc in members) else "statistical",
+            )
+        return results
+
+    @staticmethod
+    def _model_batch(
+        model,
+        forecaster,
+        rows: Union[np.ndarray, Sequence[Sequence[float]]],
+        names: List[str],
+        interval_seconds: int,
+        horizon: int,
+        spec: TotoInferenceProfile,
+        id_groups: Optional[Sequence[int]] = None,
+    ) -> Optional[List[TotoForecast]]:
+        """Run one batched Toto forward pass; None if inference fails.
+
+        By default each row is its own [1-channel] series in a [B, 1, T] batch.
+        With ``id_groups``, all rows become channels of a single [1, C, T]
+        multivariate series and ``id_groups[c]`` is channel c's ``id_mask``
+        value: channels sharing an id attend to each other.
+        """
         try:
             import torch
             from toto.data.util.dataset import MaskedTimeseries
 
             device = next(model.model.parameters()).device
 
-            # Pad/truncate to 512 points (model's context length)
-            target_len = 512
-            if len(values) >= target_len:
-                series_values = list(values[-target_len:])
-            else:
-                pad_value = values[0]
-                series_values = [pad_value] * (target_len - len(values)) + list(values)
-
-            # Z-score normalise (avoids scale sensitivity)
-            n = len(series_values)
-            mean_val = sum(series_values) / n
-            variance = sum((v - mean_val) ** 2 for v in series_values) / n
-            std_val = max(variance ** 0.5, 1e-6)
-            normalized = [(v - mean_val) / std_val for v in series_values]
-
-            input_tensor = torch.tensor([normalized], dtype=torch.float32).to(device)
-            ones = torch.ones_like(input_tensor, dtype=torch.bool)
+            normalized, mean, std, lengths = _prepare_context(rows, spec.context_length)
 
+            if id_groups is None:
+                # [B, T] → [B, 1 channel, T]
+                input_tensor = torch.from_numpy(normalized).unsqueeze(1).to(device)
+                id_mask = torch.zeros_like(input_tensor)
+            else:
+                # [C, T] → [1, C channels, T]
+                input_tensor = torch.from_numpy(normalized).unsqueeze(0).to(device)
+                ids = torch.tensor(list(id_groups), dtype=input_tensor.dtype, device=device)
+                id_mask = ids[None, :, None].expand_as(input_tensor).contiguous()
             inputs = MaskedTimeseries(
                 series=input_tensor,
-                padding_mask=ones,
-                id_mask=torch.zeros_like(input_tensor),
+                padding_mask=torch.ones_like(input_tensor, dtype=torch.bool),
+                id_mask=id_mask,
                 timestamp_seconds=torch.zeros_like(input_tensor),
-                time_interval_seconds=torch.full((1,), float(interval_seconds)).to(device),
+                time_interval_seconds=torch.full(
+                    input_tensor.shape[:2], float(interval_seconds), device=device
+                ),
             )
 
-            with torch.no_grad():
+            with torch.inference_mode():
                 result = forecaster.forecast(
                     inputs,
                     prediction_length=horizon,
-                    num_samples=64,
-                    samples_per_batch=64,
+                    num_samples=spec.num_samples,
+                    samples_per_batch=spec.samples_per_batch,
                 )
+                # samples: [B, 1, H, S] or [1, C, H, S] → [rows, H, S]
+                samples = result.samples[:, 0] if id_groups is None else result.samples[0]
+                # p10/p50/p90 in one reduction, one host copy
+                q = torch.tensor([0.1, 0.5, 0.9], device=samples.device)
+                bands = torch.quantile(samples.float(), q, dim=-1).cpu().numpy()
 
-            def _denorm(tensor_1d) -> List[float]:
-                return [round(float(v) * std_val + mean_val, 4) for v in tensor_1d]
-
-            # result.median shape: [batch, channels, horizon] → take [0, 0]
-            predicted_median = _denorm(result.median[0, 0])
-            lower_bound = _denorm(result.quantile(0.1)[0, 0])
-            upper_bound = _denorm(result.quantile(0.9)[0, 0])
-
-            # Anomaly score: fraction of the last 5 actual values that exceed the upper bound
-            last_actual = list(values[-5:])
-            # Project the last 5 predicted upper bounds (first 5 forecast steps ≈ near-term)
-            span = max(upper_bound[0] - lower_bound[0], 1e-6)
-            deviations = []
-            for i, actual in enumerate(last_actual):
-                ub = upper_bound[i] if i < len(upper_bound) else upper_bound[-1]
-                if actual > ub:
-                    deviations.append(min((actual - ub) / span * 100, 100.0))
-            anomaly_score = round(sum(deviations) / max(len(deviations), 1), 1) if deviations else 0.0
-
-            return TotoForecast(
-                series_name=series_name,
-                historical=list(values[-60:]),
-                predicted_median=predicted_median,
-                lower_bound=lower_bound,
-                upper_bound=upper_bound,
-                anomaly_score=anomaly_score,
-                is_anomalous=anomaly_score > 70.0,
-                interval_seconds=interval_seconds,
-            )
+            denorm, scores = _postprocess(bands, mean, std, normalized, lengths)
         except Exception as exc:
-            logger.error(f"Toto inference failed for '{series_name}': {exc}")
+            logger.error(f"Toto inference failed for {names}: {exc}")
             return None
 
+        forecasts = []
+        for row, name in enumerate(names):
+            score = float(scores[row])
+            forecasts.append(TotoForecast(
+                series_name=name,
+                historical=[float(v) for v in rows[row][-60:]],
+                predicted_median=denorm[1, row].tolist(),
+                lower_bound=denorm[0, row].tolist(),
+                upper_bound=denorm[2, row].tolist(),
+                anomaly_score=score,
+                is_anomalous=score > 70.0,
+                interval_seconds=interval_seconds,
+            ))
+        return forecasts
+
 
 # Module-level singleton
 _instance: Optional[TotoForecaster] = None
@@ -159,8 +840,26 @@ def get_toto_forecaster() -> TotoForecaster:
     return _instance
 
 
+def _prewarm() -> None:
+    from app.core.config import settings
+
+    _load_model()
+    if settings.toto_warmup:
+        _warmup()
+    elif _toto_model is not None:
+        _status["ready"] = True
+
+
 def prewarm_toto() -> None:
-    """Trigger model load in a background thread (call at startup)."""
-    thread = threading.Thread(target=_load_model, daemon=True, name="toto-prewarm")
+    """Load and warm up the model in a background thread (call at startup).
+
+    Skipped in sidecar mode: the sidecar process owns the model.
+    """
+    from app.core.config import settings
+
+    if settings.toto_sidecar_socket:
+        logger.info(f"Toto served by sidecar at {settings.toto_sidecar_socket}; skipping prewarm.")
+        return
+    thread = threading.Thread(target=_prewarm, daemon=True, name="toto-prewarm")
     thread.start()
     logger.info("Toto prewarm started in background thread.")
@@ -0,0 +1,374 @@
+"""Local Toto inference sidecar shared by all uvicorn workers.
+
+Every uvicorn worker process would otherwise load its own ~605 MB copy of
+Toto. In sidecar mode one process owns the model and workers send it
+forecast requests over a Unix socket; requests that arrive within a short
+batching window are merged into a single ``forecast_batch`` call.
+
+Run the sidecar, then point workers at it:
+    python -m app.integrations.toto_sidecar --socket /tmp/aidog-toto.sock
+    TOTO_SIDECAR_SOCKET=/tmp/aidog-toto.sock uvicorn app.main:app --workers 8
+
+Wire protocol: each message is a 4-byte big-endian length followed by a
+UTF-8 JSON object.
+    {"op": "forecast", "values": [[...], ...], "interval_seconds": 60,
+     "series_names": [...], "horizon": 60, "profile": "standard"}
+        → {"forecasts": [TotoForecast dict | null, ...]}
+    {"op": "forecast_groups", "groups": {group: {channel: [...]}}, ...}
+        → {"groups": {group: TotoMultivariateForecast dict}}
+    {"op": "status"} → toto_status() of the sidecar process
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.schemas.toto import TotoForecast, TotoMultivariateForecast
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+
+
+# ── Framing ───────────────────────────────────────────────────────────────────
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    payload = json.dumps(message, separators=(",", ":")).encode()
+    return _HEADER.pack(len(payload)) + payload
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("Toto sidecar closed the connection")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+async def _read_message(reader: asyncio.StreamReader) -> Dict[str, Any]:
+    (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    return json.loads(await reader.readexactly(size))
+
+
+def _rows(request: Any) -> int:
+    """Series in one request (0 if it is malformed)."""
+    return len(request.get("values") or []) if isinstance(request, dict) else 0
+
+
+# ── Server ────────────────────────────────────────────────────────────────────
+
+class TotoSidecarServer:
+    """Unix-socket server that micro-batches forecast requests onto one model."""
+
+    def __init__(self, socket_path: str, batch_window_ms: float = 5.0, max_batch: int = 64):
+        self.socket_path = socket_path
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self.batches_run = 0
+        self.requests_served = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._batch_task: Optional[asyncio.Task] = None
+        self._connections: set = set()
+        # Inference is CPU-bound; one thread keeps batches serialised on the model
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="toto-sidecar")
+
+    async def start(self) -> None:
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._queue = asyncio.Queue()
+        self._server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        self._batch_task = asyncio.get_running_loop().create_task(self._batch_loop())
+        logger.info(f"Toto sidecar listening on {self.socket_path}")
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        for task in [self._batch_task, *self._connections]:
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._executor.shutdown(wait=False)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    request = await _read_message(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                op = request.get("op")
+                if op == "status":
+                    response = self.status()
+                elif op == "forecast_groups":
+                    # Already one batched multivariate pass; no window needed
+                    response = await asyncio.get_running_loop().run_in_executor(
+                        self._executor, self._run_groups, request
+                    )
+                else:
+                    future = asyncio.get_running_loop().create_future()
+                    await self._queue.put((request, future))
+                    response = await future
+                writer.write(_encode(response))
+                await writer.drain()
+        except Exception as exc:
+            logger.warning(f"Toto sidecar connection error: {exc}")
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _batch_loop(self) -> None:
+        """Collect requests for one batching window, then run them as one batch per group."""
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            rows = _rows(pending[0][0])
+            while rows < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                rows += _rows(item[0])
+
+            # A bad batch must never take the loop (and every later request) down with it
+            try:
+                await self._run_batch(loop, pending)
+            except Exception as exc:
+                logger.error(f"Toto sidecar batch failed: {exc}")
+                for _, future in pending:
+                    if not future.done():
+                        future.set_result({"error": str(exc)})
+
+    async def _run_batch(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        pending: List[Tuple[Dict[str, Any], asyncio.Future]],
+    ) -> None:
+        """Run one batching window's requests, one model batch per group."""
+        groups: Dict[Tuple[Any, ...], List[Tuple[Dict[str, Any], asyncio.Future]]] = {}
+        for request, future in pending:
+            if not isinstance(request, dict):
+                if not future.done():
+                    future.set_result({"error": "malformed request"})
+                continue
+            key = (request.get("interval_seconds", 60), request.get("horizon"),
+                   request.get("profile", "standard"))
+            groups.setdefault(key, []).append((request, future))
+        for key, items in groups.items():
+            try:
+                results = await loop.run_in_executor(self._executor, self._run_group, key, items)
+            except Exception as exc:
+                logger.error(f"Toto sidecar batch failed: {exc}")
+                results = None
+                error = str(exc)
+            for i, (_, future) in enumerate(items):
+                # The client may have gone away (its future cancelled) while the batch ran
+                if future.done():
+                    continue
+                if results is None:
+                    future.set_result({"error": error})
+                else:
+                    future.set_result({"forecasts": results[i]})
+
+    def _run_group(
+        self, key: Tuple[Any, ...], items: List[Tuple[Dict[str, Any], asyncio.Future]]
+    ) -> List[List[Optional[Dict[str, Any]]]]:
+        from app.integrations.toto_forecaster import TotoForecaster
+
+        interval_seconds, horizon, profile = key
+        values: List[Sequence[float]] = []
+        names: List[str] = []
+        for request, _ in items:
+            rows = request.get("values", [])
+            values.extend(rows)
+            names.extend(request.get("series_names") or [f"metric_{i}" for i in range(len(rows))])
+
+        # Bypass sidecar delegation: this process owns the model
+        forecasts = TotoForecaster().forecast_batch(
+            values, interval_seconds, names, horizon=horizon, profile=profile, local=True
+        )
+        self.batches_run += 1
+        self.requests_served += len(items)
+
+        out, offset = [], 0
+        for request, _ in items:
+            count = len(request.get("values", []))
+            out.append([fc.model_dump() if fc else None for fc in forecasts[offset:offset + count]])
+            offset += count
+        return out
+
+    def _run_groups(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        from app.integrations.toto_forecaster import TotoForecaster
+
+        try:
+            results = TotoForecaster().forecast_groups(
+                request.get("groups", {}),
+                request.get("interval_seconds", 60),
+                horizon=request.get("horizon"),
+                profile=request.get("profile", "standard"),
+                local=True,
+            )
+        except Exception as exc:
+            logger.error(f"Toto sidecar multivariate forecast failed: {exc}")
+            return {"error": str(exc)}
+        self.batches_run += 1
+        self.requests_served += 1
+        return {"groups": {g: mv.model_dump() for g, mv in results.items()}}
+
+    def status(self) -> Dict[str, Any]:
+        from app.integrations.toto_forecaster import toto_status
+
+        return {
+            **toto_status(),
+            "pid": os.getpid(),
+            "batches_run": self.batches_run,
+            "requests_served": self.requests_served,
+        }
+
+
+# ── Client ────────────────────────────────────────────────────────────────────
+
+class TotoSidecarClient:
+    """Blocking client used by TotoForecaster in each worker process."""
+
+    def __init__(self, socket_path: str, timeout: float = 30.0, status_timeout: float = 1.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.status_timeout = status_timeout
+        self._local = threading.local()  # one connection per calling thread
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _reset(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+        self._local.sock = None
+
+    def _call(self, message: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        try:
+            sock = self._connection()
+            sock.settimeout(timeout if timeout is not None else self.timeout)
+            sock.sendall(_encode(message))
+            (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+            return json.loads(_recv_exact(sock, size))
+        except Exception:
+            self._reset()
+            raise
+
+    def forecast_batch(
+        self,
+        values: Sequence[Sequence[float]],
+        interval_seconds: int,
+        series_names: Sequence[str],
+        horizon: Optional[int],
+        profile: str,
+    ) -> List[Optional[TotoForecast]]:
+        response = self._call({
+            "op": "forecast",
+            "values": [[float(v) for v in row] for row in values],
+            "interval_seconds": interval_seconds,
+            "series_names": list(series_names),
+            "horizon": horizon,
+            "profile": profile,
+        })
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return [TotoForecast(**fc) if fc else None for fc in response["forecasts"]]
+
+    def forecast_groups(
+        self,
+        groups: Dict[str, Dict[str, Sequence[float]]],
+        interval_seconds: int,
+        horizon: Optional[int],
+        profile: str,
+    ) -> Dict[str, TotoMultivariateForecast]:
+        response = self._call({
+            "op": "forecast_groups",
+            "groups": {
+                g: {name: [float(v) for v in values] for name, values in chans.items()}
+                for g, chans in groups.items()
+            },
+            "interval_seconds": interval_seconds,
+            "horizon": horizon,
+            "profile": profile,
+        })
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return {g: TotoMultivariateForecast(**mv) for g, mv in response["groups"].items()}
+
+    def status(self) -> Dict[str, Any]:
+        """Sidecar readiness, bounded by ``status_timeout`` so a stuck sidecar fails fast."""
+        return self._call({"op": "status"}, timeout=self.status_timeout)
+
+
+_client: Optional[TotoSidecarClient] = None
+
+
+def get_sidecar_client() -> Optional[TotoSidecarClient]:
+    """Return the shared sidecar client, or None when sidecar mode is off."""
+    global _client
+    from app.core.config import settings
+
+    if not settings.toto_sidecar_socket:
+        return None
+    if _client is None:
+        _client = TotoSidecarClient(
+            settings.toto_sidecar_socket,
+            settings.toto_sidecar_timeout,
+            status_timeout=settings.toto_sidecar_status_timeout,
+        )
+    return _client
+
+
+def main() -> None:
+    from app.core.config import settings
+    from app.core.logging import setup_logging
+    from app.integrations.toto_forecaster import _prewarm
+
+    parser = argparse.ArgumentParser(description="Run the shared Toto inference sidecar.")
+    parser.add_argument("--socket", default=settings.toto_sidecar_socket or "/tmp/aidog-toto.sock")
+    parser.add_argument("--batch-window-ms", type=float, default=5.0)
+    parser.add_argument("--max-batch", type=int, default=64)
+    args = parser.parse_args()
+
+    setup_logging("INFO")
+    _prewarm()  # load + warm up before accepting requests
+    server = TotoSidecarServer(args.socket, args.batch_window_ms, args.max_batch)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
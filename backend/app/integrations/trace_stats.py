@@ -0,0 +1,274 @@
+"""Streaming trace latency aggregation on mergeable DDSketches.
+
+``DDSketch`` keeps a histogram over logarithmic buckets: a value ``x`` lands
+in bucket ``ceil(log_gamma(x))`` with ``gamma = (1 + a) / (1 - a)``, so every
+quantile it returns is within relative error ``a`` of the true one (1% by
+default), whatever the number of values. Two sketches with the same
+accuracy merge by adding bucket counts, and a sketch serializes to a small
+dict, so per-page or per-window sketches can be cached and combined later.
+
+``TraceAggregator`` groups spans by (service, resource) and keeps one sketch
+plus error and start-time counters per group. Pages are added as they
+stream in, with each page's durations bucketed in one NumPy pass.
+"""
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Span durations from the mock generator and the stand-in are microseconds
+DURATION_TO_MS = 1e-3
+
+_MIN_VALUE = 1e-9  # smaller values (and zero) are counted in a separate zero bucket
+
+
+class DDSketch:
+    """Relative-error quantile sketch over positive values."""
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.add_many(np.array([value], dtype=np.float64))
+
+    def add_many(self, values: Iterable[float]) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return
+        self.count += int(values.size)
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        positive = values[values > _MIN_VALUE]
+        self.zero_count += int(values.size - positive.size)
+        if positive.size:
+            keys, counts = np.unique(
+                np.ceil(np.log(positive) / self._log_gamma).astype(np.int64), return_counts=True
+            )
+            for key, n in zip(keys.tolist(), counts.tolist()):
+                self.bins[key] = self.bins.get(key, 0) + n
+            self._collapse()
+
+    def merge(self, other: "DDSketch") -> "DDSketch":
+        """Add ``other``'s counts into this sketch (accuracies must match)."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge DDSketches with different relative accuracy")
+        for key, n in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._collapse()
+        return self
+
+    def _collapse(self) -> None:
+        """Fold the lowest buckets together once there are more than ``max_bins``."""
+        if len(self.bins) <= self.max_bins:
+            return
+        keys = sorted(self.bins)
+        cut = keys[len(keys) - self.max_bins]
+        folded = sum(self.bins.pop(k) for k in keys if k < cut)
+        self.bins[cut] += folded
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile ``q`` (0–1), or None for an empty sketch."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "bins": {str(k): v for k, v in self.bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DDSketch":
+        sketch = cls(relative_accuracy=data["relative_accuracy"])
+        sketch.bins = {int(k): int(v) for k, v in data.get("bins", {}).items()}
+        sketch.zero_count = int(data.get("zero_count", 0))
+        sketch.count = int(data.get("count", 0))
+        sketch.sum = float(data.get("sum", 0.0))
+        if sketch.count:
+            sketch.min, sketch.max = float(data["min"]), float(data["max"])
+        return sketch
+
+
+class GroupStats:
+    """Latency sketch (ms), error count and start-time range of one span group."""
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.sketch = DDSketch(relative_accuracy)
+        self.errors = 0
+        self.first_start: Optional[float] = None
+        self.last_start: Optional[float] = None
+
+    def add(self, durations_ms: np.ndarray, errors: int, starts: np.ndarray) -> None:
+        self.sketch.add_many(durations_ms)
+        self.errors += errors
+        if starts.size:
+            lo, hi = float(starts.min()), float(starts.max())
+            self.first_start = lo if self.first_start is None else min(self.first_start, lo)
+            self.last_start = hi if self.last_start is None else max(self.last_start, hi)
+
+    def merge(self, other: "GroupStats") -> None:
+        self.sketch.merge(other.sketch)
+        self.errors += other.errors
+        for start in (other.first_start, other.last_start):
+            if start is not None:
+                self.first_start = (
+                    start if self.first_start is None else min(self.first_start, start)
+                )
+                self.last_start = start if self.last_start is None else max(self.last_start, start)
+
+    def summary(self, window_seconds: Optional[float]) -> Dict[str, Any]:
+        count = self.sketch.count
+        if window_seconds is None and self.first_start is not None:
+            window_seconds = (self.last_start - self.first_start) * DURATION_TO_MS / 1000
+        return {
+            "count": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "throughput_per_s": round(count / window_seconds, 3) if window_seconds else None,
+            "p50_ms": _round(self.sketch.quantile(0.50)),
+            "p95_ms": _round(self.sketch.quantile(0.95)),
+            "p99_ms": _round(self.sketch.quantile(0.99)),
+            "max_ms": _round(self.sketch.max if count else None),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sketch": self.sketch.to_dict(),
+            "errors": self.errors,
+            "first_start": self.first_start,
+            "last_start": self.last_start,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GroupStats":
+        stats = cls()
+        stats.sketch = DDSketch.from_dict(data["sketch"])
+        stats.errors = int(data.get("errors", 0))
+        stats.first_start, stats.last_start = data.get("first_start"), data.get("last_start")
+        return stats
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 3)
+
+
+def _is_error(span: Dict[str, Any]) -> bool:
+    if "error" in span:
+        return bool(span["error"])
+    return span.get("status") == "error"
+
+
+class TraceAggregator:
+    """Per (service, resource) latency, error-rate and throughput over streamed spans."""
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.groups: Dict[Tuple[str, str], GroupStats] = {}
+
+    def add_many(self, spans: Iterable[Dict[str, Any]]) -> None:
+        """Fold one page of normalized spans in."""
+        by_group: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for span in spans:
+            by_group.setdefault((span.get("service") or "", span.get("resource") or ""), []).append(
+                span
+            )
+        for key, group in by_group.items():
+            durations = np.fromiter(
+                (s.get("duration") or 0 for s in group), dtype=np.float64, count=len(group)
+            )
+            starts = np.fromiter(
+                (s["start"] for s in group if isinstance(s.get("start"), (int, float))),
+                dtype=np.float64,
+            )
+            stats = self.groups.get(key)
+            if stats is None:
+                stats = self.groups[key] = GroupStats(self.relative_accuracy)
+            stats.add(durations * DURATION_TO_MS, sum(_is_error(s) for s in group), starts)
+
+    def merge(self, other: "TraceAggregator") -> "TraceAggregator":
+        """Combine another aggregator (e.g. a cached page or an adjacent window) into this one."""
+        for key, stats in other.groups.items():
+            mine = self.groups.get(key)
+            if mine is None:
+                mine = self.groups[key] = GroupStats(self.relative_accuracy)
+            mine.merge(stats)
+        return self
+
+    @property
+    def spans(self) -> int:
+        return sum(g.sketch.count for g in self.groups.values())
+
+    def by_service(self) -> Dict[str, GroupStats]:
+        """Resources of each service merged into one group."""
+        services: Dict[str, GroupStats] = {}
+        for (service, _), stats in self.groups.items():
+            services.setdefault(service, GroupStats(self.relative_accuracy)).merge(stats)
+        return services
+
+    def summary(self, window_seconds: Optional[float] = None, top: int = 20) -> Dict[str, Any]:
+        """Compact view for prompts and API payloads.
+
+        Services are listed in full; resources are ranked by p95 latency and
+        cut to ``top``. ``window_seconds`` is the scanned window used for
+        throughput (the observed span of start times otherwise).
+        """
+        resources = [
+            {"service": service, "resource": resource, **stats.summary(window_seconds)}
+            for (service, resource), stats in self.groups.items()
+        ]
+        resources.sort(key=lambda r: -(r["p95_ms"] or 0))
+        return {
+            "spans": self.spans,
+            "services": {
+                name: stats.summary(window_seconds)
+                for name, stats in sorted(self.by_service().items())
+            },
+            "resources": resources[:top],
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "groups": [
+                {"service": service, "resource": resource, **stats.to_dict()}
+                for (service, resource), stats in self.groups.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TraceAggregator":
+        agg = cls(relative_accuracy=data.get("relative_accuracy", 0.01))
+        for group in data.get("groups", []):
+            agg.groups[(group["service"], group["resource"])] = GroupStats.from_dict(group)
+        return agg
@@ -0,0 +1,286 @@
+"""Embedded columnar store of recently fetched metric series.
+
+Each metric query keeps its series as contiguous NumPy columns (int64
+millisecond timestamps, float64 values) together with the window the store
+covers for it. A later request for an overlapping window only needs the
+points after the last stored bucket, plus a trailing overlap
+(``ts_store_delta_overlap_seconds``) so points Datadog ingested late
+replace the partial buckets stored earlier: ``plan`` returns that delta window,
+``merge`` splices the fetched points in and ``read`` serves the requested
+window locally.
+
+Memory is bounded by ``ts_store_max_bytes`` (least recently used queries are
+evicted first). With ``ts_store_path`` set, the store is written there on
+shutdown as one ``.npy`` file per column and reloaded memory-mapped on start.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Trailing stretch re-fetched with every delta: the newest buckets may have
+# been partial (or not yet ingested) when they were first fetched. It covers
+# at least this many buckets and at least ``overlap_seconds`` of ingestion lag.
+DELTA_OVERLAP_BUCKETS = 2
+DELTA_OVERLAP_SECONDS = 300
+
+_INDEX_FILE = "index.json"
+
+
+def series_key(series: Dict[str, Any]) -> str:
+    """Identity of a series within one query's response (its tag set)."""
+    tags = series.get("tag_set") or series.get("tags")
+    if tags:
+        return ",".join(sorted(tags))
+    return series.get("scope") or series.get("metric") or "*"
+
+
+@dataclass
+class StoredSeries:
+    meta: Dict[str, Any]        # the API series minus its pointlist
+    timestamps: np.ndarray      # int64 ms, ascending
+    values: np.ndarray          # float64, NaN where Datadog returned null
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + self.values.nbytes
+
+
+@dataclass
+class QueryEntry:
+    step: int                   # rollup interval the points are bucketed at
+    covered_from: int           # window (seconds) the stored series are complete for
+    covered_to: int
+    series: Dict[str, StoredSeries] = field(default_factory=dict)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(s.nbytes for s in self.series.values())
+
+
+def _columns(pointlist: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    if not pointlist:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    ts = np.fromiter((p[0] for p in pointlist), dtype=np.float64, count=len(pointlist))
+    vals = np.fromiter(
+        (np.nan if p[1] is None else p[1] for p in pointlist),
+        dtype=np.float64,
+        count=len(pointlist),
+    )
+    order = np.argsort(ts, kind="stable")
+    return ts[order].astype(np.int64), vals[order]
+
+
+class TimeSeriesStore:
+    """Per-query columnar series with coverage tracking and LRU eviction."""
+
+    def __init__(
+        self, max_bytes: int, retention_seconds: int, overlap_seconds: int = DELTA_OVERLAP_SECONDS
+    ):
+        self.max_bytes = max_bytes
+        self.retention_seconds = retention_seconds
+        self.overlap_seconds = overlap_seconds
+        self._entries: "OrderedDict[str, QueryEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "local_reads": 0, "delta_fetches": 0, "delta_misses": 0, "full_fetches": 0,
+            "evictions": 0,
+        }
+
+    def plan(
+        self, query: str, from_ts: int, to_ts: int, step: int
+    ) -> Optional[Tuple[int, int, bool]]:
+        """What must be fetched to serve ``query`` over the window.
+
+        Returns:
+            None when the store already covers the window, otherwise
+            (fetch_from, fetch_to, is_delta).
+        """
+        with self._lock:
+            entry = self._entries.get(query)
+            if entry is None or entry.step != step or from_ts < entry.covered_from:
+                self._stats["full_fetches"] += 1
+                return from_ts, to_ts, False
+            if to_ts <= entry.covered_to:
+                self._stats["local_reads"] += 1
+                return None
+            overlap_buckets = max(DELTA_OVERLAP_BUCKETS, -(-self.overlap_seconds // step))
+            delta_from = max(entry.covered_to - overlap_buckets * step, from_ts)
+            if delta_from <= from_ts:
+                self._stats["full_fetches"] += 1
+                return from_ts, to_ts, False
+            self._stats["delta_fetches"] += 1
+            return delta_from, to_ts, True
+
+    def merge(
+        self,
+        query: str,
+        series_list: List[Dict[str, Any]],
+        fetch_from: int,
+        fetch_to: int,
+        step: int,
+        is_delta: bool,
+        read_from: Optional[int] = None,
+    ) -> bool:
+        """Splice fetched series in: points from ``fetch_from`` on replace stored ones.
+
+        Returns False, storing nothing, for a delta whose base changed since
+        ``plan``: evicted, re-stored at another step, or no longer covering
+        ``read_from`` (the start of the window the caller reads back) through
+        ``fetch_from``. The caller must then fetch the whole window.
+        """
+        with self._lock:
+            entry = self._entries.get(query) if is_delta else None
+            if is_delta and (
+                entry is None
+                or entry.step != step
+                or entry.covered_to < fetch_from
+                or (read_from is not None and entry.covered_from > read_from)
+            ):
+                self._stats["delta_misses"] += 1
+                return False
+            if entry is None:
+                entry = QueryEntry(step=step, covered_from=fetch_from, covered_to=fetch_to)
+            cutoff_ms = fetch_from * 1000
+            keep_from_ms = (fetch_to - self.retention_seconds) * 1000
+            for series in series_list:
+                key = series_key(series)
+                ts, vals = _columns(series.get("pointlist") or [])
+                meta = {k: v for k, v in series.items() if k != "pointlist"}
+                old = entry.series.get(key)
+                if old is not None:
+                    head = old.timestamps < cutoff_ms
+                    ts = np.concatenate([old.timestamps[head], ts])
+                    vals = np.concatenate([old.values[head], vals])
+                keep = ts >= keep_from_ms
+                entry.series[key] = StoredSeries(
+                    meta, np.ascontiguousarray(ts[keep]), np.ascontiguousarray(vals[keep])
+                )
+            entry.covered_to = max(entry.covered_to, fetch_to)
+            entry.covered_from = max(entry.covered_from, fetch_to - self.retention_seconds)
+            self._entries[query] = entry
+            self._entries.move_to_end(query)
+            self._evict()
+            return True
+
+    def read(self, query: str, from_ts: int, to_ts: int) -> List[Dict[str, Any]]:
+        """Stored series of ``query`` sliced to [from_ts, to_ts], in API shape."""
+        with self._lock:
+            entry = self._entries.get(query)
+            if entry is None:
+                return []
+            self._entries.move_to_end(query)
+            out = []
+            for stored in entry.series.values():
+                lo = np.searchsorted(stored.timestamps, from_ts * 1000, side="left")
+                hi = np.searchsorted(stored.timestamps, to_ts * 1000, side="right")
+                ts = stored.timestamps[lo:hi].tolist()
+                vals = stored.values[lo:hi].tolist()
+                pointlist = [[t, None if v != v else v] for t, v in zip(ts, vals)]
+                out.append({**stored.meta, "pointlist": pointlist})
+            return out
+
+    def _evict(self) -> None:
+        total = sum(e.nbytes for e in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            query, entry = self._entries.popitem(last=False)
+            total -= entry.nbytes
+            self._stats["evictions"] += 1
+            logger.debug(f"Time-series store evicted {query!r} ({entry.nbytes} bytes)")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "queries": len(self._entries),
+                "series": sum(len(e.series) for e in self._entries.values()),
+                "bytes": sum(e.nbytes for e in self._entries.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    def save(self, path: str) -> None:
+        """Write every series to ``path`` (one .npy per column plus an index)."""
+        os.makedirs(path, exist_ok=True)
+        with self._lock:
+            index = []
+            for query, entry in self._entries.items():
+                series_index = []
+                for key, stored in entry.series.items():
+                    name = hashlib.blake2b(f"{query}\0{key}".encode(), digest_size=12).hexdigest()
+                    for suffix, column in (("t", stored.timestamps), ("v", stored.values)):
+                        # Write aside and rename: a loaded store may still be mapping the old file
+                        tmp = os.path.join(path, f"{name}.{suffix}.tmp.npy")
+                        np.save(tmp, column)
+                        os.replace(tmp, os.path.join(path, f"{name}.{suffix}.npy"))
+                    series_index.append({"key": key, "file": name, "meta": stored.meta})
+                index.append({
+                    "query": query,
+                    "step": entry.step,
+                    "covered_from": entry.covered_from,
+                    "covered_to": entry.covered_to,
+                    "series": series_index,
+                })
+        tmp_index = os.path.join(path, _INDEX_FILE + ".tmp")
+        with open(tmp_index, "w") as fh:
+            json.dump(index, fh)
+        os.replace(tmp_index, os.path.join(path, _INDEX_FILE))
+
+    def load(self, path: str) -> int:
+        """Load a saved store with its columns memory-mapped. Returns the queries loaded."""
+        index_path = os.path.join(path, _INDEX_FILE)
+        if not os.path.exists(index_path):
+            return 0
+        with open(index_path) as fh:
+            index = json.load(fh)
+        loaded = 0
+        with self._lock:
+            for item in index:
+                try:
+                    entry = QueryEntry(item["step"], item["covered_from"], item["covered_to"])
+                    for s in item["series"]:
+                        entry.series[s["key"]] = StoredSeries(
+                            s["meta"],
+                            np.load(os.path.join(path, f"{s['file']}.t.npy"), mmap_mode="r"),
+                            np.load(os.path.join(path, f"{s['file']}.v.npy"), mmap_mode="r"),
+                        )
+                except (OSError, KeyError, ValueError) as exc:
+                    logger.warning(f"Skipping stored series for {item.get('query')!r}: {exc}")
+                    continue
+                self._entries[item["query"]] = entry
+                loaded += 1
+            self._evict()
+        return loaded
+
+
+def open_ts_store() -> Optional[TimeSeriesStore]:
+    """A store configured from settings (loaded from ``ts_store_path`` if set); None if disabled."""
+    if not settings.ts_store_enabled:
+        return None
+    store = TimeSeriesStore(
+        settings.ts_store_max_bytes,
+        settings.ts_store_retention_seconds,
+        overlap_seconds=settings.ts_store_delta_overlap_seconds,
+    )
+    if settings.ts_store_path:
+        try:
+            loaded = store.load(settings.ts_store_path)
+            logger.info(f"Time-series store loaded {loaded} queries from {settings.ts_store_path}")
+        except Exception as exc:
+            logger.warning(f"Time-series store load failed: {exc}")
+    return store
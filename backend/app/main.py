@@ -1,4 +1,5 @@
 """FastAPI application entry point."""
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -22,9 +23,34 @@ async def lifespan(app: FastAPI):
         prewarm_toto()
     except Exception:
         pass
+    # Background anomaly scanner: precomputed scores for dashboards and detection
+    scanner = None
+    if settings.anomaly_scan_enabled:
+        from app.services.anomaly_scanner import get_anomaly_scanner
+        scanner = get_anomaly_scanner()
+        scanner.start()
+    # Service dependency graph, re-crawled in the background for blast-radius queries
+    graph = None
+    if settings.service_graph_enabled:
+        from app.services.service_graph import get_service_graph
+        graph = get_service_graph()
+        graph.start()
+    # Deploy marker index, refreshed incrementally for deploy correlation
+    deploys = None
+    if settings.deploy_index_enabled:
+        from app.services.deploy_index import get_deploy_index
+        deploys = get_deploy_index()
+        deploys.start()
     yield
     # Shutdown
-    pass
+    if scanner is not None:
+        await scanner.stop()
+    if graph is not None:
+        await graph.stop()
+    if deploys is not None:
+        await deploys.stop()
+    from app.integrations.datadog_mcp import get_datadog_client
+    get_datadog_client().persist_store()
 
 
 app = FastAPI(
@@ -46,8 +72,27 @@ app.add_middleware(
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {"status": "ok", "env": settings.app_env}
+    """Health check endpoint.
+
+    Includes Toto readiness, Datadog cache/rate-limit stats and the service
+    graph and deploy index sizes.
+    """
+    from app.integrations.datadog_mcp import get_datadog_client
+    from app.integrations.toto_forecaster import toto_health
+    from app.services.deploy_index import get_deploy_index
+    from app.services.service_graph import get_service_graph
+
+    return {
+        "status": "ok",
+        "env": settings.app_env,
+        # Sidecar mode does a blocking socket round trip; keep it off the event loop
+        "toto": await asyncio.to_thread(toto_health),
+        "datadog_cache": get_datadog_client().cache_stats(),
+        "datadog_ratelimit": get_datadog_client().ratelimit_stats(),
+        "datadog_store": get_datadog_client().store_stats(),
+        "service_graph": get_service_graph().status(),
+        "deploy_index": get_deploy_index().status(),
+    }
 
 
 # Import routes
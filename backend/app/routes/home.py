@@ -1,133 +1,246 @@
 """Home routes for personalized dashboard."""
-from fastapi import APIRouter, Depends
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+from app.core.config import settings
 from app.core.dependencies import get_db, get_current_user
 from app.db.models import User, Incident, Recommendation
 from app.services.memory_service import MemoryService
-from app.integrations.datadog_mcp import get_datadog_client
-from app.integrations.toto_forecaster import get_toto_forecaster
+from app.integrations.datadog_mcp import dd_priority, get_datadog_client
+from app.integrations.resample import resample_series
+from app.integrations.toto_forecaster import get_toto_forecaster, ELEVATED_SCORE
+from app.services.anomaly_scanner import get_anomaly_scanner
+from app.services.widgets import follow_up, get_widget_registry, run_widgets
 from app.agents.recommendation_designer import RecommendationDesignerAgent
 from datetime import datetime, timedelta
 
 router = APIRouter()
 
 
+CHART_QUERIES = {
+    "error_rate": "sum:demo.http.requests.count{status:500}.as_rate()",
+    # GAUGE metric submitted with percentile:p95 tag — use avg: aggregation
+    "p95_latency": "avg:demo.http.request.duration{percentile:p95}",
+    "throughput": "sum:demo.http.requests.count{*}.as_rate()",
+}
+ENDPOINTS_QUERY = "p95:demo.http.request.duration{*} by {endpoint}"
+WIDGET_POLL_PATH = "/api/home/widgets/{name}"
+# What a widget renders if its builder raises (matches the frontend's empty states)
+WIDGET_FALLBACKS: Dict[str, Any] = {
+    "topEndpoints": [],
+    "liveChartsData": {},
+    "activeAlerts": [],
+    "suggestedImprovements": [],
+    "totoAnomalies": [],
+}
+
+
+class _OverviewWidgets:
+    """The overview's slow widgets, sharing one packed metrics fetch between them."""
+
+    def __init__(self, preferences: Dict[str, Any], points: Optional[int]):
+        self.preferences = preferences
+        self.points = points
+        self._metrics: Optional[asyncio.Task] = None
+
+    def builders(self) -> Dict[str, Any]:
+        return {
+            "topEndpoints": self.top_endpoints,
+            "liveChartsData": self.live_charts,
+            "activeAlerts": self.active_alerts,
+            "suggestedImprovements": self.suggested_improvements,
+            "totoAnomalies": self.toto_anomalies,
+        }
+
+    def metrics(self) -> "asyncio.Task":
+        """Top endpoints plus the three live charts, packed into as few API requests as possible."""
+        if self._metrics is None:
+            self._metrics = asyncio.ensure_future(self._fetch_metrics())
+        return self._metrics
+
+    async def _fetch_metrics(self) -> Tuple[List[Any], Dict[str, Any]]:
+        now = int(datetime.now().timestamp())
+        one_hour_ago = int((datetime.now() - timedelta(hours=1)).timestamp())
+        try:
+            # Dashboard charts yield rate-limit budget to interactive investigations
+            with dd_priority("background"):
+                fetched = await get_datadog_client().query_metrics_many(
+                    [ENDPOINTS_QUERY, *CHART_QUERIES.values()], from_ts=one_hour_ago, to_ts=now,
+                )
+        except Exception:
+            fetched = [[] for _ in range(len(CHART_QUERIES) + 1)]
+        chart_series = {}
+        for key, series_list in zip(CHART_QUERIES, fetched[1:]):
+            if isinstance(series_list, list) and series_list:
+                chart_series[key] = resample_series(series_list[0])
+        return fetched[0], chart_series
+
+    async def top_endpoints(self) -> List[Dict[str, Any]]:
+        endpoints_metrics, _ = await self.metrics()
+        top_endpoints = []
+        try:
+            if isinstance(endpoints_metrics, list) and endpoints_metrics:
+                latest = []
+                for series in endpoints_metrics:
+                    resampled = resample_series(series)
+                    latest.append(
+                        (float(resampled.filled()[-1]) if resampled.observed else 0.0, series)
+                    )
+                latest.sort(key=lambda item: item[0], reverse=True)
+                for p95, series in latest[:5]:
+                    tags = series.get("tags", [])
+                    endpoint_tag = next((t for t in tags if t.startswith("endpoint:")), None)
+                    name = (
+                        endpoint_tag.replace("endpoint:", "")
+                        if endpoint_tag
+                        else series.get("metric", "unknown")
+                    )
+                    top_endpoints.append(
+                        {"name": name, "p95_latency": round(p95, 1), "error_rate": 0}
+                    )
+        except Exception:
+            pass
+
+        if not top_endpoints:
+            top_endpoints = [
+                {"name": "/api/users", "error_rate": 2.5, "p95_latency": 150},
+                {"name": "/api/payments", "error_rate": 1.2, "p95_latency": 200},
+                {"name": "/api/search", "error_rate": 0.8, "p95_latency": 120},
+            ]
+        return top_endpoints
+
+    async def live_charts(self) -> Dict[str, Any]:
+        _, resampled_charts = await self.metrics()
+        live_charts_data = {
+            key: {"series": resampled.points(self.points)}
+            for key, resampled in resampled_charts.items()
+        }
+        # Per-chart fallback: if a metric has no real data yet, show a flat baseline
+        # so the chart renders rather than appearing broken
+        for key in CHART_QUERIES:
+            if key not in live_charts_data:
+                live_charts_data[key] = {
+                    "series": [[(datetime.now() - timedelta(minutes=i)).timestamp() * 1000, 0.0]
+                               for i in range(60, 0, -1)],
+                }
+        return live_charts_data
+
+    async def active_alerts(self) -> List[Dict[str, Any]]:
+        try:
+            alerts = await get_datadog_client().get_active_monitors(time_window=3600)
+            return alerts[:10]
+        except Exception:
+            return []
+
+    async def suggested_improvements(self) -> List[Dict[str, Any]]:
+        try:
+            recommendation_agent = RecommendationDesignerAgent()
+            recommendations_output = await recommendation_agent.design_recommendations(
+                hypotheses=[],
+                user_preferences=self.preferences,
+            )
+            return [
+                {
+                    "id": rec.id,
+                    "type": rec.type,
+                    "title": rec.title,
+                    "description": rec.description,
+                    "confidence": rec.confidence,
+                }
+                for rec in recommendations_output.recommendations[:5]
+            ]
+        except Exception:
+            return []
+
+    async def toto_anomalies(self) -> List[Dict[str, Any]]:
+        # Read the background scanner's precomputed state for every service it
+        # tracks; only run one inline multivariate pass (off the event loop) for
+        # the demo charts when the scanner has nothing fresh
+        toto_anomalies = []
+        try:
+            group_states = get_anomaly_scanner().group_states()
+            if group_states:
+                for group_state in group_states:
+                    if not group_state["is_anomalous"]:
+                        continue
+                    for state in group_state["channels"]:
+                        if state.anomaly_score >= ELEVATED_SCORE:
+                            toto_anomalies.append({
+                                "service": group_state["group"],
+                                "series_name": state.query_name,
+                                "anomaly_score": state.anomaly_score,
+                                "is_anomalous": state.is_anomalous,
+                                "joint_anomaly_score": state.joint_anomaly_score,
+                            })
+            else:
+                _, resampled_charts = await self.metrics()
+                channels = {
+                    key: resampled.filled() for key, resampled in resampled_charts.items()
+                    if resampled.observed >= 10
+                }
+                interval = max(
+                    (resampled_charts[key].interval_seconds for key in channels), default=60
+                )
+                mv = await asyncio.to_thread(
+                    get_toto_forecaster().forecast_multivariate,
+                    channels, interval_seconds=interval, group="demo-service", profile="fast",
+                ) if channels else None
+                if mv and mv.is_anomalous:
+                    for fc in mv.forecasts:
+                        if fc.anomaly_score >= ELEVATED_SCORE:
+                            toto_anomalies.append({
+                                "service": "demo-service",
+                                "series_name": fc.series_name,
+                                "anomaly_score": fc.anomaly_score,
+                                "is_anomalous": fc.is_anomalous,
+                                "joint_anomaly_score": mv.joint_anomaly_score,
+                            })
+        except Exception:
+            pass
+        return toto_anomalies
+
+
 @router.get("/overview")
 async def get_home_overview(
+    points: Optional[int] = Query(
+        None, ge=3, le=10_000, description="Max points per chart series (LTTB)"
+    ),
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Dict[str, Any]:
-    """Get personalized home overview."""
+    """Get personalized home overview.
+
+    The Datadog, Toto and LLM widgets run concurrently, each under its
+    ``home_widget_deadlines`` entry. A widget that misses its deadline is
+    returned as ``{"status": "pending", ...}`` and listed in
+    ``pendingWidgets``; fetch it later from ``GET /api/home/widgets/{name}``.
+    ``points`` downsamples every chart series to the chart's pixel width.
+    """
     memory_service = MemoryService(db)
     memory_profile = memory_service.get_or_create_memory_profile(user.id)
-    datadog_client = get_datadog_client()
 
-    now = int(datetime.now().timestamp())
-    one_hour_ago = int((datetime.now() - timedelta(hours=1)).timestamp())
+    widgets = _OverviewWidgets(memory_profile.preferences or {}, points)
+    widget_task = asyncio.ensure_future(run_widgets(
+        widgets.builders(),
+        settings.home_widget_deadlines,
+        get_widget_registry(),
+        key_prefix=f"home:{user.id}",
+        poll_path=WIDGET_POLL_PATH,
+        fallbacks=WIDGET_FALLBACKS,
+    ))
 
-    # Get services user touches (from recent incidents)
+    # Local widgets read the database while the remote ones are in flight
     recent_incidents = db.query(Incident).order_by(
         Incident.started_at.desc()
     ).limit(10).all()
 
+    # Get services user touches (from recent incidents)
     services_set = set()
     for incident in recent_incidents:
         services_set.update(incident.services or [])
     services_you_touch = list(services_set)[:10]
 
-    # Real Datadog metric query: top endpoints by p95 latency
-    top_endpoints = []
-    try:
-        endpoints_metrics = await datadog_client.query_metrics(
-            query="p95:demo.http.request.duration{*} by {endpoint}",
-            from_ts=one_hour_ago,
-            to_ts=now,
-        )
-        if isinstance(endpoints_metrics, list) and endpoints_metrics:
-            sorted_series = sorted(
-                endpoints_metrics,
-                key=lambda s: s.get("pointlist", [[0, 0]])[-1][1] if s.get("pointlist") else 0,
-                reverse=True,
-            )
-            for series in sorted_series[:5]:
-                tags = series.get("tags", [])
-                endpoint_tag = next((t for t in tags if t.startswith("endpoint:")), None)
-                name = endpoint_tag.replace("endpoint:", "") if endpoint_tag else series.get("metric", "unknown")
-                points = series.get("pointlist", [])
-                p95 = points[-1][1] if points else 0
-                top_endpoints.append({"name": name, "p95_latency": round(p95, 1), "error_rate": 0})
-    except Exception:
-        pass
-
-    if not top_endpoints:
-        top_endpoints = [
-            {"name": "/api/users", "error_rate": 2.5, "p95_latency": 150},
-            {"name": "/api/payments", "error_rate": 1.2, "p95_latency": 200},
-            {"name": "/api/search", "error_rate": 0.8, "p95_latency": 120},
-        ]
-
-    # Real Datadog metric queries for live charts
-    live_charts_data = {}
-    try:
-        error_rate_series = await datadog_client.query_metrics(
-            query="sum:demo.http.requests.count{status:500}.as_rate()",
-            from_ts=one_hour_ago,
-            to_ts=now,
-        )
-        if isinstance(error_rate_series, list) and error_rate_series:
-            points = error_rate_series[0].get("pointlist", [])
-            live_charts_data["error_rate"] = {"series": [[p[0], p[1]] for p in points if p[1] is not None]}
-    except Exception:
-        pass
-
-    try:
-        # GAUGE metric submitted with percentile:p95 tag — use avg: aggregation
-        latency_series = await datadog_client.query_metrics(
-            query="avg:demo.http.request.duration{percentile:p95}",
-            from_ts=one_hour_ago,
-            to_ts=now,
-        )
-        if isinstance(latency_series, list) and latency_series:
-            points = latency_series[0].get("pointlist", [])
-            live_charts_data["p95_latency"] = {"series": [[p[0], p[1]] for p in points if p[1] is not None]}
-    except Exception:
-        pass
-
-    try:
-        throughput_series = await datadog_client.query_metrics(
-            query="sum:demo.http.requests.count{*}.as_rate()",
-            from_ts=one_hour_ago,
-            to_ts=now,
-        )
-        if isinstance(throughput_series, list) and throughput_series:
-            points = throughput_series[0].get("pointlist", [])
-            live_charts_data["throughput"] = {"series": [[p[0], p[1]] for p in points if p[1] is not None]}
-    except Exception:
-        pass
-
-    # Per-chart fallback: if a metric has no real data yet, show a flat baseline
-    # so the chart renders rather than appearing broken
-    if "error_rate" not in live_charts_data:
-        live_charts_data["error_rate"] = {
-            "series": [[(datetime.now() - timedelta(minutes=i)).timestamp() * 1000, 0.0]
-                       for i in range(60, 0, -1)],
-        }
-    if "p95_latency" not in live_charts_data:
-        live_charts_data["p95_latency"] = {
-            "series": [[(datetime.now() - timedelta(minutes=i)).timestamp() * 1000, 0.0]
-                       for i in range(60, 0, -1)],
-        }
-    if "throughput" not in live_charts_data:
-        live_charts_data["throughput"] = {
-            "series": [[(datetime.now() - timedelta(minutes=i)).timestamp() * 1000, 0.0]
-                       for i in range(60, 0, -1)],
-        }
-
-    # Get active alerts from Datadog
-    active_alerts = await datadog_client.get_active_monitors(time_window=3600)
-
-    # Get recent incidents
     recent_incidents_data = [
         {
             "id": inc.id,
@@ -144,55 +257,56 @@ async def get_home_overview(
         pattern.get("description", "") for pattern in (memory_profile.patterns or [])[:5]
     ]
 
-    # Generate suggestions using RecommendationDesignerAgent
-    try:
-        recommendation_agent = RecommendationDesignerAgent()
-        recommendations_output = await recommendation_agent.design_recommendations(
-            hypotheses=[],
-            user_preferences=memory_profile.preferences or {},
-        )
-        suggested_improvements = [
-            {
-                "id": rec.id,
-                "type": rec.type,
-                "title": rec.title,
-                "description": rec.description,
-                "confidence": rec.confidence,
-            }
-            for rec in recommendations_output.recommendations[:5]
-        ]
-    except Exception:
-        suggested_improvements = []
-
-    # Run Toto on error_rate + latency to surface anomalies on the home dashboard
-    toto_anomalies = []
-    try:
-        toto = get_toto_forecaster()
-        for series_name, series_key in [("error_rate", "error_rate"), ("p95_latency", "p95_latency")]:
-            series_data = live_charts_data.get(series_key, {}).get("series", [])
-            values = [pt[1] for pt in series_data if pt[1] is not None]
-            if len(values) >= 10:
-                fc = toto.forecast(
-                    values=values,
-                    interval_seconds=60,
-                    series_name=series_name,
-                )
-                if fc and fc.is_anomalous:
-                    toto_anomalies.append({
-                        "series_name": fc.series_name,
-                        "anomaly_score": fc.anomaly_score,
-                        "is_anomalous": fc.is_anomalous,
-                    })
-    except Exception:
-        pass
-
+    results, pending = await widget_task
     return {
         "servicesYouTouch": services_you_touch,
-        "topEndpoints": top_endpoints,
-        "liveChartsData": live_charts_data,
-        "activeAlerts": active_alerts[:10],
         "recentIncidents": recent_incidents_data,
         "learnedPatterns": learned_patterns,
-        "suggestedImprovements": suggested_improvements,
-        "totoAnomalies": toto_anomalies,
+        **results,
+        "pendingWidgets": pending,
+    }
+
+
+@router.get("/widgets/{name}")
+async def get_home_widget(
+    name: str,
+    points: Optional[int] = Query(
+        None, ge=3, le=10_000, description="Max points per chart series (LTTB)"
+    ),
+    wait: float = Query(
+        5.0, ge=0, le=30, description="Seconds to wait for a widget still in flight"
+    ),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """One overview widget: the result of its in-flight task, or a fresh run.
+
+    Returns ``{"status": "ready", "data": ...}``, or the pending marker again
+    if it is still not done after ``wait`` seconds.
+    """
+    memory_profile = MemoryService(db).get_or_create_memory_profile(user.id)
+    builders = _OverviewWidgets(memory_profile.preferences or {}, points).builders()
+    if name not in builders:
+        raise HTTPException(status_code=404, detail=f"Unknown widget: {name}")
+    return await follow_up(
+        name,
+        builders[name],
+        wait,
+        get_widget_registry(),
+        key_prefix=f"home:{user.id}",
+        poll_path=WIDGET_POLL_PATH,
+        fallback=WIDGET_FALLBACKS.get(name),
+    )
+
+
+@router.get("/anomalies")
+async def get_anomaly_state(
+    user: User = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """Rolling anomaly state of every series tracked by the background scanner."""
+    scanner = get_anomaly_scanner()
+    states = sorted(scanner.states(), key=lambda s: s.anomaly_score, reverse=True)
+    return {
+        "scanner": scanner.status(),
+        "series": [state.model_dump() for state in states],
     }
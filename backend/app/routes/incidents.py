@@ -1,9 +1,9 @@
 """Incident routes."""
 import asyncio
 from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from sqlalchemy.orm import Session
 
@@ -16,11 +16,17 @@ from app.schemas.api import (
     ExecuteStepResponse,
 )
 from app.integrations.datadog_mcp import get_datadog_client
-from app.integrations.toto_forecaster import get_toto_forecaster
+from app.integrations.downsample import downsample_forecast, downsample_series
+from app.integrations.log_templates import LogTemplateMiner
+from app.integrations.resample import resample_series
+from app.integrations.toto_forecaster import get_toto_forecaster, ELEVATED_SCORE
+from app.integrations.trace_stats import TraceAggregator
 from app.agentcore.runner import InvestigationRunner
 from app.agentcore.memory import get_memory_client
+from app.services.deploy_index import correlate_deploys, get_deploy_index
 from app.services.memory_service import MemoryService
 from app.services.investigation_service import InvestigationService
+from app.services.forecast_store import ForecastStore, unpack_forecast
 
 router = APIRouter()
 
@@ -60,23 +66,24 @@ async def _run_toto_for_incident(incident_id: int, db_url: str) -> None:
                     query=query, from_ts=two_hours_ago, to_ts=now
                 )
                 if isinstance(series_list, list) and series_list:
-                    points = series_list[0].get("pointlist", [])
-                    values = [p[1] for p in points if p[1] is not None]
-                    if len(values) >= 10:
-                        fc = toto.forecast(
-                            values=values,
-                            interval_seconds=60,
+                    resampled = resample_series(series_list[0])
+                    if resampled.observed >= 10:
+                        # Inference is CPU-bound (or a blocking sidecar call)
+                        fc = await asyncio.to_thread(
+                            toto.forecast,
+                            values=resampled.filled(),
+                            interval_seconds=resampled.interval_seconds,
                             series_name=series_name,
                             horizon=60,
+                            profile="precise",
                         )
                         if fc:
-                            forecasts.append(fc.model_dump())
+                            forecasts.append(fc)
             except Exception:
                 pass
 
         if forecasts:
-            incident.toto_forecasts = forecasts
-            session.commit()
+            ForecastStore(session).save(incident_id, forecasts, profile="precise")
     except Exception:
         pass
     finally:
@@ -193,18 +200,23 @@ async def get_incident(
 @router.get("/{incident_id}/forecast")
 async def get_incident_forecast(
     incident_id: int,
+    points: Optional[int] = Query(None, ge=3, le=10_000, description="Max points per line (LTTB)"),
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Dict[str, Any]:
-    """Return Toto forecasts stored on the incident.
+    """Return the latest stored Toto forecast per series for the incident.
 
     If not yet computed, runs them synchronously (takes ~10–30s on CPU).
+    ``points`` downsamples the history and forecast band of each series.
     """
     incident = db.query(Incident).filter(Incident.id == incident_id).first()
     if not incident:
         raise HTTPException(status_code=404, detail="Incident not found")
 
-    forecasts = incident.toto_forecasts or []
+    store = ForecastStore(db)
+    records = store.latest_records(incident_id)
+    forecasts = [unpack_forecast(r) for r in records]
+    computed_at = max(r.computed_at for r in records).isoformat() if records else None
 
     # If not yet computed, run synchronously
     if not forecasts:
@@ -222,27 +234,48 @@ async def get_incident_forecast(
                     query=query, from_ts=two_hours_ago, to_ts=now
                 )
                 if isinstance(series_list, list) and series_list:
-                    points = series_list[0].get("pointlist", [])
-                    values = [p[1] for p in points if p[1] is not None]
-                    if len(values) >= 10:
-                        fc = toto.forecast(
-                            values=values,
-                            interval_seconds=60,
+                    resampled = resample_series(series_list[0])
+                    if resampled.observed >= 10:
+                        # Inference is CPU-bound (or a blocking sidecar call)
+                        fc = await asyncio.to_thread(
+                            toto.forecast,
+                            values=resampled.filled(),
+                            interval_seconds=resampled.interval_seconds,
                             series_name=series_name,
+                            profile="standard",
                         )
                         if fc:
-                            forecasts.append(fc.model_dump())
+                            forecasts.append(fc)
             except Exception:
                 pass
 
         if forecasts:
-            incident.toto_forecasts = forecasts
-            db.commit()
+            store.save(incident_id, forecasts, profile="standard")
+        computed_at = datetime.now().isoformat()
 
     return {
         "incident_id": incident_id,
-        "forecasts": forecasts,
-        "computed_at": datetime.now().isoformat(),
+        "forecasts": [downsample_forecast(fc.model_dump(), points) for fc in forecasts],
+        "computed_at": computed_at,
+    }
+
+
+@router.get("/{incident_id}/forecast/history")
+async def get_incident_forecast_history(
+    incident_id: int,
+    series_name: Optional[str] = None,
+    limit: int = 100,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Return the incident's anomaly-score history, newest first."""
+    incident = db.query(Incident).filter(Incident.id == incident_id).first()
+    if not incident:
+        raise HTTPException(status_code=404, detail="Incident not found")
+
+    return {
+        "incident_id": incident_id,
+        "history": ForecastStore(db).history(incident_id, series_name=series_name, limit=limit),
     }
 
 
@@ -285,18 +318,27 @@ async def detect_incident_from_metrics(
 
     # Fetch the three key metrics
     metrics_bundle: Dict[str, Any] = {}
-    for name, query in [
-        ("error_rate", "sum:demo.http.requests.count{status:500}.as_rate()"),
-        ("latency_p95", "avg:demo.http.request.duration{percentile:p95}"),
-        ("throughput", "sum:demo.http.requests.count{*}.as_rate()"),
-    ]:
+    channel_values: Dict[str, Any] = {}
+    channel_interval = 60
+    metric_queries = {
+        "error_rate": "sum:demo.http.requests.count{status:500}.as_rate()",
+        "latency_p95": "avg:demo.http.request.duration{percentile:p95}",
+        "throughput": "sum:demo.http.requests.count{*}.as_rate()",
+    }
+    try:
+        fetched = await datadog_client.query_metrics_many(
+            list(metric_queries.values()), from_ts=one_hour_ago, to_ts=now
+        )
+    except Exception:
+        fetched = [[] for _ in metric_queries]
+    for name, series in zip(metric_queries, fetched):
         try:
-            series = await datadog_client.query_metrics(
-                query=query, from_ts=one_hour_ago, to_ts=now
-            )
             if isinstance(series, list) and series:
-                points = series[0].get("pointlist", [])
-                values = [p[1] for p in points if p[1] is not None]
+                resampled = resample_series(series[0])
+                values = resampled.tolist()
+                if len(values) >= 10:
+                    channel_values[name] = resampled.filled()
+                    channel_interval = max(channel_interval, resampled.interval_seconds)
                 if values:
                     metrics_bundle[name] = {
                         "current": round(values[-1], 3),
@@ -322,16 +364,81 @@ async def detect_incident_from_metrics(
         anomalies_found.append(f"error rate spiked to {error_rate:.2f}/s (avg {error_avg:.2f}/s)")
     if latency > max(latency_avg * 1.5, 300):
         anomalies_found.append(f"p95 latency at {latency:.0f}ms (avg {latency_avg:.0f}ms)")
+
+    # Joint Toto score: precomputed by the background scanner for every service
+    # it tracks when fresh, otherwise one multivariate pass over the three metrics
+    toto_joint_score = None
+    anomalous_services: List[str] = []
+    try:
+        from app.services.anomaly_scanner import get_anomaly_scanner
+
+        group_states = get_anomaly_scanner().group_states()
+        if group_states:
+            toto_joint_score = group_states[0]["joint_anomaly_score"]
+            for group_state in group_states:
+                if group_state["is_anomalous"]:
+                    anomalous_services.append(group_state["group"])
+                    elevated = [
+                        s.query_name
+                        for s in group_state["channels"]
+                        if s.anomaly_score >= ELEVATED_SCORE
+                    ]
+                    anomalies_found.append(
+                        f"Toto joint anomaly score {group_state['joint_anomaly_score']:.0f}/100 "
+                        f"on {group_state['group']} across {', '.join(elevated)}"
+                    )
+        else:
+            # Inference is CPU-bound (or a blocking sidecar call); keep it off the event loop
+            mv = (
+                await asyncio.to_thread(
+                    get_toto_forecaster().forecast_multivariate,
+                    channel_values,
+                    interval_seconds=channel_interval,
+                    group="demo-service",
+                    profile="fast",
+                )
+                if channel_values
+                else None
+            )
+            toto_joint_score = mv.joint_anomaly_score if mv else None
+            if mv and mv.is_anomalous:
+                anomalous_services.append("demo-service")
+                elevated = [
+                    fc.series_name for fc in mv.forecasts if fc.anomaly_score >= ELEVATED_SCORE
+                ]
+                anomalies_found.append(
+                    f"Toto joint anomaly score {toto_joint_score:.0f}/100 "
+                    f"across {', '.join(elevated)}"
+                )
+    except Exception:
+        pass
     if not anomalies_found:
         anomalies_found.append(f"elevated error rate {error_rate:.2f}/s, p95 latency {latency:.0f}ms")
 
+    # Deploys just before the anomaly, from the background-refreshed index (no extra API call)
+    try:
+        deploys = correlate_deploys(
+            await get_deploy_index().ensure_fresh(), anomalous_services or None, now
+        )
+    except Exception:
+        deploys = {"deploy_present": False, "markers": []}
+    for marker in deploys["markers"]:
+        version = f" {marker['version']}" if marker.get("version") else ""
+        anomalies_found.append(
+            f"deploy of {marker['service']}{version} "
+            f"{marker['minutes_before']:.0f} min before detection"
+        )
+
     # Feed real data + computed anomalies to Minimax for rich incident description
     telemetry_bundle = {
         "monitors": monitors,
         "live_metrics": metrics_bundle,
         "detected_anomalies": anomalies_found,
+        "toto_joint_anomaly_score": toto_joint_score,
+        "deploys": deploys,
         "timestamp": datetime.now().isoformat(),
-        "source_service": "demo-service",
+        "source_service": anomalous_services[0] if anomalous_services else "demo-service",
+        "anomalous_services": anomalous_services,
         "instruction": (
             "Use the detected_anomalies list and live_metrics to write a specific, "
             "actionable incident title and description. Include exact metric values."
@@ -343,11 +450,11 @@ async def detect_incident_from_metrics(
         envelope = await summarizer.summarize(telemetry_bundle)
         title = envelope.title or f"Incident: {', '.join(anomalies_found[:1])}"
         severity = envelope.severity or ("critical" if error_rate > 5 or latency > 500 else "warning")
-        services = envelope.affected_services or ["demo-service"]
+        services = envelope.affected_services or anomalous_services or ["demo-service"]
     except Exception:
         severity = "critical" if error_rate > 5 or latency > 500 else "warning"
-        title = f"demo-service: {', '.join(anomalies_found)}"
-        services = ["demo-service"]
+        services = anomalous_services or ["demo-service"]
+        title = f"{', '.join(services)}: {', '.join(anomalies_found)}"
 
     incident = Incident(
         source="datadog_live",
@@ -387,6 +494,9 @@ async def create_incident_from_monitor(
 async def execute_step(
     incident_id: int,
     request: ExecuteStepRequest,
+    points: Optional[int] = Query(
+        None, ge=3, le=10_000, description="Max points per metric series (LTTB)"
+    ),
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> ExecuteStepResponse:
@@ -422,19 +532,36 @@ async def execute_step(
                 f"sum:demo.http.requests.count{{service:{','.join(incident.services or ['demo-service'])}}}.as_rate()",
             )
             metrics = await datadog_client.query_metrics(query=query)
-            result_data = {"metrics": metrics, "query": query}
+            result_data = {
+                "metrics": [downsample_series(m, points) for m in metrics],
+                "query": query,
+            }
         elif action_type == "search_logs":
             log_query = action_params.get(
                 "query", f"service:{','.join(incident.services or ['demo-service'])}"
             )
-            logs = await datadog_client.search_logs(query=log_query, limit=50)
-            result_data = {"logs": logs[:20], "count": len(logs)}
+            # Stream the scan under a budget, mining templates page by page;
+            # only a few raw lines are kept alongside them
+            miner, sample, count = LogTemplateMiner(), [], 0
+            async for page in datadog_client.iter_logs(
+                query=log_query, max_records=action_params.get("max_records")
+            ):
+                miner.add_many(page)
+                sample.extend(page[:5 - len(sample)])
+                count += len(page)
+            result_data = {"log_templates": miner.summary(), "logs": sample, "count": count}
         elif action_type == "fetch_traces":
             service = action_params.get("service") or (
                 incident.services[0] if incident.services else None
             )
-            traces = await datadog_client.fetch_traces(service=service, limit=50)
-            result_data = {"traces": traces[:20], "count": len(traces)}
+            agg, sample, count = TraceAggregator(), [], 0
+            async for page in datadog_client.iter_traces(
+                service=service, max_records=action_params.get("max_records")
+            ):
+                agg.add_many(page)
+                sample.extend(page[:5 - len(sample)])
+                count += len(page)
+            result_data = {"trace_stats": agg.summary(), "traces": sample, "count": count}
         else:
             result_data = {"message": f"Step '{action_type}' executed"}
     except Exception as exc:
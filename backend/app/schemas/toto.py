@@ -3,6 +3,17 @@ from pydantic import BaseModel
 from typing import List
 
 
+class TotoInferenceProfile(BaseModel):
+    """Sampling/decoding budget for a single Toto inference call."""
+
+    name: str
+    num_samples: int               # Samples drawn from the predictive distribution
+    samples_per_batch: int         # Samples decoded per forward pass
+    horizon: int                   # Forecast steps decoded (prediction_length)
+    context_length: int            # History points fed to the model
+    prefilter: bool = False        # Screen with the statistical detector first
+
+
 class TotoForecast(BaseModel):
     """Result of a Toto time-series forecast for a single metric."""
 
@@ -14,6 +25,17 @@ class TotoForecast(BaseModel):
     anomaly_score: float           # 0–100; > 70 = anomalous
     is_anomalous: bool             # anomaly_score > 70
     interval_seconds: int          # Time interval between data points
+    model: str = "toto"            # "toto" or "statistical" (prefilter / fallback)
+
+
+class TotoMultivariateForecast(BaseModel):
+    """Joint forecast of correlated metrics fed to Toto as channels of one series."""
+
+    group: str                     # Usually the service the channels belong to
+    forecasts: List[TotoForecast]  # One per channel
+    joint_anomaly_score: float     # 0–100; corroboration-weighted max of channel scores
+    is_anomalous: bool             # joint_anomaly_score > 70
+    model: str = "toto"            # "toto" or "statistical"
 
 
 class TotoForecastResult(BaseModel):
@@ -21,3 +43,17 @@ class TotoForecastResult(BaseModel):
 
     forecasts: List[TotoForecast]
     computed_at: str               # ISO timestamp
+
+
+class SeriesAnomalyState(BaseModel):
+    """Rolling anomaly state of one scanned series, kept by the background scanner."""
+
+    series_key: str                # "<query name>:<group>"
+    query_name: str                # Name of the configured scan query (e.g. error_rate)
+    group: str                     # Group-by tag value, usually the service
+    anomaly_score: float           # Latest 0–100 score
+    is_anomalous: bool             # anomaly_score > 70
+    joint_anomaly_score: float     # Latest joint score of the group's channels
+    model: str                     # "toto" or "statistical"
+    scores: List[float]            # Rolling window of recent scores, oldest first
+    updated_at: float              # Unix time of the last scan that saw this series
@@ -0,0 +1,232 @@
+"""Background anomaly scanner that keeps rolling anomaly state per series.
+
+Every ``anomaly_scan_interval_seconds`` the scanner runs each configured
+group-by query once (one call covers every service), groups the returned
+series by their group-by tag and scores all of them in a single batched
+``forecast_groups`` pass with the fast profile. Dashboards and detection
+read the precomputed state instead of running inference inline.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.schemas.toto import SeriesAnomalyState
+
+logger = get_logger(__name__)
+
+# Minimum points a series needs before it is scored
+MIN_POINTS = 10
+# Scan intervals after which a series no scan returns any more is forgotten
+EVICT_AFTER_SCANS = 10
+
+
+def series_group(series: Dict[str, Any]) -> str:
+    """Group-by tag value of a Datadog series (e.g. the service name).
+
+    Live responses carry ``tag_set``/``scope``; mock series carry ``tags``.
+    """
+    tags = series.get("tag_set") or series.get("tags") or []
+    if not tags and series.get("scope"):
+        tags = series["scope"].split(",")
+    for tag in tags:
+        if tag.startswith("service:"):
+            return tag.split(":", 1)[1]
+    return tags[0] if tags else "*"
+
+
+class AnomalyScanner:
+    """Periodic batched anomaly scoring over a fixed set of metric queries."""
+
+    def __init__(
+        self,
+        queries: Dict[str, str],
+        interval_seconds: int = 60,
+        lookback_seconds: int = 3600,
+        history: int = 60,
+    ):
+        self.queries = queries
+        self.interval_seconds = interval_seconds
+        self.lookback_seconds = lookback_seconds
+        self.history = history
+        self.scans_run = 0
+        self.last_scan_at: Optional[float] = None
+        self._states: Dict[str, SeriesAnomalyState] = {}
+        self._scores: Dict[str, Deque[float]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    # ── Lifecycle ────────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        """Start the scan loop on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(
+                f"Anomaly scanner started ({len(self.queries)} queries "
+                f"every {self.interval_seconds}s)"
+            )
+
+    async def stop(self) -> None:
+        """Cancel the scan loop and wait for it to exit."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.scan_once()
+            except Exception as exc:
+                logger.error(f"Anomaly scan failed: {exc}")
+            await asyncio.sleep(self.interval_seconds)
+
+    # ── Scanning ─────────────────────────────────────────────────────────────
+
+    async def _fetch(
+        self, from_ts: int, to_ts: int
+    ) -> Tuple[Dict[str, Dict[str, np.ndarray]], int]:
+        """Run every group-by query.
+
+        Returns:
+            (group → {query name: resampled values}, coarsest interval seen)
+        """
+        from app.integrations.datadog_mcp import dd_priority, get_datadog_client
+        from app.integrations.resample import resample_series
+
+        names = list(self.queries)
+        try:
+            # All queries packed into as few API requests as possible, at
+            # background priority so scans back off before investigations do
+            with dd_priority("background"):
+                results = await get_datadog_client().query_metrics_many(
+                    [self.queries[n] for n in names], from_ts=from_ts, to_ts=to_ts
+                )
+        except Exception as exc:
+            logger.warning(f"Anomaly scan fetch failed: {exc}")
+            return {}, 60
+        groups: Dict[str, Dict[str, np.ndarray]] = {}
+        interval = 0
+        for name, series_list in zip(names, results):
+            for series in series_list:
+                resampled = resample_series(series)
+                if resampled.observed >= MIN_POINTS:
+                    groups.setdefault(series_group(series), {})[name] = resampled.filled()
+                    interval = max(interval, resampled.interval_seconds)
+        return groups, interval or 60
+
+    async def scan_once(self) -> int:
+        """Fetch, score and record one scan. Returns the number of series scored."""
+        from app.integrations.toto_forecaster import get_toto_forecaster
+
+        now = time.time()
+        groups, interval = await self._fetch(int(now - self.lookback_seconds), int(now))
+        self._evict(now)
+        if not groups:
+            return 0
+
+        # Inference is CPU-bound; keep it off the event loop
+        results = await asyncio.to_thread(
+            get_toto_forecaster().forecast_groups, groups, interval, None, "fast"
+        )
+        scanned_at = time.time()
+        scored = 0
+        for group, mv in results.items():
+            for fc in mv.forecasts:
+                key = f"{fc.series_name}:{group}"
+                scores = self._scores.setdefault(key, deque(maxlen=self.history))
+                scores.append(fc.anomaly_score)
+                self._states[key] = SeriesAnomalyState(
+                    series_key=key,
+                    query_name=fc.series_name,
+                    group=group,
+                    anomaly_score=fc.anomaly_score,
+                    is_anomalous=fc.is_anomalous,
+                    joint_anomaly_score=mv.joint_anomaly_score,
+                    model=fc.model,
+                    scores=list(scores),
+                    updated_at=scanned_at,
+                )
+                scored += 1
+        self.scans_run += 1
+        self.last_scan_at = scanned_at
+        logger.debug(f"Anomaly scan scored {scored} series across {len(results)} groups")
+        return scored
+
+    def _evict(self, now: float) -> int:
+        """Drop series (services, tag values) not scored for ``EVICT_AFTER_SCANS`` intervals."""
+        cutoff = now - EVICT_AFTER_SCANS * self.interval_seconds
+        stale = [key for key, state in self._states.items() if state.updated_at < cutoff]
+        for key in stale:
+            del self._states[key]
+            self._scores.pop(key, None)
+        if stale:
+            logger.debug(f"Anomaly scanner evicted {len(stale)} stale series")
+        return len(stale)
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def is_fresh(self, state: SeriesAnomalyState, now: Optional[float] = None) -> bool:
+        """True if the state was refreshed within two scan intervals."""
+        return (now or time.time()) - state.updated_at <= 2 * self.interval_seconds
+
+    def states(
+        self, group: Optional[str] = None, fresh_only: bool = True
+    ) -> List[SeriesAnomalyState]:
+        """Current per-series states, optionally limited to one group."""
+        now = time.time()
+        return [
+            s for s in self._states.values()
+            if (group is None or s.group == group) and (not fresh_only or self.is_fresh(s, now))
+        ]
+
+    @staticmethod
+    def _joint(group: str, channels: List[SeriesAnomalyState]) -> Dict[str, Any]:
+        joint = channels[0].joint_anomaly_score
+        return {
+            "group": group,
+            "joint_anomaly_score": joint,
+            "is_anomalous": joint > 70.0,
+            "channels": channels,
+        }
+
+    def group_state(self, group: str) -> Optional[Dict[str, Any]]:
+        """Fresh joint state of one group, or None if it has not been scanned recently."""
+        channels = self.states(group)
+        return self._joint(group, channels) if channels else None
+
+    def group_states(self) -> List[Dict[str, Any]]:
+        """Fresh joint state of every scanned group, most anomalous first."""
+        by_group: Dict[str, List[SeriesAnomalyState]] = {}
+        for state in self.states():
+            by_group.setdefault(state.group, []).append(state)
+        joint = [self._joint(group, channels) for group, channels in by_group.items()]
+        return sorted(joint, key=lambda g: g["joint_anomaly_score"], reverse=True)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "scans_run": self.scans_run,
+            "last_scan_at": self.last_scan_at,
+            "series_tracked": len(self._states),
+        }
+
+
+_scanner: Optional[AnomalyScanner] = None
+
+
+def get_anomaly_scanner() -> AnomalyScanner:
+    """Return the shared AnomalyScanner instance."""
+    global _scanner
+    if _scanner is None:
+        _scanner = AnomalyScanner(
+            settings.anomaly_scan_queries,
+            interval_seconds=settings.anomaly_scan_interval_seconds,
+            lookback_seconds=settings.anomaly_scan_lookback_seconds,
+            history=settings.anomaly_scan_history,
+        )
+    return _scanner
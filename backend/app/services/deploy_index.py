@@ -0,0 +1,214 @@
+"""In-memory time index of deploy markers per service.
+
+Each service keeps its deploys in two parallel lists sorted by time, so
+"deploys of these services in the N seconds before t" is two ``bisect``
+lookups per service plus the matches. Markers without a service tag are
+filed under ``"*"`` and match every service.
+
+``DeployIndexCache`` keeps the index current from ``get_deploy_markers``:
+each refresh only fetches the window since the last one (with a small
+overlap) and markers older than ``deploy_index_lookback_seconds`` are
+dropped. A background loop refreshes every ``deploy_index_refresh_seconds``,
+so investigations and detection read the index without calling Datadog.
+"""
+import asyncio
+import time
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+ANY_SERVICE = "*"
+# Seconds re-fetched before the end of the last refreshed window (late-ingested events)
+REFRESH_OVERLAP_SECONDS = 120
+
+
+class DeployIndex:
+    """Sorted per-service deploy timestamps (epoch ms) with their markers."""
+
+    def __init__(self):
+        self._times: Dict[str, List[int]] = {}
+        self._markers: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_id: Dict[str, Tuple[str, int]] = {}  # marker id → (service, timestamp)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def add(self, marker: Dict[str, Any]) -> bool:
+        """Index one marker, replacing an earlier copy with the same id.
+
+        Returns True if the marker is new or moved.
+        """
+        service = marker.get("service") or ANY_SERVICE
+        ts = int(marker.get("timestamp") or 0)
+        marker_id = str(marker.get("id") or f"{service}@{ts}")
+        previous = self._by_id.get(marker_id)
+        if previous == (service, ts):
+            return False
+        if previous is not None:
+            self._remove(marker_id, *previous)
+        times = self._times.setdefault(service, [])
+        pos = bisect_right(times, ts)
+        times.insert(pos, ts)
+        self._markers.setdefault(service, []).insert(
+            pos, {**marker, "id": marker_id, "service": service}
+        )
+        self._by_id[marker_id] = (service, ts)
+        return True
+
+    def add_many(self, markers: Iterable[Dict[str, Any]]) -> int:
+        return sum(self.add(m) for m in markers)
+
+    def _remove(self, marker_id: str, service: str, ts: int) -> None:
+        times, markers = self._times[service], self._markers[service]
+        lo, hi = bisect_left(times, ts), bisect_right(times, ts)
+        for pos in range(lo, hi):
+            if markers[pos]["id"] == marker_id:
+                del times[pos], markers[pos]
+                break
+        del self._by_id[marker_id]
+
+    def prune(self, before_ms: int) -> int:
+        """Drop markers older than ``before_ms``. Returns how many were dropped."""
+        dropped = 0
+        for service, times in self._times.items():
+            cut = bisect_left(times, before_ms)
+            if cut:
+                for marker in self._markers[service][:cut]:
+                    del self._by_id[marker["id"]]
+                del times[:cut], self._markers[service][:cut]
+                dropped += cut
+        return dropped
+
+    def between(
+        self, services: Optional[Iterable[str]], from_ms: int, to_ms: int
+    ) -> List[Dict[str, Any]]:
+        """Markers of ``services`` (all if None) in ``[from_ms, to_ms]``, oldest first."""
+        keys = (
+            list(self._times) if services is None else list(dict.fromkeys([*services, ANY_SERVICE]))
+        )
+        found = []
+        for service in keys:
+            times = self._times.get(service)
+            if not times:
+                continue
+            lo, hi = bisect_left(times, from_ms), bisect_right(times, to_ms)
+            found.extend(self._markers[service][lo:hi])
+        found.sort(key=lambda m: m["timestamp"])
+        return found
+
+    def recent(
+        self, services: Optional[Iterable[str]], at_ts: float, within_seconds: int
+    ) -> List[Dict[str, Any]]:
+        """Deploys of ``services`` in the ``within_seconds`` before ``at_ts`` (epoch seconds)."""
+        at_ms = int(at_ts * 1000)
+        return self.between(services, at_ms - within_seconds * 1000, at_ms)
+
+
+class DeployIndexCache:
+    """A DeployIndex refreshed incrementally from the Datadog client."""
+
+    def __init__(self, refresh_seconds: int = 60, lookback_seconds: int = 24 * 3600):
+        self.index = DeployIndex()
+        self.refresh_seconds = refresh_seconds
+        self.lookback_seconds = lookback_seconds
+        self.covered_to: Optional[int] = None   # end (epoch s) of the last fetched window
+        self.refreshed_at: Optional[float] = None
+        self.fetches = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    # ── Lifecycle ────────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(f"Deploy index refresher started (every {self.refresh_seconds}s)")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                from app.integrations.datadog_mcp import dd_priority
+
+                with dd_priority("background"):
+                    await self.refresh()
+            except Exception as exc:
+                logger.error(f"Deploy index refresh failed: {exc}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    # ── Refresh ──────────────────────────────────────────────────────────────
+
+    async def refresh(self, now: Optional[int] = None) -> int:
+        """Fetch markers since the last refresh. Returns markers added or moved."""
+        from app.integrations.datadog_mcp import get_datadog_client
+
+        async with self._lock:
+            now = int(now if now is not None else time.time())
+            start = now - self.lookback_seconds
+            if self.covered_to is not None:
+                start = max(start, self.covered_to - REFRESH_OVERLAP_SECONDS)
+            markers = await get_datadog_client().get_deploy_markers(from_ts=start, to_ts=now)
+            self.fetches += 1
+            changed = self.index.add_many(markers)
+            self.index.prune((now - self.lookback_seconds) * 1000)
+            self.covered_to = max(self.covered_to or now, now)
+            self.refreshed_at = time.time()
+            return changed
+
+    async def ensure_fresh(self) -> DeployIndex:
+        """The index, refreshed first only if the background loop hasn't kept it current."""
+        if self.refreshed_at is None or time.time() - self.refreshed_at > 2 * self.refresh_seconds:
+            await self.refresh()
+        return self.index
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "markers": len(self.index),
+            "covered_to": self.covered_to,
+            "fetches": self.fetches,
+            "running": self._task is not None and not self._task.done(),
+        }
+
+
+def correlate_deploys(
+    index: DeployIndex,
+    services: Optional[Iterable[str]],
+    at_ts: float,
+    within_seconds: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Deploy evidence for an anomaly at ``at_ts``: the matching markers and whether any exist."""
+    within = (
+        within_seconds if within_seconds is not None else settings.deploy_correlation_window_seconds
+    )
+    markers = index.recent(services, at_ts, within)
+    return {
+        "deploy_present": bool(markers),
+        "window_seconds": within,
+        "markers": [
+            {**m, "minutes_before": round((at_ts * 1000 - m["timestamp"]) / 60000, 1)}
+            for m in markers
+        ],
+    }
+
+
+_cache: Optional[DeployIndexCache] = None
+
+
+def get_deploy_index() -> DeployIndexCache:
+    """Return the shared DeployIndexCache instance."""
+    global _cache
+    if _cache is None:
+        _cache = DeployIndexCache(
+            refresh_seconds=settings.deploy_index_refresh_seconds,
+            lookback_seconds=settings.deploy_index_lookback_seconds,
+        )
+    return _cache
@@ -0,0 +1,168 @@
+"""Forecast store: packed, append-only Toto forecast history per incident."""
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func, inspect, text
+from sqlalchemy.orm import Session, load_only
+
+from app.core.logging import get_logger
+from app.db.models import TotoForecastRecord
+from app.schemas.toto import TotoForecast
+
+logger = get_logger(__name__)
+
+# Little-endian float32: half the size of float64 and plenty for display
+_DTYPE = np.dtype("<f4")
+
+
+def pack_forecast(forecast: TotoForecast) -> bytes:
+    """Pack historical | median | lower | upper into one float32 blob."""
+    return np.concatenate([
+        np.asarray(forecast.historical, dtype=_DTYPE),
+        np.asarray(forecast.predicted_median, dtype=_DTYPE),
+        np.asarray(forecast.lower_bound, dtype=_DTYPE),
+        np.asarray(forecast.upper_bound, dtype=_DTYPE),
+    ]).tobytes()
+
+
+def unpack_forecast(record: TotoForecastRecord) -> TotoForecast:
+    """Rebuild the TotoForecast schema from a stored record."""
+    values = np.round(np.frombuffer(record.values, dtype=_DTYPE).astype(np.float64), 4)
+    n, h = record.history_length, record.horizon
+    return TotoForecast(
+        series_name=record.series_name,
+        historical=values[:n].tolist(),
+        predicted_median=values[n:n + h].tolist(),
+        lower_bound=values[n + h:n + 2 * h].tolist(),
+        upper_bound=values[n + 2 * h:n + 3 * h].tolist(),
+        anomaly_score=record.anomaly_score,
+        is_anomalous=record.is_anomalous,
+        interval_seconds=record.interval_seconds,
+        model=record.model or "toto",
+    )
+
+
+def _record(
+    incident_id: int, forecast: TotoForecast, profile: Optional[str]
+) -> TotoForecastRecord:
+    return TotoForecastRecord(
+        incident_id=incident_id,
+        series_name=forecast.series_name,
+        model=forecast.model,
+        profile=profile,
+        interval_seconds=forecast.interval_seconds,
+        anomaly_score=forecast.anomaly_score,
+        is_anomalous=forecast.is_anomalous,
+        history_length=len(forecast.historical),
+        horizon=len(forecast.predicted_median),
+        values=pack_forecast(forecast),
+    )
+
+
+def backfill_legacy_forecasts(db: Session) -> int:
+    """Move forecasts out of the legacy ``incidents.toto_forecasts`` JSON column.
+
+    Databases created before the ``toto_forecasts`` table kept each incident's
+    forecasts inline. They are unpacked into records and the column is cleared
+    in the same transaction, so this runs once per incident. Returns the
+    number of forecasts moved.
+    """
+    columns = {c["name"] for c in inspect(db.get_bind()).get_columns("incidents")}
+    if "toto_forecasts" not in columns:
+        return 0
+    rows = db.execute(
+        text("SELECT id, toto_forecasts FROM incidents WHERE toto_forecasts IS NOT NULL")
+    ).all()
+    moved = 0
+    for incident_id, raw in rows:
+        try:
+            payload = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+        except ValueError:
+            payload = None
+        for item in payload if isinstance(payload, list) else []:
+            try:
+                db.add(_record(incident_id, TotoForecast(**item), None))
+                moved += 1
+            except Exception as exc:
+                logger.warning(f"Skipping legacy forecast of incident {incident_id}: {exc}")
+        db.execute(
+            text("UPDATE incidents SET toto_forecasts = NULL WHERE id = :id"), {"id": incident_id}
+        )
+    db.commit()
+    if moved:
+        logger.info(f"Moved {moved} legacy forecasts into the toto_forecasts table")
+    return moved
+
+
+class ForecastStore:
+    """Service for persisting and reading incident forecasts."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def save(
+        self,
+        incident_id: int,
+        forecasts: Sequence[TotoForecast],
+        profile: Optional[str] = None,
+    ) -> List[TotoForecastRecord]:
+        """Append one record per forecast; earlier forecasts are kept as history."""
+        records = [_record(incident_id, fc, profile) for fc in forecasts]
+        self.db.add_all(records)
+        self.db.commit()
+        return records
+
+    def latest_records(self, incident_id: int) -> List[TotoForecastRecord]:
+        """Most recent record per series (only these blobs are read)."""
+        latest_ids = (
+            self.db.query(func.max(TotoForecastRecord.id))
+            .filter(TotoForecastRecord.incident_id == incident_id)
+            .group_by(TotoForecastRecord.series_name)
+        )
+        return (
+            self.db.query(TotoForecastRecord)
+            .filter(TotoForecastRecord.id.in_(latest_ids.scalar_subquery()))
+            .order_by(TotoForecastRecord.series_name)
+            .all()
+        )
+
+    def latest(self, incident_id: int) -> List[TotoForecast]:
+        """Most recent forecast per series."""
+        return [unpack_forecast(r) for r in self.latest_records(incident_id)]
+
+    def history(
+        self,
+        incident_id: int,
+        series_name: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Score history, newest first, without reading the packed arrays."""
+        query = (
+            self.db.query(TotoForecastRecord)
+            .options(load_only(
+                TotoForecastRecord.series_name,
+                TotoForecastRecord.computed_at,
+                TotoForecastRecord.model,
+                TotoForecastRecord.profile,
+                TotoForecastRecord.anomaly_score,
+                TotoForecastRecord.is_anomalous,
+            ))
+            .filter(TotoForecastRecord.incident_id == incident_id)
+        )
+        if series_name:
+            query = query.filter(TotoForecastRecord.series_name == series_name)
+        records = query.order_by(
+            TotoForecastRecord.computed_at.desc(), TotoForecastRecord.id.desc()
+        ).limit(limit).all()
+        return [
+            {
+                "series_name": r.series_name,
+                "computed_at": r.computed_at.isoformat() if r.computed_at else None,
+                "model": r.model,
+                "profile": r.profile,
+                "anomaly_score": r.anomaly_score,
+                "is_anomalous": r.is_anomalous,
+            }
+            for r in records
+        ]
@@ -64,8 +64,8 @@ class MemoryService:
         }
         return defaults.get(role, defaults["SRE"])
 
+    @staticmethod
     def generate_incident_signature(
-        self,
         services: List[str],
         endpoint: Optional[str],
         symptom_type: str,
@@ -0,0 +1,339 @@
+"""Cached service dependency graph with bitset reachability.
+
+Services are numbered as they are discovered. Each one's callees and
+callers are kept as Python integers used as bitsets (bit ``j`` set = an
+edge to service ``j``), and the transitive closures are computed once per
+graph change with a bitset Warshall pass. Upstream/downstream sets and
+blast-radius counts are then a dictionary lookup and a popcount.
+
+``ServiceGraphCache`` fills the graph from ``get_service_dependencies``: it
+crawls outward from seed services, re-fetches only services whose edges are
+older than ``service_graph_ttl_seconds``, and re-crawls in the background
+every ``service_graph_refresh_seconds`` at background rate-limit priority.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _bits(mask: int) -> Iterable[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class ServiceGraph:
+    """Directed caller → callee graph over service names."""
+
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self.names: List[str] = []
+        self._down: List[int] = []   # direct callees of each service
+        self._up: List[int] = []     # direct callers
+        self.edges: Dict[Tuple[int, int], Dict[str, int]] = {}  # (caller, callee) → calls/errors
+        self.version = 0
+        self._closure_version = -1
+        self._down_closure: List[int] = []
+        self._up_closure: List[int] = []
+
+    def _id(self, service: str) -> int:
+        i = self._index.get(service)
+        if i is None:
+            i = self._index[service] = len(self.names)
+            self.names.append(service)
+            self._down.append(0)
+            self._up.append(0)
+        return i
+
+    def _names(self, mask: int) -> List[str]:
+        return sorted(self.names[j] for j in _bits(mask))
+
+    def __contains__(self, service: str) -> bool:
+        return service in self._index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    # ── Updates ──────────────────────────────────────────────────────────────
+
+    def set_edges(
+        self, service: str, dependencies: List[Dict[str, Any]], dependents: List[Dict[str, Any]]
+    ) -> bool:
+        """Replace one service's edges from a ``get_service_dependencies`` result.
+
+        Its outgoing edges are replaced; callers it reports are added (their
+        other edges are theirs to report). Returns True if the graph changed.
+        """
+        i = self._id(service)
+        old_down = self._down[i]
+        new_down = 0
+        for dep in dependencies:
+            j = self._id(dep["service"])
+            new_down |= 1 << j
+            self.edges[(i, j)] = {"calls": dep.get("calls", 0), "errors": dep.get("errors", 0)}
+        changed = new_down != old_down
+        for j in _bits(old_down & ~new_down):
+            self._up[j] &= ~(1 << i)
+            self.edges.pop((i, j), None)
+        for j in _bits(new_down):
+            self._up[j] |= 1 << i
+        self._down[i] = new_down
+        for caller in dependents:
+            j = self._id(caller["service"])
+            if not self._down[j] >> i & 1:
+                changed = True
+            self._down[j] |= 1 << i
+            self._up[i] |= 1 << j
+            self.edges[(j, i)] = {
+                "calls": caller.get("calls", 0),
+                "errors": caller.get("errors", 0),
+            }
+        if changed:
+            self.version += 1
+        return changed
+
+    def _closures(self) -> None:
+        if self._closure_version == self.version:
+            return
+        down = list(self._down)
+        for k in range(len(down)):
+            bit = 1 << k
+            reach_k = down[k]
+            for i in range(len(down)):
+                if down[i] & bit:
+                    down[i] |= reach_k
+        n = len(down)
+        up = [0] * n
+        for i in range(n):
+            for j in _bits(down[i]):
+                up[j] |= 1 << i
+        self._down_closure, self._up_closure = down, up
+        self._closure_version = self.version
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def downstream(self, service: str) -> List[str]:
+        """Every service ``service`` depends on, directly or transitively."""
+        if service not in self._index:
+            return []
+        self._closures()
+        i = self._index[service]
+        return self._names(self._down_closure[i] & ~(1 << i))
+
+    def upstream(self, service: str) -> List[str]:
+        """Every service that depends on ``service``, directly or transitively."""
+        if service not in self._index:
+            return []
+        self._closures()
+        i = self._index[service]
+        return self._names(self._up_closure[i] & ~(1 << i))
+
+    def blast_radius(self, services: Iterable[str]) -> Dict[str, Any]:
+        """Services impacted if ``services`` fail: everything upstream of any of them."""
+        self._closures()
+        failing = impacted = dependencies = 0
+        for service in services:
+            i = self._index.get(service)
+            if i is None:
+                continue
+            failing |= 1 << i
+            impacted |= self._up_closure[i]
+            dependencies |= self._down_closure[i]
+        impacted &= ~failing
+        dependencies &= ~failing
+        total = len(self.names)
+        return {
+            "services": self._names(failing),
+            "impacted": self._names(impacted),
+            "impacted_count": bin(impacted).count("1"),
+            "downstream_count": bin(dependencies).count("1"),
+            "known_services": total,
+            "impacted_share": round(bin(impacted).count("1") / total, 3) if total else 0.0,
+        }
+
+    def error_paths(self, service: str, max_paths: int = 5) -> List[Dict[str, Any]]:
+        """Shortest caller chains errors from ``service`` take to entry services.
+
+        Walks upstream over edges that reported errors (any edge when the
+        source has no counts) and returns one path per entry point reached,
+        most errors first.
+        """
+        start = self._index.get(service)
+        if start is None:
+            return []
+        parent = {start: -1}
+        queue = deque([start])
+        entries = []
+        while queue:
+            i = queue.popleft()
+            callers = [j for j in _bits(self._up[i]) if self._edge_errors(j, i) is not False]
+            if not callers and i != start:
+                entries.append(i)
+            for j in callers:
+                if j not in parent:
+                    parent[j] = i
+                    queue.append(j)
+        paths = []
+        for entry in entries:
+            path, errors = [], 0
+            node = entry
+            while node != -1:
+                nxt = parent[node]
+                if nxt != -1:
+                    errors += self.edges.get((node, nxt), {}).get("errors", 0)
+                path.append(self.names[node])
+                node = nxt
+            paths.append({"path": list(reversed(path)), "errors": errors})
+        paths.sort(key=lambda p: (-p["errors"], len(p["path"])))
+        return paths[:max_paths]
+
+    def _edge_errors(self, caller: int, callee: int) -> Optional[bool]:
+        """False if the edge reported calls but no errors; True/None otherwise."""
+        stats = self.edges.get((caller, callee))
+        if not stats or not stats.get("calls"):
+            return None
+        return stats.get("errors", 0) > 0
+
+    def describe(self, services: Iterable[str]) -> Optional[str]:
+        """One-line blast radius for an incident envelope, or None if nothing is known."""
+        radius = self.blast_radius(services)
+        if not radius["services"]:
+            return None
+        impacted = radius["impacted"]
+        listed = ", ".join(impacted[:5]) + (
+            f" and {len(impacted) - 5} more" if len(impacted) > 5 else ""
+        )
+        return (
+            f"{radius['impacted_count']} of {radius['known_services']} services depend on "
+            f"{', '.join(radius['services'])}" + (f" ({listed})" if impacted else "")
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "services": len(self.names),
+            "edges": sum(bin(m).count("1") for m in self._down),
+            "version": self.version,
+        }
+
+
+class ServiceGraphCache:
+    """A ServiceGraph kept fresh from the Datadog client."""
+
+    def __init__(
+        self,
+        refresh_seconds: int = 300,
+        ttl_seconds: int = 600,
+        max_services: int = 500,
+        seeds: Optional[List[str]] = None,
+    ):
+        self.graph = ServiceGraph()
+        self.refresh_seconds = refresh_seconds
+        self.ttl_seconds = ttl_seconds
+        self.max_services = max_services
+        self.seeds: Set[str] = set(seeds or [])
+        self._fetched_at: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.fetches = 0
+
+    # ── Lifecycle ────────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(f"Service graph refresher started (every {self.refresh_seconds}s)")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                from app.integrations.datadog_mcp import dd_priority
+
+                with dd_priority("background"):
+                    await self.refresh(self.seeds | set(self.graph.names))
+            except Exception as exc:
+                logger.error(f"Service graph refresh failed: {exc}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    # ── Crawling ─────────────────────────────────────────────────────────────
+
+    def _stale(self, service: str, now: float) -> bool:
+        return now - self._fetched_at.get(service, 0.0) > self.ttl_seconds
+
+    async def refresh(self, services: Iterable[str]) -> int:
+        """Crawl outward from ``services``, fetching only stale ones. Returns services fetched."""
+        from app.integrations.datadog_mcp import get_datadog_client
+
+        client = get_datadog_client()
+        async with self._lock:
+            now = time.time()
+            frontier = [s for s in services if self._stale(s, now)]
+            seen = set(frontier)
+            fetched = 0
+            while frontier:
+                results = await asyncio.gather(
+                    *(client.get_service_dependencies(s) for s in frontier), return_exceptions=True
+                )
+                next_frontier = []
+                for service, result in zip(frontier, results):
+                    if isinstance(result, Exception) or not result:
+                        continue
+                    self.graph.set_edges(
+                        service, result.get("dependencies", []), result.get("dependents", [])
+                    )
+                    self._fetched_at[service] = now
+                    fetched += 1
+                    for neighbour in result.get("dependencies", []) + result.get("dependents", []):
+                        name = neighbour["service"]
+                        if (
+                            name not in seen
+                            and self._stale(name, now)
+                            and len(seen) < self.max_services
+                        ):
+                            seen.add(name)
+                            next_frontier.append(name)
+                frontier = next_frontier
+            self.fetches += fetched
+            return fetched
+
+    async def ensure(self, services: Iterable[str]) -> ServiceGraph:
+        """The graph with ``services`` and everything reachable from them loaded."""
+        services = [s for s in services if s]
+        self.seeds.update(services)
+        await self.refresh(services)
+        return self.graph
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            **self.graph.to_dict(),
+            "running": self._task is not None and not self._task.done(),
+            "fetches": self.fetches,
+        }
+
+
+_cache: Optional[ServiceGraphCache] = None
+
+
+def get_service_graph() -> ServiceGraphCache:
+    """Return the shared ServiceGraphCache instance."""
+    global _cache
+    if _cache is None:
+        _cache = ServiceGraphCache(
+            refresh_seconds=settings.service_graph_refresh_seconds,
+            ttl_seconds=settings.service_graph_ttl_seconds,
+            max_services=settings.service_graph_max_services,
+            seeds=settings.service_graph_seeds,
+        )
+    return _cache
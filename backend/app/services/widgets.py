@@ -0,0 +1,153 @@
+"""Concurrent dashboard widgets with per-widget deadlines.
+
+``run_widgets`` starts every widget of a page as its own task and waits
+for each one only until its deadline. A widget that is late does not hold
+up the response. It answers with a pending marker, and its task keeps
+running in ``WidgetRegistry`` under a per-user key, so
+``GET /api/home/widgets/{name}`` can return the result once it lands
+instead of starting the work again. A widget that raises renders its
+fallback (e.g. ``[]``) so the page never receives ``null`` for it.
+"""
+import asyncio
+import copy
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+WidgetBuilder = Callable[[], Awaitable[Any]]
+
+
+def pending_marker(name: str, poll: str) -> Dict[str, Any]:
+    """What a late widget returns in place of its data."""
+    return {"status": "pending", "widget": name, "poll": poll}
+
+
+class WidgetRegistry:
+    """Widget tasks that outlived their deadline, kept until picked up or expired."""
+
+    def __init__(self, ttl_seconds: float = 120.0):
+        self.ttl_seconds = ttl_seconds
+        self._tasks: Dict[str, Tuple[asyncio.Task, float]] = {}  # key → (task, started at)
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for key, (task, started) in list(self._tasks.items()):
+            if now - started > self.ttl_seconds:
+                task.cancel()
+                del self._tasks[key]
+
+    def put(self, key: str, task: asyncio.Task) -> None:
+        self._expire()
+        self._tasks[key] = (task, time.monotonic())
+
+    def take(self, key: str) -> Optional[asyncio.Task]:
+        """The in-flight task for ``key`` if it belongs to the running event loop."""
+        self._expire()
+        entry = self._tasks.get(key)
+        if entry is None:
+            return None
+        task = entry[0]
+        if task.get_loop() is not asyncio.get_running_loop() or task.cancelled():
+            del self._tasks[key]
+            return None
+        return task
+
+    def discard(self, key: str) -> None:
+        self._tasks.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+
+_FAILED = object()
+
+
+async def _settle(task: asyncio.Task, deadline: float) -> Tuple[bool, Any]:
+    """(done, result or _FAILED) after up to ``deadline`` seconds; the task is not cancelled."""
+    done, _ = await asyncio.wait({task}, timeout=deadline)
+    if not done:
+        return False, None
+    try:
+        return True, task.result()
+    except Exception as exc:
+        logger.warning(f"Widget task failed: {exc}")
+        return True, _FAILED
+
+
+async def run_widgets(
+    builders: Dict[str, WidgetBuilder],
+    deadlines: Dict[str, float],
+    registry: WidgetRegistry,
+    key_prefix: str,
+    poll_path: str,
+    fallbacks: Optional[Dict[str, Any]] = None,
+    default_deadline: float = 3.0,
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Run every widget concurrently, each bounded by its own deadline.
+
+    A widget that raises renders a copy of its entry in ``fallbacks`` (a
+    failed widget renders empty rather than failing the page); without
+    one its key is left out of the results.
+
+    Returns:
+        (widget name → result or pending marker, names of pending widgets)
+    """
+    fallbacks = fallbacks or {}
+    tasks = {name: asyncio.ensure_future(build()) for name, build in builders.items()}
+    settled = await asyncio.gather(*(
+        _settle(task, deadlines.get(name, default_deadline)) for name, task in tasks.items()
+    ))
+    results: Dict[str, Any] = {}
+    pending: List[str] = []
+    for (name, task), (done, result) in zip(tasks.items(), settled):
+        if not done:
+            registry.put(f"{key_prefix}:{name}", task)
+            results[name] = pending_marker(name, poll_path.format(name=name))
+            pending.append(name)
+        elif result is not _FAILED:
+            results[name] = result
+        elif name in fallbacks:
+            results[name] = copy.deepcopy(fallbacks[name])
+    if pending:
+        logger.debug(f"Widgets past their deadline: {', '.join(pending)}")
+    return results, pending
+
+
+async def follow_up(
+    name: str,
+    build: WidgetBuilder,
+    deadline: float,
+    registry: WidgetRegistry,
+    key_prefix: str,
+    poll_path: str,
+    fallback: Any = None,
+) -> Dict[str, Any]:
+    """Result of one widget: its in-flight task if there is one, else a fresh run.
+
+    A widget that raises is reported ready with a copy of ``fallback``.
+    """
+    key = f"{key_prefix}:{name}"
+    task = registry.take(key) or asyncio.ensure_future(build())
+    done, result = await _settle(task, deadline)
+    if not done:
+        registry.put(key, task)
+        return pending_marker(name, poll_path.format(name=name))
+    registry.discard(key)
+    if result is _FAILED:
+        result = copy.deepcopy(fallback)
+    return {"status": "ready", "widget": name, "data": result}
+
+
+_registry: Optional[WidgetRegistry] = None
+
+
+def get_widget_registry() -> WidgetRegistry:
+    """Return the shared WidgetRegistry instance."""
+    global _registry
+    if _registry is None:
+        _registry = WidgetRegistry(ttl_seconds=settings.home_widget_ttl_seconds)
+    return _registry
@@ -0,0 +1 @@
+# Benchmarks and offline evaluation scripts
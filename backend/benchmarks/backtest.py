@@ -0,0 +1,224 @@
+"""Backtest anomaly scoring on recorded or synthetic metric series.
+
+Slides a fixed-length window across every series, scores the windows in
+batches with ``TotoForecaster.forecast_batch`` and compares ``is_anomalous``
+with per-point labels. A window is labelled anomalous when any of its last
+ANOMALY_WINDOW points is (those are the points the score judges).
+
+Reports precision / recall / F1 plus throughput and batch latency
+percentiles for each profile, so a model or profile change comes with
+numbers.
+
+Series sources:
+  --input FILE   recorded export: a JSON list of
+                 {"name": str, "pointlist": [[ts_ms, value|null], ...],
+                  "anomalies": [[start_ms, end_ms], ...],   # inclusive, optional
+                  "interval_seconds": int}                   # optional
+  (default)      seeded step-change / spike / flat scenarios shaped like the
+                 mock Datadog generator's metrics
+
+Usage (from backend/):
+    python -m benchmarks.backtest --profiles fast,standard
+    python -m benchmarks.backtest --save-scenarios /tmp/scenarios.json
+    python -m benchmarks.backtest --input /tmp/scenarios.json --window 256 --stride 5
+"""
+import argparse
+import json
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.integrations.resample import resample
+from app.integrations.toto_forecaster import ANOMALY_WINDOW, TotoForecaster
+
+# Points after a level shift still counted as anomalous (before it is "the new normal")
+STEP_LABEL_SPAN = 10
+
+
+@dataclass
+class LabelledSeries:
+    name: str
+    values: np.ndarray       # [T] resampled values
+    labels: np.ndarray       # [T] bool, True where the point is anomalous
+    interval_seconds: int
+
+
+# ── Sources ───────────────────────────────────────────────────────────────────
+
+def synthetic_scenarios(per_scenario: int, length: int, seed: int) -> List[dict]:
+    """Recorded-format scenarios shaped like the mock generator's metrics."""
+    rng = np.random.default_rng(seed)
+    start_ms = 1_700_000_000_000
+    timestamps = start_ms + np.arange(length) * 60_000
+    exports = []
+    for i in range(per_scenario):
+        step = int(rng.integers(length // 2, length - STEP_LABEL_SPAN - ANOMALY_WINDOW))
+        shapes = {
+            # error rate 0.5/s → 8/s and p95 150ms → 350ms, as in mock_data/generator.py
+            "error_rate_step": np.where(np.arange(length) < step, 0.5, 8.0),
+            "latency_step": np.where(np.arange(length) < step, 150.0, 350.0),
+            "latency_spike": np.where(
+                (np.arange(length) >= step) & (np.arange(length) < step + 5), 600.0, 150.0
+            ),
+            "throughput_flat": np.full(length, 1000.0),
+        }
+        for kind, level in shapes.items():
+            values = level * (1 + rng.uniform(-0.05, 0.05, length))
+            if kind == "throughput_flat":
+                anomalies = []
+            elif kind == "latency_spike":
+                anomalies = [[int(timestamps[step]), int(timestamps[step + 4])]]
+            else:
+                anomalies = [[int(timestamps[step]), int(timestamps[step + STEP_LABEL_SPAN - 1])]]
+            exports.append({
+                "name": f"{kind}_{i}",
+                "pointlist": np.column_stack([timestamps, np.round(values, 3)]).tolist(),
+                "anomalies": anomalies,
+                "interval_seconds": 60,
+            })
+    return exports
+
+
+def load_series(exports: List[dict]) -> List[LabelledSeries]:
+    """Resample recorded exports onto their grid and expand anomaly ranges to labels."""
+    series = []
+    for item in exports:
+        rs = resample(item["pointlist"], interval_seconds=item.get("interval_seconds"))
+        if not len(rs):
+            continue
+        labels = np.zeros(len(rs), dtype=bool)
+        for start, end in item.get("anomalies", []):
+            labels |= (rs.timestamps >= start) & (rs.timestamps <= end)
+        series.append(LabelledSeries(item["name"], rs.values, labels, rs.interval_seconds))
+    return series
+
+
+# ── Backtest ──────────────────────────────────────────────────────────────────
+
+def _windows(series: LabelledSeries, window: int, stride: int):
+    """All [window]-long slices ending every ``stride`` points, with their labels."""
+    if len(series.values) < window:
+        return np.empty((0, window)), np.empty(0, dtype=bool)
+    views = sliding_window_view(series.values, window)[::stride]
+    label_views = sliding_window_view(series.labels, window)[::stride]
+    return views, label_views[:, -ANOMALY_WINDOW:].any(axis=1)
+
+
+def run_backtest(
+    series: List[LabelledSeries],
+    profile: str,
+    window: int,
+    stride: int,
+    batch: int,
+    forecaster: Optional[TotoForecaster] = None,
+) -> Dict[str, float]:
+    """Score every window with one profile; returns accuracy and speed metrics."""
+    forecaster = forecaster or TotoForecaster()
+    by_interval: Dict[int, List[tuple]] = {}
+    for s in series:
+        rows, truth = _windows(s, window, stride)
+        if len(rows):
+            by_interval.setdefault(s.interval_seconds, []).append((s.name, rows, truth))
+
+    tp = fp = fn = tn = 0
+    statistical = 0
+    latencies: List[float] = []
+    total_windows = 0
+    wall = 0.0
+    for interval, items in by_interval.items():
+        rows = np.concatenate([r for _, r, _ in items])
+        truth = np.concatenate([t for _, _, t in items])
+        names = [name for name, r, _ in items for _ in range(len(r))]
+        for lo in range(0, len(rows), batch):
+            chunk = np.ascontiguousarray(rows[lo:lo + batch])
+            start = time.perf_counter()
+            results = forecaster.forecast_batch(
+                chunk, interval, names[lo:lo + batch], profile=profile
+            )
+            elapsed = time.perf_counter() - start
+            wall += elapsed
+            latencies.append(elapsed * 1000)
+            predicted = np.array([bool(fc and fc.is_anomalous) for fc in results])
+            statistical += sum(1 for fc in results if fc and fc.model == "statistical")
+            actual = truth[lo:lo + batch]
+            tp += int((predicted & actual).sum())
+            fp += int((predicted & ~actual).sum())
+            fn += int((~predicted & actual).sum())
+            tn += int((~predicted & ~actual).sum())
+            total_windows += len(chunk)
+
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    lat = np.array(latencies) if latencies else np.zeros(1)
+    return {
+        "profile": profile,
+        "windows": total_windows,
+        "positives": tp + fn,
+        "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+        "precision": round(precision, 3),
+        "recall": round(recall, 3),
+        "f1": round(f1, 3),
+        "statistical_share": round(statistical / total_windows, 3) if total_windows else 0.0,
+        "windows_per_s": round(total_windows / wall, 1) if wall else 0.0,
+        "batch_p50_ms": round(float(np.percentile(lat, 50)), 2),
+        "batch_p95_ms": round(float(np.percentile(lat, 95)), 2),
+        "batch_p99_ms": round(float(np.percentile(lat, 99)), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--input", help="recorded series export (JSON); synthetic scenarios if omitted"
+    )
+    parser.add_argument(
+        "--save-scenarios", help="write the synthetic scenarios to this file and exit"
+    )
+    parser.add_argument(
+        "--profiles", default="fast,standard", help="comma-separated profiles to compare"
+    )
+    parser.add_argument("--window", type=int, default=256, help="points per scored window")
+    parser.add_argument("--stride", type=int, default=5, help="points between window ends")
+    parser.add_argument("--batch", type=int, default=32, help="windows per forecast_batch call")
+    parser.add_argument(
+        "--scenarios", type=int, default=3, help="synthetic series per scenario kind"
+    )
+    parser.add_argument("--length", type=int, default=720, help="points per synthetic series")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print results as JSON lines")
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input) as fh:
+            exports = json.load(fh)
+    else:
+        exports = synthetic_scenarios(args.scenarios, args.length, args.seed)
+    if args.save_scenarios:
+        with open(args.save_scenarios, "w") as fh:
+            json.dump(exports, fh)
+        print(f"Wrote {len(exports)} series to {args.save_scenarios}")
+        return
+
+    series = load_series(exports)
+    forecaster = TotoForecaster()
+    if not args.json:
+        print(f"{len(series)} series, window={args.window} stride={args.stride} batch={args.batch}")
+        print(f"{'profile':<10} {'windows':>8} {'pos':>5} {'prec':>6} {'recall':>7} {'f1':>6} "
+              f"{'stat%':>6} {'win/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for profile in args.profiles.split(","):
+        r = run_backtest(series, profile, args.window, args.stride, args.batch, forecaster)
+        if args.json:
+            print(json.dumps(r))
+            continue
+        print(f"{r['profile']:<10} {r['windows']:>8} {r['positives']:>5} {r['precision']:>6} "
+              f"{r['recall']:>7} {r['f1']:>6} {r['statistical_share'] * 100:>5.0f}% "
+              f"{r['windows_per_s']:>8} {r['batch_p50_ms']:>8} {r['batch_p95_ms']:>8} "
+              f"{r['batch_p99_ms']:>8}")
+
+
+if __name__ == "__main__":
+    main()
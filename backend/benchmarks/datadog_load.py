@@ -0,0 +1,150 @@
+"""End-to-end load benchmark of DatadogMCPClient's live path.
+
+Runs concurrent "users", each repeating a dashboard-plus-investigation mix
+(packed chart queries, monitors, a budgeted log scan and a trace scan)
+against the local Datadog stand-in (``app.integrations.mock_data.server``).
+By default the stand-in runs in-process behind ``httpx.ASGITransport``;
+``--url`` targets a separately started server over real sockets instead.
+
+Reports per-operation latency percentiles, throughput, requests that
+reached the server, response-cache hit rate and rate-limit budgets.
+
+Usage (from backend/):
+    python -m benchmarks.datadog_load --users 20 --rounds 5 --latency-ms 30 --rate-limit 200
+    python -m app.integrations.mock_data.server --latency-ms 30 &
+    python -m benchmarks.datadog_load --url http://127.0.0.1:8126
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+from app.integrations.datadog_mcp import DatadogMCPClient, dd_priority
+from app.integrations.mock_data.server import StandInConfig, create_app
+
+CHART_QUERIES = [
+    "p95:demo.http.request.duration{*} by {endpoint}",
+    "sum:demo.http.requests.count{status:500}.as_rate()",
+    "avg:demo.http.request.duration{percentile:p95}",
+    "sum:demo.http.requests.count{*}.as_rate()",
+]
+
+
+async def _timed(latencies: Dict[str, List[float]], name: str, coro) -> None:
+    start = time.perf_counter()
+    await coro
+    latencies.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+
+
+async def _drain(stream) -> int:
+    return sum([len(page) async for page in stream])
+
+
+async def _user(
+    client: DatadogMCPClient, rounds: int, scan_records: int, latencies: Dict[str, List[float]]
+) -> None:
+    for _ in range(rounds):
+        with dd_priority("background"):
+            await _timed(latencies, "charts", client.query_metrics_many(CHART_QUERIES))
+        await _timed(latencies, "monitors", client.get_active_monitors())
+        await _timed(
+            latencies,
+            "log_scan",
+            _drain(client.iter_logs("service:user-service", max_records=scan_records)),
+        )
+        await _timed(
+            latencies,
+            "trace_scan",
+            _drain(client.iter_traces(service="user-service", max_records=scan_records)),
+        )
+
+
+async def run(args) -> dict:
+    client = DatadogMCPClient()
+    client.mode = "live"
+    app = None
+    if args.url:
+        client.base_url = args.url.rstrip("/")
+        client._client = httpx.AsyncClient(timeout=15.0)
+    else:
+        app = create_app(StandInConfig(
+            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, rate_limit=args.rate_limit,
+            rate_period=args.rate_period, error_rate=args.error_rate, seed=args.seed,
+        ))
+        client.base_url = "http://standin"
+        client._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), timeout=15.0)
+    if args.no_cache:
+        client._cache = None
+
+    latencies: Dict[str, List[float]] = {}
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(_user(client, args.rounds, args.scan_records, latencies) for _ in range(args.users))
+    )
+    wall = time.perf_counter() - start
+    await client._client.aclose()
+
+    ops = {}
+    for name, values in latencies.items():
+        lat = np.array(values)
+        ops[name] = {
+            "calls": len(values),
+            "p50_ms": round(float(np.percentile(lat, 50)), 2),
+            "p95_ms": round(float(np.percentile(lat, 95)), 2),
+            "p99_ms": round(float(np.percentile(lat, 99)), 2),
+        }
+    cache = client.cache_stats()
+    return {
+        "users": args.users,
+        "rounds": args.rounds,
+        "wall_s": round(wall, 2),
+        "ops_per_s": round(sum(o["calls"] for o in ops.values()) / wall, 1),
+        "server_requests": app.state.requests if app is not None else None,
+        "cache_hit_rate": cache.get("hit_rate"),
+        "coalesced": cache["coalescing"]["coalesced"],
+        "operations": ops,
+        "ratelimit": client.ratelimit_stats(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--url", help="base URL of a running stand-in server (in-process if omitted)"
+    )
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--scan-records", type=int, default=500, help="record budget of each log/trace scan"
+    )
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--rate-limit", type=int, default=0)
+    parser.add_argument("--rate-period", type=int, default=10)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--no-cache", action="store_true", help="disable the client response cache")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(result))
+        return
+    print(f"{result['users']} users x {result['rounds']} rounds in {result['wall_s']}s "
+          f"({result['ops_per_s']} ops/s), server requests={result['server_requests']}, "
+          f"cache hit rate={result['cache_hit_rate']}, coalesced={result['coalesced']}")
+    print(f"{'operation':<12} {'calls':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, o in result["operations"].items():
+        print(f"{name:<12} {o['calls']:>6} {o['p50_ms']:>8} {o['p95_ms']:>8} {o['p99_ms']:>8}")
+    for endpoint, budget in result["ratelimit"].items():
+        print(f"  {endpoint}: remaining {budget['remaining']}/{budget['limit']}, "
+              f"delayed {budget['delayed']}, throttled {budget['throttled']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Generate mock telemetry at production-like volume and time each pipeline stage.
+
+Uses the seeded scenario generator (``app.integrations.mock_data.generator``)
+to produce metric points, logs and spans at the requested scale, then times
+the downstream stages that consume them: resampling, LTTB downsampling,
+the local time-series store, and streaming log/trace scans through the
+client. Same arguments → same data, so runs are comparable.
+
+Usage (from backend/):
+    python -m benchmarks.mock_scale --points 1000000 --logs 100000 --spans 100000
+    python -m benchmarks.mock_scale --scenario bad_deploy_errors --json
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict
+
+from app.integrations.datadog_mcp import DatadogMCPClient
+from app.integrations.downsample import lttb
+from app.integrations.mock_data import generator as gen
+from app.integrations.resample import resample
+from app.integrations.ts_store import TimeSeriesStore
+
+FROM_TS = 1_700_000_000
+
+
+class _Timer:
+    def __init__(self):
+        self.results: Dict[str, Dict[str, float]] = {}
+
+    def __call__(self, stage: str, items: int):
+        timer = self
+
+        class _Span:
+            def __enter__(self):
+                self.start = time.perf_counter()
+
+            def __exit__(self, *exc):
+                elapsed = time.perf_counter() - self.start
+                timer.results[stage] = {
+                    "items": items,
+                    "seconds": round(elapsed, 4),
+                    "items_per_s": round(items / elapsed) if elapsed else 0,
+                }
+
+        return _Span()
+
+
+async def _drain(stream) -> int:
+    return sum([len(page) async for page in stream])
+
+
+def run(args) -> dict:
+    timer = _Timer()
+    series_count = len(gen.INCIDENT_SCENARIOS[args.scenario]["services"])
+    span_seconds = max(args.points // series_count, 2) * args.interval
+    to_ts = FROM_TS + span_seconds
+    query = "avg:demo.http.request.duration{*} by {service}"
+
+    with timer("generate_metric_columns", args.points):
+        ts, tags, values = gen.metric_columns(
+            query, FROM_TS, to_ts, args.interval, args.scenario, args.seed
+        )
+    with timer("generate_metric_pointlists", values.size):
+        series = gen._generate_metrics({
+            "query": query, "from_ts": FROM_TS, "to_ts": to_ts,
+            "interval_seconds": args.interval, "scenario": args.scenario, "seed": args.seed,
+        })
+    with timer("generate_logs", args.logs):
+        gen.log_columns(FROM_TS, FROM_TS + 3600, args.logs, None, args.scenario, args.seed)
+        gen._generate_logs_page({
+            "from_ts": FROM_TS, "to_ts": FROM_TS + 3600, "total": args.logs, "limit": args.logs,
+            "scenario": args.scenario, "seed": args.seed,
+        })
+    with timer("generate_spans", args.spans):
+        gen._generate_traces_page({
+            "from_ts": FROM_TS, "to_ts": FROM_TS + 3600, "total": args.spans, "limit": args.spans,
+            "scenario": args.scenario, "seed": args.seed,
+        })
+
+    with timer("resample", values.size):
+        resampled = [resample(s["pointlist"], interval_seconds=args.interval) for s in series]
+    with timer("lttb", values.size):
+        for rs in resampled:
+            lttb(rs.timestamps, rs.values, args.chart_points)
+    store = TimeSeriesStore(max_bytes=1 << 30, retention_seconds=span_seconds + 3600)
+    with timer("ts_store_merge_read", values.size):
+        store.merge(query, series, FROM_TS, to_ts, args.interval, False)
+        store.read(query, FROM_TS, to_ts)
+
+    client = DatadogMCPClient()
+    client.mode = "mock"
+    gen_defaults = (
+        gen.settings.mock_log_total,
+        gen.settings.mock_trace_total,
+        gen.settings.mock_scenario,
+    )
+    gen.settings.mock_log_total, gen.settings.mock_trace_total = args.logs, args.spans
+    gen.settings.mock_scenario = args.scenario
+    try:
+        with timer("stream_logs", args.logs):
+            asyncio.run(
+                _drain(
+                    client.iter_logs(
+                        "*",
+                        from_ts=FROM_TS,
+                        to_ts=FROM_TS + 3600,
+                        max_records=args.logs,
+                        max_bytes=1 << 40,
+                        page_size=1000,
+                    )
+                )
+            )
+        with timer("stream_spans", args.spans):
+            asyncio.run(
+                _drain(
+                    client.iter_traces(
+                        from_ts=FROM_TS,
+                        to_ts=FROM_TS + 3600,
+                        max_records=args.spans,
+                        max_bytes=1 << 40,
+                        page_size=1000,
+                    )
+                )
+            )
+    finally:
+        gen.settings.mock_log_total, gen.settings.mock_trace_total, gen.settings.mock_scenario = (
+            gen_defaults
+        )
+
+    return {"scenario": args.scenario, "seed": args.seed, "stages": timer.results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenario", default="db_latency_spike", choices=sorted(gen.INCIDENT_SCENARIOS)
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--points", type=int, default=1_000_000, help="metric points across all series"
+    )
+    parser.add_argument("--interval", type=int, default=10, help="seconds between metric points")
+    parser.add_argument("--logs", type=int, default=100_000)
+    parser.add_argument("--spans", type=int, default=100_000)
+    parser.add_argument("--chart-points", type=int, default=1000, help="LTTB target per series")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result))
+        return
+    print(f"scenario={result['scenario']} seed={result['seed']}")
+    print(f"{'stage':<28} {'items':>10} {'seconds':>9} {'items/s':>12}")
+    for stage, r in result["stages"].items():
+        print(f"{stage:<28} {r['items']:>10} {r['seconds']:>9} {r['items_per_s']:>12}")
+
+
+if __name__ == "__main__":
+    main()
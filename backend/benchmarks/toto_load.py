@@ -0,0 +1,97 @@
+"""Benchmark Toto CPU deployment options: RSS, load time and forecast latency.
+
+Each option set runs in a fresh subprocess (so RSS and load time are not
+polluted by earlier runs) with TOTO_QUANTIZE / TOTO_COMPILE set through
+the environment, exactly as a deployment would configure them.
+
+Usage (from backend/):
+    python -m benchmarks.toto_load --forecasts 20
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+OPTIONS = {
+    "fp32": {"TOTO_QUANTIZE": "false", "TOTO_COMPILE": "false"},
+    "int8": {"TOTO_QUANTIZE": "true", "TOTO_COMPILE": "false"},
+    "compile": {"TOTO_QUANTIZE": "false", "TOTO_COMPILE": "true"},
+    "int8+compile": {"TOTO_QUANTIZE": "true", "TOTO_COMPILE": "true"},
+}
+
+
+def _child(forecasts: int, profile: str) -> None:
+    """Load, warm up and time forecasts in this process; print one JSON line."""
+    import numpy as np
+
+    from app.integrations import toto_forecaster as tf
+
+    rss_before = tf.process_rss_mb()
+    model, _ = tf._load_model()
+    if model is None:
+        print(json.dumps({"error": tf.toto_status()["error"]}))
+        return
+    rss_loaded = tf.process_rss_mb()
+    tf._warmup()
+
+    forecaster = tf.TotoForecaster()
+    series = list(np.random.default_rng(0).normal(100.0, 5.0, 600))
+    latencies = []
+    for _ in range(forecasts):
+        start = time.perf_counter()
+        forecaster.forecast(series, interval_seconds=60, profile=profile)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    status = tf.toto_status()
+    print(json.dumps({
+        "quantized": status["quantized"],
+        "compiled": status["compiled"],
+        "load_s": status["load_seconds"],
+        "warmup_s": status["warmup_seconds"],
+        "rss_model_mb": round(rss_loaded - rss_before, 1),
+        "rss_total_mb": tf.process_rss_mb(),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 1),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--forecasts", type=int, default=10, help="timed forecasts per option")
+    parser.add_argument("--profile", default="standard", help="inference profile to time")
+    parser.add_argument("--options", default=",".join(OPTIONS), help="option sets to run")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.forecasts, args.profile)
+        return
+
+    print(f"{'option':<14} {'load s':>7} {'warmup s':>9} {'model MB':>9} "
+          f"{'RSS MB':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for name in args.options.split(","):
+        env = {**os.environ, **OPTIONS[name], "TOTO_WARMUP": "true"}
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.toto_load", "--child",
+             "--forecasts", str(args.forecasts), "--profile", args.profile],
+            env=env, capture_output=True, text=True,
+        )
+        lines = [ln for ln in proc.stdout.splitlines() if ln.startswith("{")]
+        result = json.loads(lines[-1]) if lines else {"error": proc.stderr.strip()[-200:]}
+        if "error" in result:
+            print(f"{name:<14} failed: {result['error']}")
+            continue
+        if result["quantized"] != (OPTIONS[name]["TOTO_QUANTIZE"] == "true") or \
+                result["compiled"] != (OPTIONS[name]["TOTO_COMPILE"] == "true"):
+            name += "*"  # requested optimisation fell back (see logs)
+        print(f"{name:<14} {result['load_s']:>7} {result['warmup_s']:>9} "
+              f"{result['rss_model_mb']:>9} {result['rss_total_mb']:>8} "
+              f"{result['p50_ms']:>8} {result['p95_ms']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Microbenchmark the Toto pre/post-processing pipeline.
+
+Compares the original pure-Python list pipeline (pad, z-score, three
+``_denorm`` passes, anomaly loop) with the vectorised NumPy pipeline in
+``toto_forecaster``. Model inference is excluded: quantile bands are
+synthesised so the benchmark runs without torch/toto-ts installed.
+
+Usage (from backend/):
+    python -m benchmarks.toto_postprocess --length 600 --horizon 60
+"""
+import argparse
+import timeit
+from typing import List
+
+import numpy as np
+
+from app.integrations.toto_forecaster import (
+    ANOMALY_WINDOW,
+    _postprocess,
+    _prepare_context,
+)
+
+
+def _legacy_pipeline(values: List[float], bands: List[List[float]], context_length: int) -> float:
+    """The pre-vectorisation implementation, kept verbatim for comparison."""
+    if len(values) >= context_length:
+        series_values = list(values[-context_length:])
+    else:
+        series_values = [values[0]] * (context_length - len(values)) + list(values)
+    n = len(series_values)
+    mean_val = sum(series_values) / n
+    variance = sum((v - mean_val) ** 2 for v in series_values) / n
+    std_val = max(variance ** 0.5, 1e-6)
+    _normalized = [(v - mean_val) / std_val for v in series_values]
+
+    def _denorm(tensor_1d) -> List[float]:
+        return [round(float(v) * std_val + mean_val, 4) for v in tensor_1d]
+
+    lower_bound = _denorm(bands[0])
+    _median = _denorm(bands[1])
+    upper_bound = _denorm(bands[2])
+
+    last_actual = list(values[-ANOMALY_WINDOW:])
+    span = max(upper_bound[0] - lower_bound[0], 1e-6)
+    deviations = []
+    for i, actual in enumerate(last_actual):
+        ub = upper_bound[i] if i < len(upper_bound) else upper_bound[-1]
+        if actual > ub:
+            deviations.append(min((actual - ub) / span * 100, 100.0))
+    return round(sum(deviations) / max(len(deviations), 1), 1) if deviations else 0.0
+
+
+def _vectorized_pipeline(rows: np.ndarray, bands: np.ndarray, context_length: int) -> np.ndarray:
+    normalized, mean, std, lengths = _prepare_context(rows, context_length)
+    _, scores = _postprocess(bands, mean, std, normalized, lengths)
+    return scores
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--length", type=int, default=600, help="points per input series")
+    parser.add_argument("--context", type=int, default=512, help="model context length")
+    parser.add_argument("--horizon", type=int, default=60, help="forecast steps")
+    parser.add_argument("--batches", default="1,8,64", help="comma-separated batch sizes")
+    parser.add_argument("--number", type=int, default=200, help="timeit iterations")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'batch':>6} {'legacy us/series':>17} {'numpy us/series':>16} {'speedup':>8}")
+    for batch in (int(b) for b in args.batches.split(",")):
+        rows = rng.normal(100.0, 5.0, size=(batch, args.length))
+        bands = np.sort(rng.normal(0.0, 1.0, size=(3, batch, args.horizon)), axis=0)
+        row_lists = rows.tolist()
+        band_lists = [[bands[k, b].tolist() for k in range(3)] for b in range(batch)]
+
+        legacy = timeit.timeit(
+            lambda: [
+                _legacy_pipeline(row_lists[b], band_lists[b], args.context) for b in range(batch)
+            ],
+            number=args.number,
+        )
+        vectorized = timeit.timeit(
+            lambda: _vectorized_pipeline(rows, bands, args.context), number=args.number
+        )
+        legacy_us = legacy / args.number / batch * 1e6
+        vector_us = vectorized / args.number / batch * 1e6
+        print(f"{batch:>6} {legacy_us:>17.1f} {vector_us:>16.1f} {legacy_us / vector_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark Toto inference profiles: CPU time vs anomaly-score error.
+
+Runs every profile in TOTO_PROFILES over a set of synthetic metric series
+(flat, noisy, step-change) and compares each anomaly score to the score
+from a high-sample reference run.
+
+Usage (from backend/):
+    python -m benchmarks.toto_profiles --series 20 --repeats 3
+"""
+import argparse
+import random
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+from app.integrations.toto_forecaster import (
+    TOTO_PROFILES,
+    TotoForecaster,
+    _load_model,
+)
+from app.schemas.toto import TotoInferenceProfile
+
+REFERENCE_SAMPLES = 512
+
+
+def _synthetic_series(n_series: int, length: int, seed: int) -> List[Tuple[str, List[float]]]:
+    """Build a deterministic mix of flat, noisy and step-change series."""
+    rng = random.Random(seed)
+    series = []
+    for i in range(n_series):
+        kind = ("flat", "noisy", "step")[i % 3]
+        base = rng.uniform(0.5, 500.0)
+        values = []
+        for t in range(length):
+            noise = rng.gauss(0.0, 0.02 if kind == "flat" else 0.15)
+            level = base * 4 if kind == "step" and t >= length - 8 else base
+            values.append(level * (1 + noise))
+        series.append((f"{kind}_{i}", values))
+    return series
+
+
+def _run_profile(
+    forecaster: TotoForecaster,
+    series: List[Tuple[str, List[float]]],
+    profile: str,
+    repeats: int,
+) -> Tuple[Dict[str, float], float]:
+    """Return (anomaly score per series, mean CPU seconds per forecast)."""
+    scores: Dict[str, float] = {}
+    cpu_times: List[float] = []
+    for name, values in series:
+        for _ in range(repeats):
+            start = time.process_time()
+            fc = forecaster.forecast(values, interval_seconds=60, series_name=name, profile=profile)
+            cpu_times.append(time.process_time() - start)
+            if fc is not None:
+                scores[name] = fc.anomaly_score
+    return scores, statistics.mean(cpu_times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, default=12, help="number of synthetic series")
+    parser.add_argument("--length", type=int, default=600, help="points per series")
+    parser.add_argument("--repeats", type=int, default=2, help="forecasts per series per profile")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    model, _ = _load_model()
+    if model is None:
+        raise SystemExit("Toto model unavailable — install toto-ts and pre-download the weights.")
+
+    series = _synthetic_series(args.series, args.length, args.seed)
+    forecaster = TotoForecaster()
+
+    # High-sample reference: the precise profile with many more samples
+    precise = TOTO_PROFILES["precise"]
+    TOTO_PROFILES["_reference"] = TotoInferenceProfile(
+        **{**precise.model_dump(), "name": "_reference", "num_samples": REFERENCE_SAMPLES}
+    )
+    try:
+        reference, ref_cpu = _run_profile(forecaster, series, "_reference", 1)
+    finally:
+        TOTO_PROFILES.pop("_reference", None)
+
+    print(f"reference: {REFERENCE_SAMPLES} samples, {ref_cpu * 1000:.1f} ms CPU/forecast")
+    print(f"{'profile':<10} {'samples':>7} {'horizon':>7} {'ctx':>5} "
+          f"{'cpu ms':>8} {'mae':>7} {'flag agree':>10}")
+    for name, spec in TOTO_PROFILES.items():
+        scores, cpu = _run_profile(forecaster, series, name, args.repeats)
+        shared = [s for s in scores if s in reference]
+        mae = (
+            statistics.mean(abs(scores[s] - reference[s]) for s in shared)
+            if shared
+            else float("nan")
+        )
+        agree = (
+            sum((scores[s] > 70.0) == (reference[s] > 70.0) for s in shared) / len(shared)
+            if shared else float("nan")
+        )
+        print(f"{name:<10} {spec.num_samples:>7} {spec.horizon:>7} {spec.context_length:>5} "
+              f"{cpu * 1000:>8.1f} {mae:>7.2f} {agree:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Report memory per worker for local vs sidecar Toto deployment.
+
+local   — every worker process loads its own model (uvicorn --workers N default)
+sidecar — one `app.integrations.toto_sidecar` process owns the model and the
+          workers forecast through its Unix socket
+
+Each "worker" is a subprocess that imports the app, runs one forecast and
+reports its RSS, which is what a uvicorn worker holds after its first
+forecast request.
+
+Usage (from backend/):
+    python -m benchmarks.toto_workers --workers 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+
+def _worker() -> None:
+    from app.integrations import toto_forecaster as tf
+
+    series = [100.0 + (i % 7) for i in range(600)]
+    fc = tf.TotoForecaster().forecast(series, interval_seconds=60)
+    print(json.dumps({
+        "rss_mb": tf.process_rss_mb(),
+        "model": fc.model if fc else None,
+    }))
+
+
+def _run_workers(n: int, env: Dict[str, str]) -> List[dict]:
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.toto_workers", "--worker"],
+            env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+        )
+        for _ in range(n)
+    ]
+    results = []
+    for proc in procs:
+        out, _ = proc.communicate()
+        lines = [ln for ln in out.splitlines() if ln.startswith("{")]
+        results.append(json.loads(lines[-1]) if lines else {"rss_mb": None, "model": None})
+    return results
+
+
+def _report(mode: str, workers: List[dict], extra_mb: float = 0.0) -> None:
+    rss = [w["rss_mb"] or 0.0 for w in workers]
+    total = sum(rss) + extra_mb
+    served_by = {w["model"] for w in workers}
+    print(
+        f"{mode:<8} workers={len(rss):<3} per-worker={sum(rss) / len(rss):>8.1f} MB "
+        f"sidecar={extra_mb:>8.1f} MB total={total:>8.1f} MB "
+        f"served_by={sorted(map(str, served_by))}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker()
+        return
+
+    base_env = {k: v for k, v in os.environ.items() if k != "TOTO_SIDECAR_SOCKET"}
+    base_env["TOTO_WARMUP"] = "false"
+    _report("local", _run_workers(args.workers, base_env))
+
+    socket_path = os.path.join(tempfile.mkdtemp(prefix="aidog-"), "toto.sock")
+    sidecar = subprocess.Popen(
+        [sys.executable, "-m", "app.integrations.toto_sidecar", "--socket", socket_path],
+        env=base_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.time() + 300  # model load can take a while on first run
+        while not os.path.exists(socket_path):
+            if sidecar.poll() is not None or time.time() > deadline:
+                raise SystemExit("Toto sidecar failed to start")
+            time.sleep(0.2)
+
+        workers = _run_workers(args.workers, {**base_env, "TOTO_SIDECAR_SOCKET": socket_path})
+
+        from app.integrations.toto_sidecar import TotoSidecarClient
+
+        status = TotoSidecarClient(socket_path, timeout=10).status()
+        _report("sidecar", workers, extra_mb=status.get("rss_mb") or 0.0)
+    finally:
+        sidecar.terminate()
+        sidecar.wait(10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Tests for the statistical anomaly detector (Toto prefilter / fallback)."""
+import numpy as np
+import pytest
+
+from app.integrations.anomaly_detector import (
+    StatisticalDetector,
+    ewma,
+    mad_change_point,
+    robust_zscore,
+)
+
+
+@pytest.fixture()
+def detector():
+    return StatisticalDetector()
+
+
+def _noisy(level: float, n: int, seed: int = 0) -> np.ndarray:
+    return level + np.random.default_rng(seed).normal(0, level * 0.02, n)
+
+
+def test_flat_series_scores_zero(detector):
+    scores = detector.score_batch(np.full((3, 200), 7.0))
+    assert scores.tolist() == [0.0, 0.0, 0.0]
+
+
+def test_noisy_series_stays_below_prefilter_threshold(detector):
+    scores = detector.score_batch(np.stack([_noisy(100.0, 300, s) for s in range(5)]))
+    assert (scores < 30.0).all()
+
+
+def test_step_change_scores_high(detector):
+    series = np.concatenate([_noisy(0.5, 200), np.full(5, 8.0)])
+    assert detector.score_batch([series])[0] == 100.0
+
+
+def test_ragged_rows_and_short_series(detector):
+    scores = detector.score_batch([[1.0, 2.0], list(_noisy(50.0, 120))])
+    assert scores[0] == 0.0  # too short to judge
+    assert scores.shape == (2,)
+
+
+def test_individual_checks_are_vectorised():
+    matrix = np.stack([np.full(50, 10.0), np.r_[np.full(45, 10.0), np.full(5, 20.0)]])
+    assert robust_zscore(matrix, 5)[0] == 0.0
+    assert robust_zscore(matrix, 5)[1] > 50
+    assert mad_change_point(matrix, 5)[1] > 50
+    assert ewma(matrix, alpha=0.3).shape == (2, 1)
+
+
+def test_forecast_batch_returns_toto_schema(detector):
+    results = detector.forecast_batch([list(_noisy(100.0, 80)), []], 60, ["a", "b"], horizon=10)
+    fc = results[0]
+    assert results[1] is None
+    assert fc.series_name == "a"
+    assert fc.model == "statistical"
+    assert len(fc.predicted_median) == 10
+    assert all(lo <= hi for lo, hi in zip(fc.lower_bound, fc.upper_bound))
+    assert len(fc.historical) == 60
@@ -0,0 +1,153 @@
+"""Tests for the background AnomalyScanner — grouping, rolling state, reads."""
+import asyncio
+import time
+
+import pytest
+
+from app.services.anomaly_scanner import AnomalyScanner, series_group
+
+QUERIES = {
+    "error_rate": "sum:demo.http.requests.count{status:500} by {service}.as_rate()",
+    "p95_latency": "avg:demo.http.request.duration{percentile:p95} by {service}",
+}
+
+
+def _series(service: str, values):
+    return {
+        "metric": "demo.metric",
+        "pointlist": [[i * 60000, v] for i, v in enumerate(values)],
+        "tag_set": [f"service:{service}"],
+    }
+
+
+class _FakeClient:
+    """Returns one series per service for every packed query."""
+
+    def __init__(self, services):
+        self.services = services
+        self.calls = 0
+
+    async def query_metrics_many(self, queries, from_ts=None, to_ts=None):
+        self.calls += 1
+        return [[_series(svc, values) for svc, values in self.services.items()] for _ in queries]
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    flat = [100.0 + (i % 3) for i in range(60)]
+    spike = flat[:-5] + [400.0] * 5
+    client = _FakeClient({"checkout": flat, "payments": spike})
+    monkeypatch.setattr("app.integrations.datadog_mcp.get_datadog_client", lambda: client)
+    return client
+
+
+class TestSeriesGroup:
+    def test_reads_service_from_tag_set(self):
+        assert series_group({"tag_set": ["service:checkout"]}) == "checkout"
+
+    def test_reads_service_from_scope(self):
+        assert series_group({"scope": "env:prod,service:payments"}) == "payments"
+
+    def test_falls_back_to_wildcard(self):
+        assert series_group({"pointlist": []}) == "*"
+
+
+class TestAnomalyScanner:
+    @pytest.mark.asyncio
+    async def test_scan_fetches_all_queries_in_one_call(self, fake_client):
+        scanner = AnomalyScanner(QUERIES)
+        scored = await scanner.scan_once()
+        # Group-by queries packed into one call cover both services
+        assert fake_client.calls == 1
+        assert scored == 4
+        assert {s.group for s in scanner.states()} == {"checkout", "payments"}
+
+    @pytest.mark.asyncio
+    async def test_spiking_service_scores_higher(self, fake_client):
+        scanner = AnomalyScanner(QUERIES)
+        await scanner.scan_once()
+        spike = scanner.group_state("payments")
+        flat = scanner.group_state("checkout")
+        assert spike["joint_anomaly_score"] > flat["joint_anomaly_score"]
+        assert spike["is_anomalous"]
+
+    @pytest.mark.asyncio
+    async def test_group_states_cover_every_service(self, fake_client):
+        scanner = AnomalyScanner(QUERIES)
+        await scanner.scan_once()
+        groups = scanner.group_states()
+        assert [g["group"] for g in groups] == ["payments", "checkout"]  # most anomalous first
+        assert groups[0] == scanner.group_state("payments")
+
+    @pytest.mark.asyncio
+    async def test_scores_roll_over_scans(self, fake_client):
+        scanner = AnomalyScanner(QUERIES, history=2)
+        for _ in range(3):
+            await scanner.scan_once()
+        state = next(s for s in scanner.states() if s.series_key == "error_rate:checkout")
+        assert len(state.scores) == 2
+        assert scanner.scans_run == 3
+
+    @pytest.mark.asyncio
+    async def test_stale_state_is_not_served(self, fake_client):
+        scanner = AnomalyScanner(QUERIES, interval_seconds=60)
+        await scanner.scan_once()
+        for state in scanner._states.values():
+            state.updated_at = time.time() - 600
+        assert scanner.states() == []
+        assert scanner.group_state("payments") is None
+        assert len(scanner.states(fresh_only=False)) == 4
+
+    @pytest.mark.asyncio
+    async def test_series_that_stop_reporting_are_evicted(self, fake_client):
+        from app.services.anomaly_scanner import EVICT_AFTER_SCANS
+
+        scanner = AnomalyScanner(QUERIES, interval_seconds=60)
+        await scanner.scan_once()
+        # payments is scaled down / renamed: later scans no longer return it
+        del fake_client.services["payments"]
+        await scanner.scan_once()
+        assert len(scanner._states) == 4  # within the grace period
+
+        for key, state in scanner._states.items():
+            if state.group == "payments":
+                state.updated_at -= (EVICT_AFTER_SCANS + 1) * 60
+        await scanner.scan_once()
+        assert {s.group for s in scanner._states.values()} == {"checkout"}
+        assert set(scanner._scores) == set(scanner._states)
+        assert [g["group"] for g in scanner.group_states()] == ["checkout"]
+        assert len(scanner._scores["error_rate:checkout"]) == 3
+        assert scanner.status()["series_tracked"] == 2
+
+    @pytest.mark.asyncio
+    async def test_start_and_stop(self, fake_client):
+        scanner = AnomalyScanner(QUERIES, interval_seconds=3600)
+        scanner.start()
+        for _ in range(100):
+            if scanner.scans_run:
+                break
+            await asyncio.sleep(0.01)
+        assert scanner.status()["running"]
+        await scanner.stop()
+        assert not scanner.status()["running"]
+        assert scanner.scans_run == 1
+
+
+def test_anomaly_state_endpoint(client, auth_headers):
+    resp = client.get("/api/home/anomalies", headers=auth_headers)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert "scanner" in body
+    assert isinstance(body["series"], list)
+
+
+@pytest.mark.asyncio
+async def test_home_widget_reports_every_scanned_service(fake_client, monkeypatch):
+    from app.routes.home import _OverviewWidgets
+
+    scanner = AnomalyScanner(QUERIES)
+    await scanner.scan_once()
+    monkeypatch.setattr("app.routes.home.get_anomaly_scanner", lambda: scanner)
+    anomalies = await _OverviewWidgets({}, None).toto_anomalies()
+    assert anomalies
+    assert {a["service"] for a in anomalies} == {"payments"}
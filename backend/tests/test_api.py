@@ -10,6 +10,12 @@ class TestHealth:
         assert data["status"] == "ok"
         assert "env" in data
 
+    def test_health_reports_toto_readiness(self, client):
+        toto = client.get("/health").json()["toto"]
+        assert isinstance(toto["ready"], bool)
+        assert isinstance(toto["loaded"], bool)
+        assert "rss_mb" in toto
+
     def test_health_no_auth_required(self, client):
         # Health check must be publicly accessible
         resp = client.get("/health")
@@ -95,3 +95,426 @@ class TestDatadogClientDDBaseUrl:
     def test_dd_base_url_uses_site(self):
         from app.integrations import datadog_mcp
         assert "datadoghq" in datadog_mcp.DD_BASE_URL or "api." in datadog_mcp.DD_BASE_URL
+
+
+class TestDatadogResponseCache:
+    @pytest.fixture
+    def live_client(self):
+        """Live-mode client whose HTTP calls hit an in-process transport."""
+        import httpx
+        from app.integrations.datadog_mcp import DatadogMCPClient
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if "fail" in str(request.url):
+                return httpx.Response(500, json={"errors": ["boom"]})
+            return httpx.Response(200, json={"series": [{"metric": "m", "pointlist": [[0, 1.0]]}]})
+
+        client = DatadogMCPClient()
+        client.mode = "live"
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client.calls = calls
+        return client
+
+    def test_rollup_interval_and_alignment(self):
+        from app.integrations.datadog_mcp import align_window, rollup_interval
+
+        assert rollup_interval("avg:m{*}", 0, 3600) == 20
+        assert rollup_interval("avg:m{*}.rollup(avg, 300)", 0, 3600) == 300
+        assert align_window(1005, 4615, 20) == (1000, 4600)
+
+    @pytest.mark.asyncio
+    async def test_nearby_windows_share_one_request(self, live_client):
+        await live_client.query_metrics("avg:m{*}", from_ts=1_000_001, to_ts=1_003_601)
+        await live_client.query_metrics("avg:m{*}  ", from_ts=1_000_005, to_ts=1_003_605)
+        assert len(live_client.calls) == 1
+        stats = live_client.cache_stats()["methods"]["query_metrics"]
+        assert stats["hits"] == 1 and stats["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_different_queries_are_not_shared(self, live_client):
+        await live_client.query_metrics("avg:a{*}", from_ts=1_000_000, to_ts=1_003_600)
+        await live_client.query_metrics("avg:b{*}", from_ts=1_000_000, to_ts=1_003_600)
+        assert len(live_client.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_failures_are_negatively_cached(self, live_client):
+        first = await live_client.query_metrics("avg:fail{*}", from_ts=1_000_000, to_ts=1_003_600)
+        second = await live_client.query_metrics("avg:fail{*}", from_ts=1_000_000, to_ts=1_003_600)
+        assert first == [] and second == []
+        assert len(live_client.calls) == 1
+        assert live_client.cache_stats()["methods"]["query_metrics"]["negative_hits"] == 1
+
+    def test_entries_expire(self):
+        from app.integrations.datadog_mcp import ResponseCache
+
+        cache = ResponseCache({"query_metrics": 0.0}, negative_ttl=0.0)
+        cache.put("k", "query_metrics", {"a": 1}, ok=True)
+        assert cache.get("k", "query_metrics") == (False, None)
+
+
+class TestDatadogRequestCoalescing:
+    @pytest.fixture
+    def slow_client(self):
+        """Live-mode client, cache off, whose transport answers after a short delay."""
+        import asyncio
+        import httpx
+        from app.integrations.datadog_mcp import DatadogMCPClient
+
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"series": [{"metric": "m", "pointlist": [[0, 1.0]]}]})
+
+        client = DatadogMCPClient()
+        client.mode = "live"
+        client._cache = None
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client.calls = calls
+        return client
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_share_one_call(self, slow_client):
+        import asyncio
+
+        results = await asyncio.gather(
+            *(
+                slow_client.query_metrics("avg:m{*}", from_ts=1_000_000, to_ts=1_003_600)
+                for _ in range(5)
+            )
+        )
+        assert len(slow_client.calls) == 1
+        assert all(r == results[0] for r in results)
+        stats = slow_client.cache_stats()["coalescing"]
+        assert stats == {"sent": 1, "coalesced": 4, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_different_requests_are_not_coalesced(self, slow_client):
+        import asyncio
+
+        await asyncio.gather(
+            slow_client.query_metrics("avg:a{*}", from_ts=1_000_000, to_ts=1_003_600),
+            slow_client.query_metrics("avg:b{*}", from_ts=1_000_000, to_ts=1_003_600),
+        )
+        assert len(slow_client.calls) == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("store", [True, False])
+    async def test_packed_and_single_requests_share_in_flight_queries(self, slow_client, store):
+        import asyncio
+        from urllib.parse import parse_qs, urlparse
+
+        if not store:
+            slow_client._store = None
+        single, many = await asyncio.gather(
+            slow_client.query_metrics("avg:a{*}", from_ts=1_000_000, to_ts=1_003_600),
+            slow_client.query_metrics_many(
+                ["avg:a{*}", "avg:b{*}"], from_ts=1_000_000, to_ts=1_003_600
+            ),
+        )
+        # avg:a joins the single request in flight; only avg:b is sent packed
+        sent = [parse_qs(urlparse(str(r.url)).query)["query"][0] for r in slow_client.calls]
+        if store:
+            # Stored fetches pin the rollup they are bucketed at
+            assert sorted(sent) == ["avg:a{*}.rollup(avg, 20)", "avg:b{*}.rollup(avg, 20)"]
+        else:
+            assert sorted(sent) == ["avg:a{*}", "avg:b{*}"]
+        assert many[0] == single
+
+        late = await asyncio.gather(
+            slow_client.query_metrics_many(["avg:c{*}"], from_ts=1_000_000, to_ts=1_003_600),
+            slow_client.query_metrics("avg:c{*}", from_ts=1_000_000, to_ts=1_003_600),
+        )
+        # A single request arriving while the packed one is in flight awaits its share
+        assert len(slow_client.calls) == 3
+        assert late[0][0] == late[1]
+        assert slow_client.cache_stats()["coalescing"]["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_request(self, slow_client):
+        import asyncio
+
+        first = asyncio.ensure_future(
+            slow_client.query_metrics("avg:m{*}", from_ts=1_000_000, to_ts=1_003_600)
+        )
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(
+            slow_client.query_metrics("avg:m{*}", from_ts=1_000_000, to_ts=1_003_600)
+        )
+        await asyncio.sleep(0)
+        first.cancel()
+        assert (await second)[0]["metric"] == "m"
+        assert len(slow_client.calls) == 1
+
+
+class TestQueryMetricsMany:
+    @pytest.fixture
+    def live_client(self):
+        """Live-mode client answering packed queries with one series per query_index."""
+        import httpx
+        from urllib.parse import parse_qs, urlparse
+        from app.integrations.datadog_mcp import DatadogMCPClient
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            packed = parse_qs(urlparse(str(request.url)).query)["query"][0]
+            names = [q.split("{")[0] for q in packed.split(",") if "{" in q]
+            return httpx.Response(200, json={"series": [
+                {"metric": name, "query_index": i, "pointlist": [[0, float(i)]]}
+                for i, name in enumerate(names)
+            ]})
+
+        client = DatadogMCPClient()
+        client.mode = "live"
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client.calls = calls
+        return client
+
+    @pytest.mark.asyncio
+    async def test_packs_queries_and_demultiplexes(self, live_client):
+        queries = ["avg:a{*}", "avg:b{*}", "avg:c{*}"]
+        results = await live_client.query_metrics_many(queries, from_ts=1_000_000, to_ts=1_003_600)
+        assert len(live_client.calls) == 1
+        assert [r[0]["metric"] for r in results] == ["avg:a", "avg:b", "avg:c"]
+
+    @pytest.mark.asyncio
+    async def test_packed_results_feed_single_query_cache(self, live_client):
+        await live_client.query_metrics_many(
+            ["avg:a{*}", "avg:b{*}"], from_ts=1_000_000, to_ts=1_003_600
+        )
+        series = await live_client.query_metrics("avg:b{*}", from_ts=1_000_000, to_ts=1_003_600)
+        assert series[0]["metric"] == "avg:b"
+        assert len(live_client.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_different_rollups_use_separate_requests(self, live_client):
+        queries = ["avg:a{*}", "avg:b{*}.rollup(avg, 300)"]
+        results = await live_client.query_metrics_many(queries, from_ts=1_000_050, to_ts=1_003_650)
+        assert len(live_client.calls) == 2
+        assert all(len(r) == 1 for r in results)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("store", [True, False])
+    async def test_skipped_chunk_is_not_cached(self, live_client, store):
+        from app.integrations.datadog_mcp import dd_priority
+
+        if not store:
+            live_client._store = None
+        live_client._ratelimit.observe("/api/v1/query", 200, {
+            "X-RateLimit-Limit": "100", "X-RateLimit-Remaining": "1", "X-RateLimit-Reset": "60",
+        })
+        with dd_priority("background"):
+            skipped = await live_client.query_metrics_many(
+                ["avg:a{*}", "avg:b{*}"], from_ts=1_000_000, to_ts=1_003_600
+            )
+        assert skipped == [[], []]
+        assert live_client.calls == []
+        # The next (interactive) refresh goes to the API instead of a cached empty result
+        results = await live_client.query_metrics_many(
+            ["avg:a{*}", "avg:b{*}"], from_ts=1_000_000, to_ts=1_003_600
+        )
+        assert len(live_client.calls) == 1
+        assert [r[0]["metric"] for r in results] == ["avg:a", "avg:b"]
+
+    @pytest.mark.asyncio
+    async def test_mock_mode_returns_one_list_per_query(self):
+        from app.integrations.datadog_mcp import DatadogMCPClient
+
+        client = DatadogMCPClient()
+        client.mode = "mock"
+        results = await client.query_metrics_many(["avg:a{*}", "sum:b{*}.as_rate()"])
+        assert len(results) == 2
+        assert all(len(r) == 1 and r[0]["pointlist"] for r in results)
+
+
+class TestStreamingPagination:
+    @pytest.fixture
+    def mock_client(self):
+        from app.integrations.datadog_mcp import DatadogMCPClient
+
+        client = DatadogMCPClient()
+        client.mode = "mock"
+        return client
+
+    @pytest.fixture
+    def live_client(self):
+        """Live-mode client serving 5 log pages of 3 records, chained by meta.page.after."""
+        import httpx
+        import json
+        from app.integrations.datadog_mcp import DatadogMCPClient
+
+        calls = []
+
+        def handler(request):
+            body = json.loads(request.content)
+            calls.append(body)
+            page = int(body["page"].get("cursor") or 0)
+            data = [
+                {"id": f"log_{page}_{i}", "attributes": {"message": "boom", "status": "error"}}
+                for i in range(3)
+            ]
+            meta = {"page": {"after": str(page + 1)}} if page < 4 else {}
+            return httpx.Response(200, json={"data": data, "meta": meta})
+
+        client = DatadogMCPClient()
+        client.mode = "live"
+        client._cache = None
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client.calls = calls
+        return client
+
+    @pytest.mark.asyncio
+    async def test_live_logs_follow_cursor(self, live_client):
+        records = [
+            r async for page in live_client.iter_logs("service:x", page_size=3) for r in page
+        ]
+        assert len(records) == 15
+        assert records[0] == {
+            "id": "log_0_0",
+            "message": "boom",
+            "level": "error",
+            "service": "",
+            "timestamp": "",
+        }
+        assert [c["page"].get("cursor") for c in live_client.calls] == [None, "1", "2", "3", "4"]
+
+    @pytest.mark.asyncio
+    async def test_record_budget_stops_fetching_early(self, live_client):
+        pages = [p async for p in live_client.iter_logs("service:x", page_size=3, max_records=5)]
+        assert [len(p) for p in pages] == [3, 2]
+        # At most the prefetch window is fetched beyond the page that exhausted the budget
+        assert len(live_client.calls) < 5
+
+    @pytest.mark.asyncio
+    async def test_byte_budget_truncates(self, mock_client):
+        records = [
+            r async for page in mock_client.iter_logs("service:x", max_bytes=2000) for r in page
+        ]
+        assert 0 < len(records) < 20
+
+    @pytest.mark.asyncio
+    async def test_mock_scan_pages_through_window(self, mock_client):
+        pages = [
+            p
+            async for p in mock_client.iter_traces(service="api", page_size=100, max_records=10_000)
+        ]
+        assert [len(p) for p in pages] == [100, 100, 100, 100]
+        assert {t["service"] for p in pages for t in p} == {"api"}
+        assert len({t["trace_id"] for p in pages for t in p}) == 400
+
+    @pytest.mark.asyncio
+    async def test_early_close_cancels_producer(self, mock_client):
+        import asyncio
+
+        before = len(asyncio.all_tasks())
+        stream = mock_client.iter_logs("service:x", page_size=10)
+        first = await stream.__anext__()
+        assert len(first) == 10
+        await stream.aclose()
+        assert len(asyncio.all_tasks()) == before
+
+    @pytest.mark.asyncio
+    async def test_fetch_errors_reach_the_consumer(self):
+        from app.integrations.datadog_mcp import stream_pages
+
+        async def fetch_page(cursor):
+            if cursor is None:
+                return [{"n": 1}], "next"
+            raise RuntimeError("page failed")
+
+        stream = stream_pages(fetch_page, max_records=100, max_bytes=10_000)
+        assert await stream.__anext__() == [{"n": 1}]
+        with pytest.raises(RuntimeError):
+            await stream.__anext__()
+
+
+class TestRateLimitBudget:
+    @pytest.fixture
+    def budget(self):
+        from app.integrations.datadog_mcp import RateLimitBudget
+
+        return RateLimitBudget(reserve=0.2, max_delay=0.5, max_retry_wait=0.5)
+
+    def test_low_budget_holds_back_background_calls_only(self, budget):
+        budget.observe("/api/v1/query", 200, {
+            "X-RateLimit-Limit": "100", "X-RateLimit-Remaining": "10", "X-RateLimit-Reset": "30",
+        })
+        assert budget.wait_time("/api/v1/query", "interactive") == 0
+        assert budget.wait_time("/api/v1/query", "background") > 25
+        assert budget.wait_time("/unseen", "background") == 0
+
+    @pytest.mark.asyncio
+    async def test_background_call_past_max_delay_is_throttled(self, budget):
+        budget.observe("/api/v1/query", 200, {
+            "X-RateLimit-Limit": "100", "X-RateLimit-Remaining": "5", "X-RateLimit-Reset": "30",
+        })
+        assert not await budget.acquire("/api/v1/query", "background")
+        assert await budget.acquire("/api/v1/query", "interactive")
+        stats = budget.stats()["/api/v1/query"]
+        assert stats["throttled"] == 1
+        assert stats["remaining"] == 4
+
+    def test_429_blocks_every_priority_for_retry_after(self, budget):
+        budget.observe("/api/v1/query", 429, {"Retry-After": "3"})
+        assert budget.wait_time("/api/v1/query", "interactive") > 2
+
+
+class TestRateLimitedClient:
+    @pytest.fixture
+    def live_client(self):
+        """Live-mode client whose first response is a 429 with a short Retry-After."""
+        import httpx
+        from app.integrations.datadog_mcp import DatadogMCPClient
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                return httpx.Response(
+                    429, headers={"Retry-After": "0.05"}, json={"errors": ["rate limited"]}
+                )
+            return httpx.Response(
+                200,
+                headers={
+                    "X-RateLimit-Limit": "100",
+                    "X-RateLimit-Remaining": "99",
+                    "X-RateLimit-Reset": "60",
+                },
+                json={"series": [{"metric": "m", "pointlist": [[0, 1.0]]}]},
+            )
+
+        client = DatadogMCPClient()
+        client.mode = "live"
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client.calls = calls
+        return client
+
+    @pytest.mark.asyncio
+    async def test_429_is_retried_after_retry_after(self, live_client):
+        series = await live_client.query_metrics("avg:m{*}", from_ts=1_000_000, to_ts=1_003_600)
+        assert series[0]["metric"] == "m"
+        assert len(live_client.calls) == 2
+        stats = live_client.ratelimit_stats()["/api/v1/query"]
+        assert stats["delayed"] == 1
+        assert stats["remaining"] == 99
+
+    @pytest.mark.asyncio
+    async def test_background_priority_skips_when_budget_is_low(self, live_client):
+        from app.integrations.datadog_mcp import dd_priority
+
+        live_client._ratelimit.observe("/api/v1/query", 200, {
+            "X-RateLimit-Limit": "100", "X-RateLimit-Remaining": "1", "X-RateLimit-Reset": "60",
+        })
+        with dd_priority("background"):
+            assert (
+                await live_client.query_metrics("avg:m{*}", from_ts=1_000_000, to_ts=1_003_600)
+                == []
+            )
+        assert live_client.calls == []
@@ -0,0 +1,80 @@
+"""Tests for the per-service deploy marker index."""
+import pytest
+
+from app.services.deploy_index import DeployIndex, DeployIndexCache, correlate_deploys
+
+MIN = 60_000
+
+
+def _marker(marker_id, service, minute):
+    return {"id": marker_id, "service": service, "version": "v1", "timestamp": minute * MIN}
+
+
+@pytest.fixture
+def index():
+    idx = DeployIndex()
+    idx.add_many([
+        _marker("a", "checkout", 10),
+        _marker("b", "checkout", 50),
+        _marker("c", "payments", 55),
+        _marker("d", None, 58),           # untagged: applies to every service
+        _marker("e", "search", 59),
+    ])
+    return idx
+
+
+class TestDeployIndex:
+    def test_recent_filters_by_service_and_window(self, index):
+        found = index.recent(["checkout"], at_ts=60 * 60, within_seconds=15 * 60)
+        assert [m["id"] for m in found] == ["b", "d"]
+        assert [m["id"] for m in index.recent(None, 60 * 60, 5 * 60)] == ["c", "d", "e"]
+        assert index.recent(["unknown"], 60 * 60, 60) == []
+
+    def test_same_id_is_moved_not_duplicated(self, index):
+        assert not index.add(_marker("b", "checkout", 50))
+        assert index.add(_marker("b", "checkout", 20))
+        assert len(index) == 5
+        assert [m["id"] for m in index.between(["checkout"], 0, 60 * MIN)][:2] == ["a", "b"]
+
+    def test_prune_drops_old_markers(self, index):
+        assert index.prune(52 * MIN) == 2
+        assert len(index) == 3
+        assert index.between(["checkout"], 0, 60 * MIN) == [index.between(None, 0, 60 * MIN)[1]]
+
+    def test_correlate_reports_minutes_before(self, index):
+        result = correlate_deploys(index, ["payments"], 60 * 60, within_seconds=600)
+        assert result["deploy_present"]
+        assert [m["minutes_before"] for m in result["markers"]] == [5.0, 2.0]
+        assert not correlate_deploys(index, ["payments"], 60 * 60, within_seconds=60)[
+            "deploy_present"
+        ]
+
+
+class TestDeployIndexCache:
+    @pytest.mark.asyncio
+    async def test_refresh_is_incremental(self, monkeypatch):
+        windows = []
+
+        class _Client:
+            async def get_deploy_markers(self, from_ts=None, to_ts=None):
+                windows.append((from_ts, to_ts))
+                return [_marker("x", "checkout", to_ts // 60 - 1)]
+
+        monkeypatch.setattr("app.integrations.datadog_mcp.get_datadog_client", lambda: _Client())
+        cache = DeployIndexCache(lookback_seconds=3600)
+        assert await cache.refresh(now=10_000) == 1
+        await cache.refresh(now=10_300)
+        assert windows == [(10_000 - 3600, 10_000), (10_000 - 120, 10_300)]
+        await cache.ensure_fresh()
+        assert cache.fetches == 2
+
+    @pytest.mark.asyncio
+    async def test_mock_scenario_deploy_correlates(self):
+        import time
+
+        cache = DeployIndexCache()
+        index = await cache.ensure_fresh()
+        result = correlate_deploys(index, ["database"], time.time())
+        # db_latency_spike ships a database deploy a minute before the incident starts
+        assert result["deploy_present"]
+        assert result["markers"][-1]["service"] == "database"
@@ -0,0 +1,62 @@
+"""Tests for LTTB chart downsampling."""
+import numpy as np
+
+from app.integrations.downsample import (
+    downsample_forecast,
+    downsample_pointlist,
+    lttb,
+    lttb_indices,
+)
+
+
+def test_keeps_endpoints_and_requested_count():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 20)
+    idx = lttb_indices(x, y, 100)
+    assert len(idx) == 100
+    assert idx[0] == 0 and idx[-1] == 999
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_spike_survives_downsampling():
+    y = np.ones(1000)
+    y[537] = 50.0
+    out = lttb(np.arange(1000) * 60_000, y, 50)
+    assert out[:, 1].max() == 50.0
+    assert out[:, 0][out[:, 1].argmax()] == 537 * 60_000
+
+
+def test_small_series_pass_through():
+    assert lttb_indices(np.arange(5), np.arange(5), 10).tolist() == [0, 1, 2, 3, 4]
+    pointlist = [[0, 1.0], [1, 2.0]]
+    assert downsample_pointlist(pointlist, 10) is pointlist
+    assert downsample_pointlist(pointlist, None) is pointlist
+
+
+def test_null_points_are_dropped():
+    pointlist = [[i, None if i % 2 else float(i)] for i in range(100)]
+    out = downsample_pointlist(pointlist, 10)
+    assert len(out) == 10
+    assert all(v is not None for _, v in out)
+
+
+def test_forecast_band_stays_aligned():
+    median = np.linspace(0, 1, 200)
+    fc = {
+        "historical": list(range(60)),
+        "predicted_median": median.tolist(),
+        "lower_bound": (median - 1).tolist(),
+        "upper_bound": (median + 1).tolist(),
+    }
+    out = downsample_forecast(fc, 20)
+    assert len(out["historical"]) == len(out["historical_index"]) == 20
+    assert len(out["predicted_median"]) == len(out["forecast_index"]) == 20
+    assert np.allclose(np.array(out["upper_bound"]) - np.array(out["lower_bound"]), 2.0)
+
+
+def test_overview_charts_respect_points(client, auth_headers):
+    resp = client.get("/api/home/overview?points=10", headers=auth_headers)
+    assert resp.status_code == 200
+    for chart in resp.json()["liveChartsData"].values():
+        assert len(chart["series"]) <= 10
+    assert client.get("/api/home/overview?points=1", headers=auth_headers).status_code == 422
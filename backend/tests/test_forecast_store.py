@@ -0,0 +1,120 @@
+"""Tests for ForecastStore — packed float32 storage and forecast history."""
+import pytest
+
+from app.db.models import Incident, TotoForecastRecord
+from app.schemas.toto import TotoForecast
+from app.services.forecast_store import ForecastStore, pack_forecast
+
+
+def _forecast(name: str, score: float, horizon: int = 5) -> TotoForecast:
+    return TotoForecast(
+        series_name=name,
+        historical=[100.25 + i for i in range(8)],
+        predicted_median=[110.5] * horizon,
+        lower_bound=[105.0] * horizon,
+        upper_bound=[116.125] * horizon,
+        anomaly_score=score,
+        is_anomalous=score > 70,
+        interval_seconds=60,
+        model="statistical",
+    )
+
+
+@pytest.fixture
+def incident(db):
+    inc = Incident(title="checkout errors", severity="warning", services=["checkout"])
+    db.add(inc)
+    db.commit()
+    return inc
+
+
+def test_pack_forecast_uses_float32(incident):
+    fc = _forecast("error_rate", 10.0)
+    blob = pack_forecast(fc)
+    assert len(blob) == 4 * (8 + 3 * 5)
+
+
+def test_save_and_load_round_trip(db, incident):
+    store = ForecastStore(db)
+    store.save(incident.id, [_forecast("error_rate", 10.0)], profile="standard")
+
+    (fc,) = store.latest(incident.id)
+    assert fc == _forecast("error_rate", 10.0)
+
+
+def test_history_is_kept_and_latest_wins(db, incident):
+    store = ForecastStore(db)
+    store.save(incident.id, [_forecast("error_rate", 10.0), _forecast("p95_latency", 20.0)])
+    store.save(incident.id, [_forecast("error_rate", 90.0)])
+
+    latest = {fc.series_name: fc.anomaly_score for fc in store.latest(incident.id)}
+    assert latest == {"error_rate": 90.0, "p95_latency": 20.0}
+    assert db.query(TotoForecastRecord).filter_by(incident_id=incident.id).count() == 3
+
+    history = store.history(incident.id, series_name="error_rate")
+    assert [h["anomaly_score"] for h in history] == [90.0, 10.0]
+
+
+def test_incident_never_loads_forecast_blobs(db, incident):
+    from sqlalchemy.exc import InvalidRequestError
+
+    ForecastStore(db).save(incident.id, [_forecast("error_rate", 10.0)])
+    db.expire_all()
+    with pytest.raises(InvalidRequestError):
+        db.get(Incident, incident.id).forecasts
+
+
+def test_latest_is_empty_for_unknown_incident(db):
+    assert ForecastStore(db).latest(999999) == []
+
+
+def test_forecast_endpoint_serves_stored_forecast(client, auth_headers, db, incident):
+    ForecastStore(db).save(incident.id, [_forecast("error_rate", 42.0)])
+
+    resp = client.get(f"/api/incidents/{incident.id}/forecast", headers=auth_headers)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [fc["anomaly_score"] for fc in body["forecasts"]] == [42.0]
+
+    resp = client.get(f"/api/incidents/{incident.id}/forecast/history", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.json()["history"][0]["series_name"] == "error_rate"
+
+
+def test_legacy_forecast_column_is_backfilled_once():
+    """Forecasts kept in the pre-table ``incidents.toto_forecasts`` JSON column survive."""
+    import json
+
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db.session import Base
+    from app.services.forecast_store import backfill_legacy_forecasts
+
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as conn:
+        # Schema as shipped before the forecast table existed
+        conn.execute(text(
+            "CREATE TABLE incidents (id INTEGER PRIMARY KEY, source VARCHAR,"
+            " title VARCHAR NOT NULL, started_at DATETIME, severity VARCHAR NOT NULL,"
+            " services JSON, state VARCHAR,"
+            " monitor_id VARCHAR, toto_forecasts JSON, agentcore_session_id VARCHAR)"
+        ))
+        legacy = [_forecast("error_rate", 80.0).model_dump(), {"series_name": "broken"}]
+        conn.execute(
+            text(
+                "INSERT INTO incidents (id, title, severity, toto_forecasts)"
+                " VALUES (:i, 't', 'warning', :f)"
+            ),
+            [{"i": 1, "f": json.dumps(legacy)}, {"i": 2, "f": None}],
+        )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        assert backfill_legacy_forecasts(db) == 1
+        assert backfill_legacy_forecasts(db) == 0  # the column was cleared
+        (fc,) = ForecastStore(db).latest(1)
+        assert fc == _forecast("error_rate", 80.0)
+        assert db.query(TotoForecastRecord).count() == 1
+    finally:
+        db.close()
@@ -0,0 +1,61 @@
+"""Tests for the streaming Drain log template miner."""
+from app.integrations.log_templates import LogTemplateMiner, mine_templates, tokenize
+from app.integrations.mock_data import generator as gen
+
+
+def _log(message, ts=0, level="error", service="checkout"):
+    return {"message": message, "timestamp": ts, "level": level, "service": service}
+
+
+def test_values_collapse_into_one_template():
+    miner = LogTemplateMiner()
+    for i, dep in enumerate(["database", "cache", "payments", "database"]):
+        miner.add(_log(f"Request to {dep} timed out after {i + 2}s", ts=1000 * i))
+    (template,) = miner.templates()
+    assert template.template == "Request to <*> timed out after <*>"
+    assert template.count == 4
+    assert (template.first_seen, template.last_seen) == (0, 3000)
+    assert template.to_dict()["example_params"][0] == ["database", "2s"]
+
+
+def test_different_shapes_stay_apart():
+    summary = mine_templates([
+        _log("Connection pool exhausted (active=12, max=50)"),
+        _log("Connection pool exhausted (active=40, max=50)"),
+        _log("GET /api/users 200 in 35ms", level="info"),
+        _log("Cache hit ratio 91% for users", level="info"),
+    ])
+    assert summary["lines"] == 4
+    assert summary["template_count"] == 3
+    top = summary["templates"][0]
+    assert top["template"] == "Connection pool exhausted active <*> max <*>"
+    assert top["count"] == 2 and top["levels"] == {"error": 2}
+
+
+def test_incremental_pages_match_one_batch():
+    records, _ = gen._generate_logs_page(
+        {"from_ts": 1_700_000_000, "to_ts": 1_700_003_600, "total": 3000, "limit": 3000}
+    )
+    streamed = LogTemplateMiner()
+    for start in range(0, len(records), 200):
+        streamed.add_many(records[start:start + 200])
+    assert streamed.summary() == mine_templates(records)
+    # Thousands of mock lines reduce to a handful of templates
+    assert streamed.summary()["template_count"] < 30
+
+
+def test_summary_reports_lines_beyond_top():
+    miner = LogTemplateMiner()
+    for word in ["alpha", "bravo", "charlie"]:
+        miner.add_message(f"{word} worker started")
+        miner.add_message(f"{word} queue drained")
+    summary = miner.summary(top=1)
+    assert len(summary["templates"]) == 1
+    assert summary["other_lines"] == summary["lines"] - summary["templates"][0]["count"]
+
+
+def test_iso_timestamps_and_tokenize():
+    miner = LogTemplateMiner()
+    miner.add(_log("disk full", ts="2024-01-01T00:00:00Z"))
+    assert miner.templates()[0].first_seen == 1704067200000
+    assert tokenize('user="bob" id=[42]') == ["user", "bob", "id", "42"]
@@ -0,0 +1,79 @@
+"""Tests for the seeded, scenario-driven mock telemetry generator."""
+import numpy as np
+import pytest
+
+from app.integrations.mock_data import generator as gen
+
+WINDOW = {"from_ts": 1_700_000_000, "to_ts": 1_700_003_600}
+
+
+def test_same_arguments_same_data():
+    args = {**WINDOW, "query": "avg:demo.http.request.duration{*} by {service}"}
+    assert gen._generate_metrics(args) == gen._generate_metrics(args)
+    assert gen._generate_metrics(args) != gen._generate_metrics({**args, "seed": 1})
+
+
+def test_group_by_service_degrades_along_the_dependency_chain():
+    ts, tags, values = gen.metric_columns(
+        "avg:demo.http.request.duration{*} by {service}", WINDOW["from_ts"], WINDOW["to_ts"]
+    )
+    services = [t[0].split(":", 1)[1] for t in tags]
+    assert services == gen.INCIDENT_SCENARIOS["db_latency_spike"]["services"]
+    before = values[:, ts < WINDOW["to_ts"] - gen.INCIDENT_SECONDS].mean(axis=1)
+    after = values[:, -10:].mean(axis=1)
+    ratio = dict(zip(services, after / before))
+    # Root cause degrades most, each hop upstream less
+    assert ratio["database"] > ratio["payment-service"] > ratio["user-service"] > 1.1
+
+
+def test_aggregate_query_keeps_demo_shape():
+    [series] = gen._generate_metrics(
+        {**WINDOW, "query": "sum:demo.http.requests.count{status:500}.as_rate()"}
+    )
+    values = [v for _, v in series["pointlist"]]
+    assert series["tags"] == ["service:demo-service", "env:production"]
+    assert np.mean(values[:20]) < 1.0 and np.mean(values[-10:]) > 5.0
+
+
+def test_endpoint_group_by_returns_one_series_per_endpoint():
+    series = gen._generate_metrics(
+        {**WINDOW, "query": "p95:demo.http.request.duration{*} by {endpoint}"}
+    )
+    assert {s["tags"][0] for s in series} == {f"endpoint:{e}" for e in gen.ENDPOINTS}
+
+
+@pytest.mark.parametrize("scenario", list(gen.INCIDENT_SCENARIOS))
+def test_errors_concentrate_in_the_incident(scenario):
+    logs, _ = gen._generate_logs_page(
+        {**WINDOW, "scenario": scenario, "total": 5000, "limit": 5000}
+    )
+    onset_ms = (WINDOW["to_ts"] - gen.INCIDENT_SECONDS) * 1000
+    root = gen.INCIDENT_SCENARIOS[scenario]["root_cause"]
+    def error_share(rows):
+        return sum(r["level"] == "error" for r in rows) / max(len(rows), 1)
+    before = [r for r in logs if r["timestamp"] < onset_ms]
+    during = [r for r in logs if r["timestamp"] > onset_ms + 600_000 and r["service"] == root]
+    assert error_share(during) > 2 * error_share(before)
+
+
+def test_pages_are_slices_of_one_scan():
+    args = {**WINDOW, "total": 300}
+    whole, _ = gen._generate_traces_page({**args, "limit": 300})
+    first, cursor = gen._generate_traces_page({**args, "limit": 100})
+    second, _ = gen._generate_traces_page({**args, "limit": 100, "cursor": cursor})
+    assert first + second == whole[:200]
+    assert [t["start"] for t in whole] == sorted(t["start"] for t in whole)
+
+
+def test_large_scans_are_uncapped():
+    logs = gen._generate_logs({**WINDOW, "limit": 20_000})
+    traces = gen._generate_traces({**WINDOW, "limit": 20_000, "service": "api"})
+    assert len(logs) == len(traces) == 20_000
+    assert {t["service"] for t in traces} == {"api"}
+
+
+def test_deploy_marker_precedes_incident_only_when_scenario_has_one():
+    with_deploy = gen._generate_deploy_markers({**WINDOW, "scenario": "bad_deploy_errors"})
+    without = gen._generate_deploy_markers({**WINDOW, "scenario": "ai_quality_drift"})
+    assert [m["service"] for m in with_deploy][-1] == "checkout-service"
+    assert all(m["service"] != "embedding-service" for m in without)
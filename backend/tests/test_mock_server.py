@@ -0,0 +1,78 @@
+"""End-to-end tests of the live client against the local Datadog stand-in."""
+import httpx
+import pytest
+
+from app.integrations.datadog_mcp import DatadogMCPClient
+from app.integrations.mock_data.server import StandInConfig, create_app, split_queries
+
+
+def _client(config=None):
+    app = create_app(config or StandInConfig(seed=1))
+    client = DatadogMCPClient()
+    client.mode = "live"
+    client.base_url = "http://standin"
+    client._cache = None
+    client._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+    return client, app
+
+
+def test_split_queries_respects_parentheses():
+    packed = "avg:a{x:1,y:2},sum:b{*}.rollup(avg, 60),avg:c{*} by {service}"
+    assert split_queries(packed) == [
+        "avg:a{x:1,y:2}",
+        "sum:b{*}.rollup(avg, 60)",
+        "avg:c{*} by {service}",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_monitors_and_packed_metrics():
+    client, app = _client()
+    monitors = await client.get_active_monitors()
+    assert monitors and monitors[0]["status"] == "Alert"
+    results = await client.query_metrics_many(
+        ["avg:demo.http.request.duration{*}", "sum:demo.http.requests.count{*}.as_rate()"]
+    )
+    assert app.state.requests == 2
+    assert all(len(r) == 1 and r[0]["pointlist"] for r in results)
+
+
+@pytest.mark.asyncio
+async def test_streams_paginate_over_http():
+    client, app = _client(StandInConfig(page_size=100))
+    logs = [
+        log
+        async for page in client.iter_logs("service:user-service", page_size=250)
+        for log in page
+    ]
+    assert len(logs) == 1000
+    assert logs[0]["service"] == "user-service" and logs[0]["level"] in ("error", "info")
+    traces = [t async for page in client.iter_traces(service="api") for t in page]
+    assert len(traces) == 400
+    assert app.state.requests == 10 + 4  # 100-record pages
+
+
+@pytest.mark.asyncio
+async def test_live_service_dependencies():
+    client, _ = _client()
+    deps = await client.get_service_dependencies("payment-service")
+    assert [d["service"] for d in deps["dependencies"]] == ["database"]
+    assert {d["service"] for d in deps["dependents"]} == {"checkout-service", "user-service"}
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_headers_feed_the_budget():
+    client, _ = _client(StandInConfig(rate_limit=2, rate_period=60))
+    for _ in range(2):
+        await client.get_deploy_markers(from_ts=1_000_000, to_ts=1_003_600)
+    budget = client.ratelimit_stats()["/api/v1/events"]
+    assert budget["limit"] == 2 and budget["remaining"] == 0
+    # Over the limit: 429 with a Retry-After longer than an interactive call waits
+    assert await client.get_deploy_markers(from_ts=1_000_000, to_ts=1_003_600) == []
+    assert client.ratelimit_stats()["/api/v1/events"]["blocked_for"] > 0
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_fall_back_to_empty():
+    client, _ = _client(StandInConfig(error_rate=1.0))
+    assert await client.query_metrics("avg:m{*}") == []
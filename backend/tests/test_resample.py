@@ -0,0 +1,94 @@
+"""Tests for gap-aware pointlist resampling."""
+import numpy as np
+import pytest
+
+from app.integrations.resample import fill_gaps, infer_interval, resample, resample_series
+
+
+def _pointlist(values, step_s=60, start_ms=1_700_000_000_000):
+    return [[start_ms + i * step_s * 1000, v] for i, v in enumerate(values)]
+
+
+def test_regular_series_is_unchanged():
+    rs = resample(_pointlist([1.0, 2.0, 3.0]))
+    assert rs.values.tolist() == [1.0, 2.0, 3.0]
+    assert rs.interval_seconds == 60
+    assert rs.gaps == 0
+
+
+def test_null_points_are_filled_not_dropped():
+    rs = resample(_pointlist([1.0, None, 3.0, None, 5.0]))
+    assert len(rs) == 5
+    assert rs.values.tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert rs.gaps == 2
+
+
+def test_missing_timestamps_keep_time_alignment():
+    points = _pointlist([1.0, 2.0, 3.0, 4.0, 5.0])
+    del points[2]  # a hole, not a null
+    rs = resample(points)
+    assert len(rs) == 5
+    assert rs.values[2] == pytest.approx(3.0)
+    assert np.all(np.diff(rs.timestamps) == 60_000)
+
+
+def test_interval_is_derived_from_spacing():
+    rs = resample(_pointlist([1.0] * 10, step_s=20))
+    assert rs.interval_seconds == 20
+    assert infer_interval(np.array([0, 300_000, 600_000])) == 300
+
+
+def test_duplicates_and_unsorted_input():
+    points = _pointlist([1.0, 2.0, 3.0])
+    points = [points[2], points[0], [points[1][0], 4.0], points[1]]
+    rs = resample(points)
+    assert rs.values.tolist() == [1.0, 3.0, 3.0]  # duplicate slot averaged
+
+
+@pytest.mark.parametrize("fill, expected", [
+    ("linear", [1.0, 2.0, 3.0]),
+    ("ffill", [1.0, 1.0, 3.0]),
+    ("zero", [1.0, 0.0, 3.0]),
+])
+def test_fill_policies(fill, expected):
+    assert resample(_pointlist([1.0, None, 3.0]), fill=fill).values.tolist() == expected
+
+
+def test_fill_none_leaves_gaps_and_points_skip_them():
+    rs = resample(_pointlist([1.0, None, 3.0]), fill="none")
+    assert np.isnan(rs.values[1])
+    assert [v for _, v in rs.points()] == [1.0, 3.0]
+    assert rs.tolist() == [1.0, 3.0]
+
+
+def test_fill_none_gives_forecasters_a_filled_view():
+    rs = resample(_pointlist([1.0, None, None, 4.0, 5.0]), fill="none")
+    assert np.isnan(rs.values).sum() == 2  # charts still see the gaps
+    assert rs.filled().tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert len(rs) == 5
+    assert rs.observed == 3  # empty slots are not data
+
+
+def test_downsampled_points_skip_unfilled_gaps():
+    values = [float(i) if i % 4 else None for i in range(1, 200)]
+    points = resample(_pointlist(values), fill="none").points(20)
+    assert len(points) <= 20
+    assert not np.isnan(np.array(points)).any()
+
+
+def test_fill_nonfinite():
+    from app.integrations.resample import fill_nonfinite
+
+    assert fill_nonfinite([1.0, np.nan, np.inf, 4.0]).tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert np.isnan(fill_nonfinite([np.nan, np.nan])).all()
+
+
+def test_unknown_fill_policy_raises():
+    with pytest.raises(ValueError):
+        fill_gaps(np.array([1.0, np.nan]), fill="spline")
+
+
+def test_empty_and_all_null_inputs():
+    assert len(resample([])) == 0
+    assert len(resample(_pointlist([None, None]))) == 0
+    assert len(resample_series({})) == 0
@@ -0,0 +1,77 @@
+"""Tests for the bitset service graph and its crawling cache."""
+import time
+
+import pytest
+
+from app.services.service_graph import ServiceGraph, ServiceGraphCache
+
+
+def _deps(*names, errors=0):
+    return [{"service": n, "calls": 100, "errors": errors} for n in names]
+
+
+@pytest.fixture
+def graph():
+    # gateway → users → payments → db, gateway → search → db, search → cache
+    g = ServiceGraph()
+    g.set_edges("gateway", _deps("users", "search"), [])
+    g.set_edges("users", _deps("payments", errors=3), _deps("gateway", errors=3))
+    g.set_edges("payments", _deps("db", errors=5), [])
+    g.set_edges("search", _deps("db", "cache"), [])
+    return g
+
+
+class TestServiceGraph:
+    def test_reachability(self, graph):
+        assert graph.downstream("gateway") == ["cache", "db", "payments", "search", "users"]
+        assert graph.upstream("db") == ["gateway", "payments", "search", "users"]
+        assert graph.upstream("gateway") == []
+        assert graph.downstream("unknown") == []
+
+    def test_blast_radius(self, graph):
+        radius = graph.blast_radius(["payments"])
+        assert radius["impacted"] == ["gateway", "users"]
+        assert radius["impacted_count"] == 2
+        assert radius["downstream_count"] == 1
+        assert radius["known_services"] == 6
+        assert "2 of 6 services depend on payments" in graph.describe(["payments"])
+        assert graph.describe(["unknown"]) is None
+
+    def test_edges_are_replaced_incrementally(self, graph):
+        version = graph.version
+        assert not graph.set_edges("search", _deps("db", "cache"), [])
+        assert graph.version == version
+        graph.set_edges("search", _deps("cache"), [])
+        assert "search" not in graph.upstream("db")
+        assert graph.version == version + 1
+
+    def test_error_paths_follow_erroring_edges(self, graph):
+        paths = graph.error_paths("db")
+        # Errors climb db → payments → users → gateway; search → db reported none
+        assert paths[0]["path"] == ["db", "payments", "users", "gateway"]
+        assert paths[0]["errors"] == 11
+        assert all("search" not in p["path"] for p in paths)
+
+
+class TestServiceGraphCache:
+    @pytest.mark.asyncio
+    async def test_crawls_mock_dependencies_once(self):
+        cache = ServiceGraphCache(ttl_seconds=600)
+        graph = await cache.ensure(["database"])
+        assert "api-gateway" in graph.upstream("database")
+        assert set(graph.upstream("database")) >= {"payment-service", "user-service"}
+        fetched = cache.fetches
+        assert await cache.refresh(["database"]) == 0
+        assert cache.fetches == fetched
+
+    @pytest.mark.asyncio
+    async def test_stale_services_are_refetched(self):
+        cache = ServiceGraphCache(ttl_seconds=600)
+        await cache.ensure(["payment-service"])
+        cache._fetched_at["payment-service"] = time.time() - 3600
+        assert await cache.refresh(["payment-service"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_crawl_is_bounded(self):
+        cache = ServiceGraphCache(max_services=3)
+        assert await cache.refresh(["payment-service"]) == 3
@@ -12,11 +12,15 @@ def mock_toto_forecast_method(monkeypatch):
 
     Returns a deterministic TotoForecast for any non-empty input.
     """
+    import app.integrations.toto_forecaster as tf_mod
     from app.integrations.toto_forecaster import TotoForecaster
 
-    def _mock_forecast(self, values, interval_seconds, series_name="metric", horizon=60):
+    def _mock_forecast(
+        self, values, interval_seconds, series_name="metric", horizon=None, profile="standard"
+    ):
         if not values:
             return None
+        horizon = horizon or tf_mod.get_profile(profile).horizon
         return TotoForecast(
             series_name=series_name,
             historical=list(values[-60:]),
@@ -31,7 +35,6 @@ def mock_toto_forecast_method(monkeypatch):
     # Save the real, unpatched method BEFORE replacing it — tests that need the
     # real implementation (e.g. test_forecast_returns_none_when_model_unavailable)
     # can retrieve it via tf_mod._real_forecast.
-    import app.integrations.toto_forecaster as tf_mod
     tf_mod._real_forecast = TotoForecaster.forecast
 
     monkeypatch.setattr(TotoForecaster, "forecast", _mock_forecast)
@@ -105,9 +108,11 @@ def test_forecast_returns_none_when_model_unavailable(monkeypatch):
     aren't available, causing forecast() to return None.
     """
     import app.integrations.toto_forecaster as tf_mod
+    from app.core.config import settings
 
     # Patch _load_model to simulate missing torch/toto-ts
     monkeypatch.setattr(tf_mod, "_load_model", lambda: (None, None))
+    monkeypatch.setattr(settings, "toto_statistical_fallback", False)
     # Restore the real forecast method (saved by the autouse fixture before patching).
     # _real_forecast.__globals__ points to tf_mod's namespace, so the patched
     # _load_model above is the one that gets called.
@@ -118,6 +123,80 @@ def test_forecast_returns_none_when_model_unavailable(monkeypatch):
     assert result is None
 
 
+def test_failed_model_load_is_remembered(monkeypatch, caplog):
+    """A missing torch/toto-ts is detected once, not retried and re-logged per forecast."""
+    import builtins
+    import logging
+    import app.integrations.toto_forecaster as tf_mod
+
+    monkeypatch.setattr(tf_mod, "_toto_model", None)
+    monkeypatch.setattr(tf_mod, "_load_failed", False)
+    monkeypatch.setattr(tf_mod, "_retry_at", 0.0)
+    real_import = builtins.__import__
+    attempts = []
+
+    def fake_import(name, *args, **kwargs):
+        if name == "torch":
+            attempts.append(name)
+            raise ImportError("No module named 'torch'")
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", fake_import)
+    with caplog.at_level(logging.WARNING, logger=tf_mod.logger.name):
+        assert tf_mod._load_model() == (None, None)
+        assert tf_mod._load_model() == (None, None)
+    assert attempts == ["torch"]
+    assert sum("Toto model unavailable" in r.message for r in caplog.records) == 1
+
+
+def test_transient_load_failure_is_retried_after_backoff(monkeypatch):
+    """A download/OOM error disables Toto only until the backoff expires, not for good."""
+    import types
+    import app.integrations.toto_forecaster as tf_mod
+
+    attempts = []
+
+    class _Model:
+        model = object()
+
+        def to(self, device):
+            return self
+
+        def eval(self):
+            return self
+
+    def from_pretrained(name):
+        attempts.append(name)
+        if len(attempts) == 1:
+            raise OSError("HuggingFace download failed")
+        return _Model()
+
+    torch = types.SimpleNamespace(cuda=types.SimpleNamespace(is_available=lambda: False))
+    toto_model = types.SimpleNamespace(Toto=types.SimpleNamespace(from_pretrained=from_pretrained))
+    forecaster = types.SimpleNamespace(TotoForecaster=lambda backbone: "impl")
+    for name, module in {
+        "torch": torch, "toto": types.SimpleNamespace(), "toto.model": types.SimpleNamespace(),
+        "toto.model.toto": toto_model, "toto.inference": types.SimpleNamespace(),
+        "toto.inference.forecaster": forecaster,
+    }.items():
+        monkeypatch.setitem(sys.modules, name, module)
+    for name, value in {
+        "_toto_model": None, "_toto_forecaster_impl": None, "_load_failed": False,
+        "_retry_at": 0.0, "_retry_delay": 0.0, "_status": dict(tf_mod._status),
+    }.items():
+        monkeypatch.setattr(tf_mod, name, value)
+
+    assert tf_mod._load_model() == (None, None)
+    assert tf_mod._load_model() == (None, None)  # still backing off: no second attempt
+    assert len(attempts) == 1 and not tf_mod._load_failed
+
+    monkeypatch.setattr(tf_mod, "_retry_at", 0.0)  # backoff elapsed
+    model, impl = tf_mod._load_model()
+    assert model is not None and impl == "impl"
+    assert len(attempts) == 2
+    assert tf_mod._status["loaded"] and tf_mod._status["ready"]
+
+
 def test_toto_schema_fields():
     from app.schemas.toto import TotoForecast, TotoForecastResult
 
@@ -136,3 +215,457 @@ def test_toto_schema_fields():
 
     result = TotoForecastResult(forecasts=[fc], computed_at="2026-01-01T00:00:00Z")
     assert len(result.forecasts) == 1
+
+
+def test_inference_profiles_defined():
+    from app.integrations.toto_forecaster import TOTO_PROFILES, ANOMALY_WINDOW
+
+    assert {"fast", "standard", "precise"} <= set(TOTO_PROFILES)
+    # The fast profile must still decode enough steps to score anomalies
+    assert TOTO_PROFILES["fast"].horizon >= ANOMALY_WINDOW
+    assert TOTO_PROFILES["fast"].num_samples < TOTO_PROFILES["standard"].num_samples
+    assert TOTO_PROFILES["precise"].num_samples > TOTO_PROFILES["standard"].num_samples
+
+
+def test_get_profile_unknown_name_falls_back_to_default():
+    from app.integrations.toto_forecaster import get_profile, DEFAULT_PROFILE
+
+    assert get_profile("does-not-exist").name == DEFAULT_PROFILE
+    assert get_profile(None).name == DEFAULT_PROFILE
+
+
+def test_forecast_horizon_defaults_to_profile(forecaster):
+    values = [float(i) for i in range(100)]
+    result = forecaster.forecast(values=values, interval_seconds=60, profile="fast")
+    assert result is not None
+    assert len(result.predicted_median) == 5
+
+
+# ── Vectorised pre/post-processing ────────────────────────────────────────────
+
+def test_prepare_context_pads_ragged_rows_with_first_value():
+    import numpy as np
+    from app.integrations.toto_forecaster import _prepare_context
+
+    normalized, mean, std, lengths = _prepare_context([[1.0, 2.0, 3.0], [4.0] * 10], 8)
+    assert normalized.shape == (2, 8)
+    assert normalized.dtype == np.float32
+    assert lengths.tolist() == [3, 10]
+    restored = normalized.astype(np.float64) * std + mean
+    assert np.allclose(restored[0], [1, 1, 1, 1, 1, 1, 2, 3], atol=1e-5)
+    assert np.allclose(restored[1], 4.0)
+
+
+def test_prepare_context_fills_non_finite_values():
+    import numpy as np
+    from app.integrations.toto_forecaster import _prepare_context
+
+    rows = np.array([[1.0, np.nan, 3.0, np.inf, 5.0], [np.nan] * 5])
+    normalized, mean, std, _ = _prepare_context(rows, 5)
+    assert np.isfinite(normalized).all()
+    restored = normalized.astype(np.float64) * std + mean
+    assert np.allclose(restored[0], [1, 2, 3, 4, 5], atol=1e-5)
+    assert np.allclose(restored[1], 0.0)
+    assert np.isnan(rows[0, 1])  # the caller's array is left alone
+
+
+def test_forecast_of_gappy_series_is_json_safe(monkeypatch):
+    """Unfilled (fill="none") gaps must not leak NaN into forecasts or scores."""
+    import json
+    import math
+    import app.integrations.toto_forecaster as tf_mod
+    from app.integrations.toto_forecaster import TotoForecaster
+
+    monkeypatch.setattr(tf_mod, "_load_model", lambda: (None, None))
+    gappy = [100.0 + (i % 3) if i % 5 else float("nan") for i in range(60)]
+    clean = [100.0 + (i % 3) for i in range(60)]
+    fc, empty = TotoForecaster().forecast_batch([gappy, [float("nan")] * 10], 60, horizon=5)
+    assert empty is None
+    json.dumps(fc.model_dump(), allow_nan=False)
+    assert math.isfinite(fc.anomaly_score)
+    assert fc.anomaly_score == TotoForecaster().forecast(clean, 60, horizon=5).anomaly_score
+
+    mv = TotoForecaster().forecast_multivariate({"a": gappy, "b": clean}, 60, horizon=5)
+    json.dumps(mv.model_dump(), allow_nan=False)
+
+
+def test_prepare_context_accepts_2d_array():
+    import numpy as np
+    from app.integrations.toto_forecaster import _prepare_context
+
+    arr = np.arange(20, dtype=np.float64).reshape(2, 10)
+    normalized, mean, std, _ = _prepare_context(arr, 4)
+    assert normalized.shape == (2, 4)
+    assert mean[:, 0].tolist() == [7.5, 17.5]
+
+
+def test_anomaly_scores_match_scalar_definition():
+    import numpy as np
+    from app.integrations.toto_forecaster import _anomaly_scores
+
+    lower = np.array([[0.0, 0.0, 0.0], [0.0, 0.0, 0.0]])
+    upper = np.array([[10.0, 10.0, 10.0], [10.0, 10.0, 10.0]])
+    last_actual = np.array([
+        [5.0, 12.0, 30.0, 5.0, 5.0],       # exceeds by 2 (20%) and 20 (capped 100%)
+        [1.0, 2.0, np.nan, np.nan, 3.0],   # never exceeds
+    ])
+    scores = _anomaly_scores(last_actual, lower, upper)
+    assert scores.tolist() == [60.0, 0.0]
+
+
+def test_forecast_batch_returns_none_per_row_when_model_unavailable(monkeypatch):
+    import app.integrations.toto_forecaster as tf_mod
+    from app.core.config import settings
+
+    monkeypatch.setattr(tf_mod, "_load_model", lambda: (None, None))
+    monkeypatch.setattr(settings, "toto_statistical_fallback", False)
+    results = tf_mod.TotoForecaster().forecast_batch([[1.0, 2.0], []], interval_seconds=60)
+    assert results == [None, None]
+
+
+def test_forecast_falls_back_to_statistical_detector(monkeypatch):
+    """Without the model, the statistical detector answers in the same schema."""
+    import app.integrations.toto_forecaster as tf_mod
+
+    monkeypatch.setattr(tf_mod, "_load_model", lambda: (None, None))
+    monkeypatch.setattr(tf_mod.TotoForecaster, "forecast", tf_mod._real_forecast)
+
+    values = [10.0] * 100 + [80.0] * 5
+    result = tf_mod.TotoForecaster().forecast(values=values, interval_seconds=60, horizon=12)
+    assert isinstance(result, TotoForecast)
+    assert result.model == "statistical"
+    assert len(result.upper_bound) == 12
+    assert result.is_anomalous is True
+
+
+def test_fast_profile_prefilter_skips_model_for_flat_series(monkeypatch):
+    import app.integrations.toto_forecaster as tf_mod
+
+    calls = []
+    monkeypatch.setattr(tf_mod, "_load_model", lambda: ("model", "forecaster"))
+    monkeypatch.setattr(
+        tf_mod.TotoForecaster, "_model_batch", staticmethod(lambda *a: calls.append(a) or [])
+    )
+    results = tf_mod.TotoForecaster().forecast_batch(
+        [[5.0] * 100], interval_seconds=60, profile="fast"
+    )
+    assert calls == []
+    assert results[0].model == "statistical"
+    assert results[0].is_anomalous is False
+
+
+def test_warmup_is_noop_without_model(monkeypatch):
+    import app.integrations.toto_forecaster as tf_mod
+
+    monkeypatch.setattr(tf_mod, "_load_model", lambda: (None, None))
+    monkeypatch.setitem(tf_mod._status, "ready", False)
+    tf_mod._warmup()
+    assert tf_mod.toto_status()["ready"] is False
+
+
+def test_process_rss_mb_is_positive():
+    from app.integrations.toto_forecaster import process_rss_mb
+
+    assert process_rss_mb() > 0
+
+
+# ── Inference sidecar ─────────────────────────────────────────────────────────
+
+@pytest.fixture()
+def sidecar(tmp_path, monkeypatch):
+    """Run a TotoSidecarServer on a background event loop (statistical fallback only)."""
+    import asyncio
+    import threading
+    import app.integrations.toto_forecaster as tf_mod
+    from app.integrations.toto_sidecar import TotoSidecarServer
+
+    monkeypatch.setattr(tf_mod, "_load_model", lambda: (None, None))
+    server = TotoSidecarServer(str(tmp_path / "toto.sock"), batch_window_ms=100)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def _run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=_run, daemon=True).start()
+    assert started.wait(5)
+    yield server
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def test_health_fails_fast_on_stuck_sidecar(tmp_path, monkeypatch):
+    """A sidecar that accepts but never answers costs /health its status_timeout only."""
+    import socket
+    import time
+    import app.integrations.toto_sidecar as sc_mod
+    from app.core.config import settings
+    from app.integrations.toto_forecaster import toto_health
+
+    path = str(tmp_path / "stuck.sock")
+    stuck = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stuck.bind(path)
+    stuck.listen(1)
+    monkeypatch.setattr(sc_mod, "_client", None)
+    monkeypatch.setattr(settings, "toto_sidecar_socket", path)
+    monkeypatch.setattr(settings, "toto_sidecar_status_timeout", 0.2)
+    try:
+        started = time.perf_counter()
+        status = toto_health()
+        assert time.perf_counter() - started < 2
+        assert status["mode"] == "sidecar"
+        assert status["ready"] is False
+        assert "error" in status["sidecar"]
+    finally:
+        stuck.close()
+
+
+def test_sidecar_batches_concurrent_requests(sidecar):
+    import threading
+    from app.integrations.toto_sidecar import TotoSidecarClient
+
+    client = TotoSidecarClient(sidecar.socket_path, timeout=5)
+    results = []
+
+    def _call(i):
+        results.extend(client.forecast_batch([[float(i)] * 50], 60, [f"s{i}"], 10, "standard"))
+
+    threads = [threading.Thread(target=_call, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    assert sorted(fc.series_name for fc in results) == ["s0", "s1", "s2", "s3"]
+    assert all(len(fc.predicted_median) == 10 for fc in results)
+    status = client.status()
+    assert status["requests_served"] == 4
+    assert status["batches_run"] < 4
+
+
+@pytest.mark.asyncio
+async def test_sidecar_batch_loop_survives_cancelled_and_bad_requests(tmp_path, monkeypatch):
+    import asyncio
+    import app.integrations.toto_forecaster as tf_mod
+    from app.integrations.toto_sidecar import TotoSidecarServer
+
+    monkeypatch.setattr(tf_mod, "_load_model", lambda: (None, None))
+    server = TotoSidecarServer(str(tmp_path / "toto.sock"), batch_window_ms=20)
+    await server.start()
+    try:
+        loop = asyncio.get_running_loop()
+        request = {"values": [[1.0] * 40], "series_names": ["s"], "horizon": 5}
+        gone, live = loop.create_future(), loop.create_future()
+        gone.cancel()  # its client disconnected mid-batch
+        await server._queue.put((request, gone))
+        await server._queue.put((request, live))
+        assert "forecasts" in await asyncio.wait_for(live, 5)
+
+        # A malformed request fails its own batch, not the loop
+        bad = loop.create_future()
+        await server._queue.put((None, bad))
+        assert "error" in await asyncio.wait_for(bad, 5)
+        after = loop.create_future()
+        await server._queue.put((request, after))
+        assert "forecasts" in await asyncio.wait_for(after, 5)
+        assert not server._batch_task.done()
+    finally:
+        await server.close()
+
+
+def test_forecast_uses_sidecar_when_configured(sidecar, monkeypatch):
+    import app.integrations.toto_sidecar as sc_mod
+    from app.core.config import settings
+    from app.integrations.toto_forecaster import TotoForecaster
+
+    monkeypatch.setattr(settings, "toto_sidecar_socket", sidecar.socket_path)
+    monkeypatch.setattr(sc_mod, "_client", None)
+    results = TotoForecaster().forecast_batch([[1.0] * 40], 60, ["via_sidecar"], horizon=5)
+    assert results[0].series_name == "via_sidecar"
+    assert sidecar.requests_served == 1
+    monkeypatch.setattr(sc_mod, "_client", None)
+
+
+def test_forecast_falls_back_when_sidecar_unreachable(tmp_path, monkeypatch):
+    import app.integrations.toto_sidecar as sc_mod
+    from app.core.config import settings
+    from app.integrations.toto_forecaster import TotoForecaster
+
+    monkeypatch.setattr(settings, "toto_sidecar_socket", str(tmp_path / "missing.sock"))
+    monkeypatch.setattr(sc_mod, "_client", None)
+    results = TotoForecaster().forecast_batch([[1.0] * 40], 60, horizon=5)
+    assert results[0].model == "statistical"
+    monkeypatch.setattr(sc_mod, "_client", None)
+
+
+# ── Multivariate ──────────────────────────────────────────────────────────────
+
+def test_joint_anomaly_score_requires_corroboration():
+    import numpy as np
+    from app.integrations.toto_forecaster import joint_anomaly_score
+
+    assert joint_anomaly_score(np.array([100.0, 0.0, 0.0])) < 70.0
+    assert joint_anomaly_score(np.array([100.0, 90.0, 0.0])) > 70.0
+    assert joint_anomaly_score(np.array([100.0])) == 100.0
+    assert joint_anomaly_score(np.array([])) == 0.0
+
+
+def test_forecast_multivariate_returns_per_channel_and_joint(monkeypatch):
+    import app.integrations.toto_forecaster as tf_mod
+
+    monkeypatch.setattr(tf_mod, "_load_model", lambda: (None, None))
+    flat = [10.0] * 100
+    spike = [10.0] * 95 + [90.0] * 5
+    mv = tf_mod.TotoForecaster().forecast_multivariate(
+        {"error_rate": spike, "p95_latency": spike, "throughput": flat},
+        interval_seconds=60, group="demo-service", horizon=8,
+    )
+    assert mv.group == "demo-service"
+    assert [fc.series_name for fc in mv.forecasts] == ["error_rate", "p95_latency", "throughput"]
+    assert all(len(fc.predicted_median) == 8 for fc in mv.forecasts)
+    assert mv.is_anomalous is True
+    assert mv.model == "statistical"
+
+
+def test_forecast_groups_keeps_groups_separate(monkeypatch):
+    import app.integrations.toto_forecaster as tf_mod
+
+    monkeypatch.setattr(tf_mod, "_load_model", lambda: (None, None))
+    results = tf_mod.TotoForecaster().forecast_groups(
+        {
+            "svc-a": {"error_rate": [1.0] * 50},
+            "svc-b": {"error_rate": [1.0] * 45 + [50.0] * 5, "throughput": [5.0] * 50},
+            "svc-empty": {"error_rate": []},
+        },
+        interval_seconds=60,
+    )
+    assert set(results) == {"svc-a", "svc-b"}
+    assert results["svc-a"].is_anomalous is False
+    assert len(results["svc-b"].forecasts) == 2
+
+
+def test_sidecar_serves_multivariate_groups(sidecar):
+    from app.integrations.toto_sidecar import TotoSidecarClient
+
+    client = TotoSidecarClient(sidecar.socket_path, timeout=5)
+    results = client.forecast_groups(
+        {"demo-service": {"error_rate": [1.0] * 50, "throughput": [2.0] * 50}}, 60, 5, "fast"
+    )
+    assert len(results["demo-service"].forecasts) == 2
+
+
+# ── Max-horizon forecast cache ───────────────────────────────────────────────
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    """Model stub that records decode horizons and returns flat forecasts."""
+    import app.integrations.toto_forecaster as tf_mod
+
+    horizons = []
+
+    def _model_batch(
+        model, forecaster, rows, names, interval_seconds, horizon, spec, id_groups=None
+    ):
+        horizons.append(horizon)
+        return [
+            TotoForecast(
+                series_name=name,
+                historical=[1.0],
+                predicted_median=[float(h) for h in range(horizon)],
+                lower_bound=[0.0] * horizon,
+                upper_bound=[2.0] * horizon,
+                anomaly_score=0.0,
+                is_anomalous=False,
+                interval_seconds=interval_seconds,
+            )
+            for name in names
+        ]
+
+    monkeypatch.setattr(tf_mod, "_load_model", lambda: ("model", "forecaster"))
+    monkeypatch.setattr(tf_mod.TotoForecaster, "_model_batch", staticmethod(_model_batch))
+    monkeypatch.setattr(tf_mod.TotoForecaster, "forecast", tf_mod._real_forecast)
+    monkeypatch.setattr(tf_mod, "_forecast_cache", tf_mod.ForecastCache(16))
+    return horizons
+
+
+def test_shorter_horizon_is_sliced_from_cached_forecast(fake_model):
+    import app.integrations.toto_forecaster as tf_mod
+
+    values = [float(i % 7) for i in range(200)]
+    toto = tf_mod.TotoForecaster()
+    long = toto.forecast(values, 60, series_name="p95", horizon=60, profile="standard")
+    short = toto.forecast(values, 60, series_name="p95", horizon=5, profile="standard")
+    assert fake_model == [60]
+    assert len(long.predicted_median) == 60
+    assert short.predicted_median == long.predicted_median[:5]
+    assert tf_mod.get_forecast_cache().stats()["hits"] == 1
+
+
+def test_decode_uses_longest_requested_horizon(fake_model):
+    import app.integrations.toto_forecaster as tf_mod
+
+    toto = tf_mod.TotoForecaster()
+    toto.forecast([1.0] * 50, 60, series_name="err", horizon=60, profile="standard")
+    # New window for the same series: decoded at 60 once, served at 12 and 60
+    short = toto.forecast([2.0] * 50, 60, series_name="err", horizon=12, profile="standard")
+    long = toto.forecast([2.0] * 50, 60, series_name="err", horizon=60, profile="standard")
+    assert fake_model == [60, 60]
+    assert len(short.predicted_median) == 12
+    assert len(long.predicted_median) == 60
+
+
+def test_cached_entry_not_reused_for_more_samples(fake_model):
+    import app.integrations.toto_forecaster as tf_mod
+
+    toto = tf_mod.TotoForecaster()
+    values = [float(i % 5) for i in range(100)]
+    toto.forecast(values, 60, series_name="tp", horizon=60, profile="standard")
+    toto.forecast(values, 60, series_name="tp", horizon=60, profile="precise")
+    toto.forecast(values, 60, series_name="tp", horizon=60, profile="standard")
+    assert len(fake_model) == 2  # precise needs more samples; its entry then serves standard
+
+
+def test_fast_check_is_not_stretched_to_chart_horizon(fake_model, monkeypatch):
+    import app.integrations.toto_forecaster as tf_mod
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "toto_prefilter_threshold", 0.0)  # escalate every series
+    toto = tf_mod.TotoForecaster()
+    toto.forecast([1.0] * 50, 60, series_name="err", horizon=60, profile="standard")
+    # 16-sample check on a new window: its entry can't serve the 64-sample chart,
+    # so it decodes only its own 5 steps
+    toto.forecast([2.0] * 50, 60, series_name="err", profile="fast")
+    # The chart then decodes 60 steps, and that entry also serves the next check
+    toto.forecast([2.0] * 50, 60, series_name="err", horizon=60, profile="standard")
+    check = toto.forecast([2.0] * 50, 60, series_name="err", profile="fast")
+    assert fake_model == [60, 5, 60]
+    assert len(check.predicted_median) == 5
+    assert tf_mod.get_forecast_cache().stats()["hits"] == 1
+
+
+def test_stronger_entry_is_not_kept_out_by_a_longer_weaker_one():
+    from app.integrations.toto_forecaster import ForecastCache, get_profile
+
+    def _fc(horizon):
+        return TotoForecast(
+            series_name="s", historical=[1.0], predicted_median=[0.0] * horizon,
+            lower_bound=[0.0] * horizon, upper_bound=[0.0] * horizon,
+            anomaly_score=0.0, is_anomalous=False, interval_seconds=60,
+        )
+
+    cache = ForecastCache(4)
+    cache.put("k", _fc(60), get_profile("fast"))
+    cache.put("k", _fc(30), get_profile("standard"))
+    assert cache.get("k", get_profile("standard"), 30, "s") is not None
+
+
+def test_cache_key_depends_on_values_and_interval():
+    import numpy as np
+    from app.integrations.toto_forecaster import ForecastCache
+
+    assert ForecastCache.key([1.0, 2.0], 60) == ForecastCache.key(np.array([1.0, 2.0]), 60)
+    assert ForecastCache.key([1.0, 2.0], 60) != ForecastCache.key([1.0, 2.5], 60)
+    assert ForecastCache.key([1.0, 2.0], 60) != ForecastCache.key([1.0, 2.0], 30)
@@ -0,0 +1,100 @@
+"""Tests for DDSketch quantiles and the streaming trace aggregator."""
+import json
+
+import numpy as np
+import pytest
+
+from app.integrations.mock_data import generator as gen
+from app.integrations.trace_stats import DDSketch, TraceAggregator
+
+
+def _span(service, resource, duration_ms, error=False, start=0):
+    return {
+        "service": service,
+        "resource": resource,
+        "duration": duration_ms * 1000,
+        "error": error,
+        "start": start,
+    }
+
+
+class TestDDSketch:
+    def test_quantiles_within_relative_accuracy(self):
+        values = np.random.default_rng(0).lognormal(5, 1, 100_000)
+        sketch = DDSketch(relative_accuracy=0.01)
+        sketch.add_many(values)
+        for q in (0.5, 0.95, 0.99):
+            exact = np.quantile(values, q, method="lower")
+            assert abs(sketch.quantile(q) - exact) / exact < 0.02
+
+    def test_merge_equals_single_pass(self):
+        values = np.random.default_rng(1).exponential(100, 10_000)
+        whole = DDSketch()
+        whole.add_many(values)
+        left, right = DDSketch(), DDSketch()
+        left.add_many(values[:3000])
+        right.add_many(values[3000:])
+        merged = left.merge(right)
+        assert merged.count == whole.count
+        assert merged.bins == whole.bins
+        assert merged.quantile(0.99) == whole.quantile(0.99)
+
+    def test_round_trips_through_json(self):
+        sketch = DDSketch()
+        sketch.add_many([0.0, 1.5, 20.0, 300.0])
+        restored = DDSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+        assert restored.quantile(0.5) == sketch.quantile(0.5)
+        assert restored.zero_count == 1
+
+    def test_empty_and_mismatched(self):
+        assert DDSketch().quantile(0.5) is None
+        with pytest.raises(ValueError):
+            DDSketch(0.01).merge(DDSketch(0.05))
+
+    def test_bins_are_bounded(self):
+        sketch = DDSketch(max_bins=50)
+        sketch.add_many(np.logspace(-3, 6, 5000))
+        assert len(sketch.bins) <= 50
+        assert sketch.quantile(1.0) == pytest.approx(1e6, rel=0.02)
+
+
+class TestTraceAggregator:
+    def test_groups_by_service_and_resource(self):
+        agg = TraceAggregator()
+        agg.add_many(
+            [
+                _span("db", "SELECT", 10),
+                _span("db", "SELECT", 30, error=True),
+                _span("api", "/users", 5),
+            ]
+        )
+        summary = agg.summary(window_seconds=2)
+        assert summary["spans"] == 3
+        db = summary["services"]["db"]
+        assert db["count"] == 2 and db["error_rate"] == 0.5
+        assert db["throughput_per_s"] == 1.0
+        assert summary["resources"][0]["resource"] == "SELECT"
+        assert summary["resources"][0]["max_ms"] == pytest.approx(30)
+
+    def test_live_spans_use_status(self):
+        agg = TraceAggregator()
+        agg.add_many([{"service": "api", "resource": "/", "duration": 1000, "status": "error"}])
+        assert agg.summary()["services"]["api"]["errors"] == 1
+
+    def test_pages_merge_like_one_pass(self):
+        spans, _ = gen._generate_traces_page(
+            {"from_ts": 1_700_000_000, "to_ts": 1_700_003_600, "total": 5000, "limit": 5000}
+        )
+        whole = TraceAggregator()
+        whole.add_many(spans)
+        # Per-page aggregators, serialized as a cache would, then combined
+        combined = TraceAggregator()
+        for start in range(0, len(spans), 500):
+            page = TraceAggregator()
+            page.add_many(spans[start:start + 500])
+            combined.merge(TraceAggregator.from_dict(json.loads(json.dumps(page.to_dict()))))
+        assert combined.summary(3600) == whole.summary(3600)
+
+        durations = np.array([s["duration"] / 1000 for s in spans if s["service"] == "database"])
+        p95 = combined.summary(3600)["services"]["database"]["p95_ms"]
+        assert abs(p95 - np.quantile(durations, 0.95)) / p95 < 0.02
@@ -0,0 +1,197 @@
+"""Tests for the local columnar time-series store and delta fetching."""
+import numpy as np
+import pytest
+
+from app.integrations.ts_store import TimeSeriesStore
+
+QUERY = "avg:m{*} by {service}"
+T0 = 1_000_000
+
+
+def _series(service, start, count, step=20, value=1.0):
+    return {
+        "metric": "m",
+        "tag_set": [f"service:{service}"],
+        "pointlist": [[(start + i * step) * 1000, value] for i in range(count)],
+    }
+
+
+@pytest.fixture
+def store():
+    return TimeSeriesStore(max_bytes=1 << 20, retention_seconds=4 * 3600)
+
+
+def test_plan_moves_from_full_to_delta_to_local(store):
+    assert store.plan(QUERY, T0, T0 + 3600, 20) == (T0, T0 + 3600, False)
+    store.merge(QUERY, [_series("a", T0, 180)], T0, T0 + 3600, 20, False)
+    assert store.plan(QUERY, T0, T0 + 3600, 20) is None
+    # One minute later only the tail (plus the 300 s ingestion-lag overlap) is needed
+    assert store.plan(QUERY, T0 + 60, T0 + 3660, 20) == (T0 + 3300, T0 + 3660, True)
+    # A different rollup or an earlier start needs the full window again
+    assert store.plan(QUERY, T0 + 60, T0 + 3660, 60)[2] is False
+    assert store.plan(QUERY, T0 - 60, T0 + 3540, 20)[2] is False
+
+
+def test_overlap_is_at_least_two_buckets():
+    store = TimeSeriesStore(max_bytes=1 << 20, retention_seconds=4 * 3600, overlap_seconds=300)
+    store.merge(QUERY, [_series("a", T0, 12, step=600)], T0, T0 + 7200, 600, False)
+    assert store.plan(QUERY, T0 + 600, T0 + 7800, 600) == (T0 + 6000, T0 + 7800, True)
+
+
+def test_delta_merge_replaces_overlap_and_reads_window(store):
+    store.merge(QUERY, [_series("a", T0, 180, value=1.0)], T0, T0 + 3600, 20, False)
+    store.merge(QUERY, [_series("a", T0 + 3560, 5, value=2.0)], T0 + 3560, T0 + 3660, 20, True)
+    [series] = store.read(QUERY, T0 + 60, T0 + 3660)
+    ts = [p[0] for p in series["pointlist"]]
+    values = [p[1] for p in series["pointlist"]]
+    assert ts == sorted(set(ts))
+    assert ts[0] == (T0 + 60) * 1000 and ts[-1] == (T0 + 3640) * 1000
+    assert values[-5:] == [2.0] * 5 and values[0] == 1.0
+    assert series["tag_set"] == ["service:a"]
+
+
+def test_delta_without_its_base_is_refused(store):
+    store.merge(QUERY, [_series("a", T0, 180)], T0, T0 + 3600, 20, False)
+    fetch_from, fetch_to, is_delta = store.plan(QUERY, T0 + 60, T0 + 3660, 20)
+    assert is_delta
+    store._entries.clear()  # evicted while the delta was in flight
+    assert not store.merge(QUERY, [_series("a", fetch_from, 18)], fetch_from, fetch_to, 20, True)
+    assert store.read(QUERY, T0 + 60, T0 + 3660) == []
+    assert store.stats()["delta_misses"] == 1
+
+    # Re-stored from a later start: it no longer covers the window read back
+    store.merge(QUERY, [_series("a", T0 + 1800, 90)], T0 + 1800, T0 + 3600, 20, False)
+    assert not store.merge(
+        QUERY, [_series("a", fetch_from, 18)], fetch_from, fetch_to, 20, True, read_from=T0 + 60
+    )
+    assert store.merge(
+        QUERY, [_series("a", fetch_from, 18)], fetch_from, fetch_to, 20, True, read_from=T0 + 1800
+    )
+
+
+def test_nulls_round_trip(store):
+    series = {"metric": "m", "pointlist": [[T0 * 1000, None], [(T0 + 20) * 1000, 3.0]]}
+    store.merge(QUERY, [series], T0, T0 + 40, 20, False)
+    assert store.read(QUERY, T0, T0 + 40)[0]["pointlist"] == [
+        [T0 * 1000, None],
+        [(T0 + 20) * 1000, 3.0],
+    ]
+
+
+def test_eviction_keeps_memory_under_budget():
+    store = TimeSeriesStore(max_bytes=3 * 180 * 16, retention_seconds=4 * 3600)
+    for i in range(5):
+        store.merge(f"avg:m{i}{{*}}", [_series("a", T0, 180)], T0, T0 + 3600, 20, False)
+    stats = store.stats()
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert stats["evictions"] == 2
+    assert store.read("avg:m0{*}", T0, T0 + 3600) == []
+
+
+def test_save_and_load_memory_mapped(store, tmp_path):
+    store.merge(
+        QUERY, [_series("a", T0, 180), _series("b", T0, 180, value=5.0)], T0, T0 + 3600, 20, False
+    )
+    store.save(str(tmp_path))
+
+    loaded = TimeSeriesStore(max_bytes=1 << 20, retention_seconds=4 * 3600)
+    assert loaded.load(str(tmp_path)) == 1
+    assert loaded.plan(QUERY, T0, T0 + 3600, 20) is None
+    assert loaded.read(QUERY, T0, T0 + 3600) == store.read(QUERY, T0, T0 + 3600)
+    assert isinstance(loaded._entries[QUERY].series["service:a"].values, np.memmap)
+    # Saving over files the loaded store still maps is safe
+    loaded.merge(QUERY, [_series("a", T0 + 3560, 5, value=2.0)], T0 + 3560, T0 + 3660, 20, True)
+    loaded.save(str(tmp_path))
+
+
+class TestClientDeltaFetch:
+    @pytest.fixture
+    def live_client(self):
+        """Live-mode client answering every query with points across the requested window."""
+        import httpx
+        from urllib.parse import parse_qs, urlparse
+        from app.integrations.datadog_mcp import DatadogMCPClient
+
+        calls = []
+
+        def handler(request):
+            params = parse_qs(urlparse(str(request.url)).query)
+            calls.append(params)
+            start, end = int(params["from"][0]), int(params["to"][0])
+            return httpx.Response(
+                200,
+                json={
+                    "series": [
+                        {
+                            "metric": "m",
+                            "scope": "*",
+                            "pointlist": [
+                                [t * 1000, client.late.get(t * 1000, float(t))]
+                                for t in range(start, end, 20)
+                            ],
+                        }
+                    ]
+                },
+            )
+
+        client = DatadogMCPClient()
+        client.mode = "live"
+        client._cache = None
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client.calls = calls
+        client.late = {}
+        return client
+
+    @pytest.mark.asyncio
+    async def test_sliding_window_fetches_only_the_tail(self, live_client):
+        first = await live_client.query_metrics("avg:m{*}", from_ts=T0, to_ts=T0 + 3600)
+        second = await live_client.query_metrics("avg:m{*}", from_ts=T0 + 60, to_ts=T0 + 3660)
+        assert len(live_client.calls) == 2
+        delta = live_client.calls[1]
+        assert delta["query"] == ["avg:m{*}.rollup(avg, 20)"]
+        assert int(delta["to"][0]) - int(delta["from"][0]) == 360
+        assert len(second[0]["pointlist"]) == len(first[0]["pointlist"])
+        assert second[0]["pointlist"][-1][0] == (T0 + 3640) * 1000
+
+    @pytest.mark.asyncio
+    async def test_full_fetches_pin_the_rollup_too(self, live_client):
+        await live_client.query_metrics("avg:m{*}", from_ts=T0, to_ts=T0 + 3600)
+        assert live_client.calls[0]["query"] == ["avg:m{*}.rollup(avg, 20)"]
+
+    @pytest.mark.asyncio
+    async def test_base_evicted_before_merge_falls_back_to_full_fetch(self, live_client):
+        store = live_client._store
+        await live_client.query_metrics("avg:m{*}", from_ts=T0, to_ts=T0 + 3600)
+        plan = store.plan
+
+        def plan_then_evict(*args):
+            planned = plan(*args)
+            store._entries.clear()  # another query pushes this one out meanwhile
+            return planned
+
+        store.plan = plan_then_evict
+        series = await live_client.query_metrics("avg:m{*}", from_ts=T0 + 60, to_ts=T0 + 3660)
+        assert len(live_client.calls) == 3
+        full = live_client.calls[2]
+        assert (int(full["from"][0]), int(full["to"][0])) == (T0 + 60, T0 + 3660)
+        assert series[0]["pointlist"][0][0] == (T0 + 60) * 1000
+        assert series[0]["pointlist"][-1][0] == (T0 + 3640) * 1000
+        assert live_client.store_stats()["delta_misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_late_point_in_stored_bucket_is_updated(self, live_client):
+        late_ms = (T0 + 3400) * 1000  # 200 s before the end: well past two 20 s buckets
+        first = await live_client.query_metrics("avg:m{*}", from_ts=T0, to_ts=T0 + 3600)
+        assert [p[1] for p in first[0]["pointlist"] if p[0] == late_ms] == [float(T0 + 3400)]
+
+        live_client.late = {late_ms: -1.0}  # Datadog has since ingested more for that bucket
+        second = await live_client.query_metrics("avg:m{*}", from_ts=T0 + 60, to_ts=T0 + 3660)
+        assert [p[1] for p in second[0]["pointlist"] if p[0] == late_ms] == [-1.0]
+
+    @pytest.mark.asyncio
+    async def test_covered_window_is_a_local_read(self, live_client):
+        await live_client.query_metrics("avg:m{*}", from_ts=T0, to_ts=T0 + 3600)
+        series = await live_client.query_metrics_many(["avg:m{*}"], from_ts=T0 + 5, to_ts=T0 + 3605)
+        assert len(live_client.calls) == 1
+        assert series[0][0]["pointlist"]
+        assert live_client.store_stats()["local_reads"] == 1
@@ -0,0 +1,165 @@
+"""Tests for concurrent dashboard widgets with per-widget deadlines."""
+import asyncio
+
+import pytest
+
+from app.services.widgets import WidgetRegistry, follow_up, run_widgets
+
+POLL = "/api/home/widgets/{name}"
+
+
+def _builder(value, delay=0.0, calls=None):
+    async def build():
+        if calls is not None:
+            calls.append(value)
+        await asyncio.sleep(delay)
+        return value
+    return build
+
+
+async def _fails():
+    raise RuntimeError("boom")
+
+
+class TestRunWidgets:
+    @pytest.mark.asyncio
+    async def test_fast_widgets_are_inlined(self):
+        registry = WidgetRegistry()
+        results, pending = await run_widgets(
+            {"a": _builder([1]), "b": _builder({"x": 2})},
+            {"a": 1.0, "b": 1.0},
+            registry,
+            "u1",
+            POLL,
+        )
+        assert results == {"a": [1], "b": {"x": 2}}
+        assert pending == []
+        assert len(registry) == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_widget_returns_pending_marker(self):
+        registry = WidgetRegistry()
+        results, pending = await run_widgets(
+            {"fast": _builder("ok"), "slow": _builder("late", delay=0.3)},
+            {"fast": 1.0, "slow": 0.05}, registry, "u1", POLL,
+        )
+        assert results["fast"] == "ok"
+        assert results["slow"] == {
+            "status": "pending",
+            "widget": "slow",
+            "poll": "/api/home/widgets/slow",
+        }
+        assert pending == ["slow"]
+        assert len(registry) == 1
+
+    @pytest.mark.asyncio
+    async def test_widgets_run_concurrently(self):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await run_widgets(
+            {name: _builder(name, delay=0.1) for name in "abcd"}, {}, WidgetRegistry(), "u1", POLL,
+        )
+        assert loop.time() - started < 0.3
+
+    @pytest.mark.asyncio
+    async def test_failed_widget_renders_its_fallback(self):
+        fallbacks = {"bad": []}
+        results, pending = await run_widgets(
+            {"ok": _builder(1), "bad": _fails, "worse": _fails}, {}, WidgetRegistry(), "u1", POLL,
+            fallbacks=fallbacks,
+        )
+        # "worse" has no fallback, so it is left out rather than sent as null
+        assert results == {"ok": 1, "bad": []}
+        assert pending == []
+        results["bad"].append("x")
+        assert fallbacks["bad"] == []  # each page gets its own copy
+
+
+class TestFollowUp:
+    @pytest.mark.asyncio
+    async def test_follow_up_reuses_in_flight_task(self):
+        registry = WidgetRegistry()
+        calls = []
+        build = _builder("late", delay=0.1, calls=calls)
+        await run_widgets({"slow": build}, {"slow": 0.01}, registry, "u1", POLL)
+
+        result = await follow_up("slow", build, 1.0, registry, "u1", POLL)
+        assert result == {"status": "ready", "widget": "slow", "data": "late"}
+        assert calls == ["late"]  # not rebuilt
+        assert len(registry) == 0
+
+    @pytest.mark.asyncio
+    async def test_follow_up_still_pending(self):
+        registry = WidgetRegistry()
+        build = _builder("late", delay=0.3)
+        result = await follow_up("slow", build, 0.01, registry, "u1", POLL)
+        assert result["status"] == "pending"
+        assert len(registry) == 1
+
+    @pytest.mark.asyncio
+    async def test_follow_up_of_failed_widget_is_its_fallback(self):
+        result = await follow_up("w", _fails, 1.0, WidgetRegistry(), "u1", POLL, fallback=[])
+        assert result == {"status": "ready", "widget": "w", "data": []}
+
+    @pytest.mark.asyncio
+    async def test_follow_up_without_task_builds_fresh(self):
+        calls = []
+        result = await follow_up("w", _builder(3, calls=calls), 1.0, WidgetRegistry(), "u1", POLL)
+        assert result["data"] == 3
+        assert calls == [3]
+
+    @pytest.mark.asyncio
+    async def test_keys_are_per_user(self):
+        registry = WidgetRegistry()
+        calls = []
+        build = _builder("late", delay=0.1, calls=calls)
+        await run_widgets({"slow": build}, {"slow": 0.01}, registry, "u1", POLL)
+        await follow_up("slow", build, 1.0, registry, "u2", POLL)
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_tasks_are_cancelled(self):
+        registry = WidgetRegistry(ttl_seconds=0.0)
+        task = asyncio.ensure_future(asyncio.sleep(1))
+        registry.put("k", task)
+        await asyncio.sleep(0.01)
+        assert registry.take("k") is None
+        await asyncio.sleep(0)
+        assert task.cancelled()
+
+
+class TestHomeWidgetsRoute:
+    def test_overview_lists_pending_widgets(self, client, auth_headers):
+        resp = client.get("/api/home/overview", headers=auth_headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert isinstance(data["pendingWidgets"], list)
+        for name in data["pendingWidgets"]:
+            assert data[name]["status"] == "pending"
+
+    def test_widget_endpoint(self, client, auth_headers):
+        resp = client.get("/api/home/widgets/activeAlerts", headers=auth_headers)
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["widget"] == "activeAlerts"
+        assert body["status"] in ("ready", "pending")
+
+    def test_failing_widgets_never_send_null(self, client, auth_headers, monkeypatch):
+        from app.integrations.datadog_mcp import get_datadog_client
+        from app.routes.home import WIDGET_FALLBACKS, _OverviewWidgets
+
+        async def boom(*args, **kwargs):
+            raise RuntimeError("Datadog down")
+
+        monkeypatch.setattr(get_datadog_client(), "get_active_monitors", boom)
+        monkeypatch.setattr(_OverviewWidgets, "suggested_improvements", boom)
+        data = client.get("/api/home/overview", headers=auth_headers).json()
+        for name in WIDGET_FALLBACKS:
+            assert data[name] is not None
+        assert data["activeAlerts"] == []
+        if "suggestedImprovements" not in data["pendingWidgets"]:
+            assert data["suggestedImprovements"] == []
+
+    def test_unknown_widget_is_404(self, client, auth_headers):
+        resp = client.get("/api/home/widgets/nope", headers=auth_headers)
+        assert resp.status_code == 404
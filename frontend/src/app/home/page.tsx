@@ -1,21 +1,47 @@
 "use client"
 
-import { useQuery } from "@tanstack/react-query"
+import { useQueries, useQuery } from "@tanstack/react-query"
 import { apiClient } from "@/lib/api"
 import { AppShell } from "@/components/AppShell"
 import { HomeOverview } from "@/components/HomeOverview"
 
+type WidgetResult = { status: "ready" | "pending"; widget: string; data?: unknown }
+
 export default function HomePage() {
-  const { data, isLoading } = useQuery({
+  const { data, isLoading, dataUpdatedAt } = useQuery({
     queryKey: ["home-overview"],
-    queryFn: () => apiClient.get("/home/overview"),
+    queryFn: () => apiClient.get<Record<string, any>>("/home/overview"),
     refetchInterval: 30_000, // refresh every 30 seconds
     refetchIntervalInBackground: false,
   })
 
+  // Widgets that missed their server-side deadline arrive as pending markers;
+  // fetch each one on its own and fill it in when it lands
+  const pendingWidgets: string[] = data?.pendingWidgets ?? []
+  const widgets = useQueries({
+    queries: pendingWidgets.map((name) => ({
+      queryKey: ["home-widget", name, dataUpdatedAt],
+      queryFn: () => apiClient.get<WidgetResult>(`/home/widgets/${name}`),
+      refetchInterval: (query: { state: { data?: WidgetResult } }) =>
+        query.state.data?.status === "pending" ? 2_000 : false,
+    })),
+  })
+
+  let overview = data
+  if (data && pendingWidgets.length) {
+    overview = { ...data }
+    pendingWidgets.forEach((name, i) => {
+      const result = widgets[i]?.data
+      // Drop the marker until the widget has data so HomeOverview shows its empty state
+      // (its destructuring defaults only apply to missing keys, not null)
+      if (result?.status === "ready" && result.data != null) overview![name] = result.data
+      else delete overview![name]
+    })
+  }
+
   return (
     <AppShell>
-      <HomeOverview data={data} isLoading={isLoading} />
+      <HomeOverview data={overview} isLoading={isLoading} />
     </AppShell>
   )
 }